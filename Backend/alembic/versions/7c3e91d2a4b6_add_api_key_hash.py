@@ -0,0 +1,37 @@
+"""add api_key_hash to api_keys
+
+Revision ID: 7c3e91d2a4b6
+Revises: 1acda7efc951
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e91d2a4b6'
+down_revision: Union[str, Sequence[str], None] = '1acda7efc951'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('api_keys', sa.Column('api_key_hash', sa.CHAR(64), nullable=True))
+    # Backfill existing keys, same digest as src.core.utils.hash.hash_api_key
+    op.execute("UPDATE api_keys SET api_key_hash = SHA2(api_key, 256)")
+    op.alter_column(
+        'api_keys', 'api_key_hash', existing_type=sa.CHAR(64), nullable=False
+    )
+    op.create_index(
+        op.f('ix_api_keys_api_key_hash'), 'api_keys', ['api_key_hash'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_api_keys_api_key_hash'), table_name='api_keys')
+    op.drop_column('api_keys', 'api_key_hash')
@@ -0,0 +1,43 @@
+"""add cached token counts to metadata
+
+Revision ID: b52f0d8e6a13
+Revises: 7c3e91d2a4b6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52f0d8e6a13'
+down_revision: Union[str, Sequence[str], None] = '7c3e91d2a4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'metadata',
+        sa.Column(
+            'cached_tokens', sa.Integer(), nullable=False, server_default=sa.text('0')
+        ),
+    )
+    op.add_column(
+        'metadata',
+        sa.Column(
+            'cache_creation_tokens',
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text('0'),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('metadata', 'cache_creation_tokens')
+    op.drop_column('metadata', 'cached_tokens')
@@ -4,7 +4,6 @@ import re
 import time
 from typing import List, Optional
 
-import tiktoken
 from fastapi import WebSocket
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_openai import ChatOpenAI
@@ -25,6 +24,7 @@ from app.AI.utils.dataset import get_dataset
 from app.AI.utils.history import get_history_messages
 from app.models.company_information.company_model import CreateCompanyInformation
 from src.core.utils.logger import get_logger
+from src.infrastructure.ai.components.tokenizer import tokenizer_service
 
 # from src.infrastructure.redis.redis_storage import redis_storage
 from src.core.utils.loop_manager import run_async
@@ -75,13 +75,6 @@ class Workflow:
         self.validation_agent_model = create_validation_agent_model(available_databases)
         self.logger = get_logger(__name__)
 
-        # Initialize tokenizer for token counting
-        try:
-            self.tokenizer = tiktoken.encoding_for_model("gpt-4o-mini")
-        except KeyError:
-            # Fallback to cl100k_base encoding if model not found
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
-
         self.build = self._build_workflow()
 
     def _send_websocket_message(
@@ -152,13 +145,8 @@ class Workflow:
                 time.sleep(delay)
 
     def _estimate_tokens(self, text: str) -> int:
-        """Estimate token count for text using tiktoken"""
-        try:
-            return len(self.tokenizer.encode(text))
-        except Exception as e:
-            self.logger.warning(f"Error estimating tokens: {str(e)}")
-            # Fallback: rough estimation (1 token ≈ 4 characters)
-            return len(text) // 4
+        """Estimate token count for text with the shared tokenizer"""
+        return tokenizer_service.count_tokens(text, "gpt-4o-mini")
 
     def _estimate_structured_output_tokens(
         self, prompt: str, response_content: str = ""
@@ -0,0 +1,70 @@
+"""
+Construction time of SimpleRagWorkflow with and without graph templates.
+
+"compile" clears the template cache before every construction, which is
+what building a StateGraph per agent used to cost; "template" reuses the
+compiled graph of the same topology. With --chromadb-path the real
+RetrieveDocumentTool is built too (needs OPENAI_API_KEY set, no requests
+are made). Run from the Backend directory:
+
+    python -m benchmarks.agent_construction --agents 200
+"""
+
+import argparse
+import time
+from typing import Optional
+
+from benchmarks.fakes import FakeRetrieveDocumentTool, percentile
+from src.infrastructure.ai.agents.graph_templates import graph_templates
+from src.infrastructure.ai.agents.simple_rag_agent.prompts import SimpleRagPrompt
+from src.infrastructure.ai.agents.simple_rag_agent.workflow import SimpleRagWorkflow
+from src.infrastructure.ai.components.tools import RetrieveDocumentTool
+from src.infrastructure.redis.checkpointer import get_agent_checkpointer
+
+
+def construct(index: int, rag_mode: str, chromadb_path: Optional[str] = None):
+    retrieve_document_tool = (
+        RetrieveDocumentTool(chromadb_path, f"collection_{index}")
+        if chromadb_path
+        else FakeRetrieveDocumentTool()
+    )
+    return SimpleRagWorkflow(
+        retrieve_document_tool,
+        get_agent_checkpointer(),
+        SimpleRagPrompt("friendly", f"Kamu adalah customer service toko {index}."),
+        llm_model="gpt-4o-mini",
+        include_short_memory=True,
+        rag_mode=rag_mode,
+    )
+
+
+def measure(name: str, args, rag_mode: str, clear: bool):
+    timings = []
+    for index in range(args.agents):
+        if clear:
+            graph_templates.clear()
+        started = time.perf_counter()
+        construct(index, rag_mode, args.chromadb_path)
+        timings.append(time.perf_counter() - started)
+
+    print(
+        f"{name:<9} {rag_mode:<11} p50={percentile(timings, 50) * 1000:7.2f}ms "
+        f"p95={percentile(timings, 95) * 1000:7.2f}ms "
+        f"total={sum(timings) * 1000:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--chromadb-path", default=None)
+    args = parser.parse_args()
+
+    for rag_mode in ["two_step", "routed"]:
+        measure("compile", args, rag_mode, clear=True)
+        graph_templates.clear()
+        measure("template", args, rag_mode, clear=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Offline stand-ins for the LLM and the document store.
+
+Benchmarks use these to reproduce provider and retrieval latency without
+network access, so numbers reflect orchestration overhead only.
+"""
+
+import random
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+def count_prompt_tokens(messages: List[BaseMessage]) -> int:
+    text = ""
+    for message in messages:
+        text += (
+            message.content
+            if isinstance(message.content, str)
+            else str(message.content)
+        )
+    return max(1, len(text) // 4)
+
+
+class FakeLatencyChat(BaseChatModel):
+    """Answers after ``latency`` seconds, asking for ``read_document`` once.
+
+    With ``stall_probability`` a call occasionally takes ``stall`` seconds,
+    like a provider stall.
+    """
+
+    latency: float = 0.4
+    jitter: float = 0.2
+    stall: float = 0.0
+    stall_probability: float = 0.0
+    tool_query: Optional[str] = None
+    tools_bound: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeLatencyChat":
+        return self.model_copy(update={"tools_bound": True})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        stalled = random.random() < self.stall_probability
+        time.sleep(
+            (self.stall if stalled else self.latency) + random.uniform(0, self.jitter)
+        )
+        input_tokens = count_prompt_tokens(messages)
+        if self.tools_bound and not isinstance(messages[-1], ToolMessage):
+            query = self.tool_query or str(messages[-1].content)
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "read_document", "args": {"query": query}, "id": "call"}
+                ],
+            )
+            output_tokens = 12
+        else:
+            message = AIMessage(content="Jawaban berdasarkan dokumen. " * 8)
+            output_tokens = 60
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeRetrieveDocumentTool:
+    """Mimics embedding + ChromaDB query latency of RetrieveDocumentTool.
+
+    Like FakeLatencyChat, ``stall_probability`` makes a query occasionally
+    take ``stall`` seconds.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.3,
+        jitter: float = 0.2,
+        chunk: str = "isi dokumen " * 200,
+        stall: float = 0.0,
+        stall_probability: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk = chunk
+        self.stall = stall
+        self.stall_probability = stall_probability
+        self.calls = 0
+
+    def read_document(self, query: str):
+        """Gunakan tool untuk mencari informasi dokumen yang telah diberikan oleh pengguna."""
+        self.calls += 1
+        stalled = random.random() < self.stall_probability
+        time.sleep(
+            (self.stall if stalled else self.latency) + random.uniform(0, self.jitter)
+        )
+        return f"[Page: 1 | Source: doc.pdf]\n{query}: {self.chunk}"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,125 @@
+"""
+Tail latency of LLM calls with and without hedged requests.
+
+The fake provider answers in ~``latency`` seconds but stalls for ``stall``
+seconds on a fraction of the calls. With hedging, a duplicate request is
+sent once the call outlives the observed p95 latency and the first answer
+wins. Run from the Backend directory:
+
+    python -m benchmarks.hedging --calls 200
+
+``--brownout`` instead keeps one provider stalled under hedged load and
+measures the calls to a healthy provider made meanwhile; losing attempts
+hold a hedge thread of their provider until the stall ends.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fakes import FakeLatencyChat, percentile
+from src.config.config import settings
+from src.core.utils.metrics import metrics
+from src.infrastructure.ai.components import (
+    HedgedLLMCaller,
+    HedgePolicy,
+    ResilientLLMCaller,
+)
+
+
+def measure(name: str, call, calls: int, concurrency: int):
+    def timed(_):
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(timed, range(calls)))
+
+    print(
+        f"{name:<10} p50={percentile(latencies, 50) * 1000:7.0f}ms "
+        f"p95={percentile(latencies, 95) * 1000:7.0f}ms "
+        f"p99={percentile(latencies, 99) * 1000:7.0f}ms "
+        f"max={max(latencies) * 1000:7.0f}ms"
+    )
+
+
+def brownout(args):
+    stalled = FakeLatencyChat(latency=args.stall, jitter=0.0)
+    healthy = FakeLatencyChat(latency=args.latency, jitter=args.latency / 2)
+    messages = [HumanMessage(content="Jam buka toko?")]
+    policy = HedgePolicy(default_delay=args.latency)
+    stalled_caller = HedgedLLMCaller(ResilientLLMCaller("stalled", "model"), policy)
+    healthy_caller = HedgedLLMCaller(ResilientLLMCaller("healthy", "model"), policy)
+
+    peak = 0
+    stop = threading.Event()
+
+    def watch():
+        nonlocal peak
+        while not stop.wait(0.01):
+            in_use = metrics.get_gauge("llm_hedge_threads_in_use", provider="stalled")
+            peak = max(peak, in_use or 0)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(stalled_caller.invoke, stalled, messages)
+        time.sleep(args.latency * 2)
+        measure(
+            "healthy",
+            lambda: healthy_caller.invoke(healthy, messages),
+            args.calls,
+            4,
+        )
+    stop.set()
+    watcher.join()
+    print(
+        f"stalled provider: {args.concurrency} hedged calls held {peak:.0f} "
+        f"hedge threads (pool {settings.LLM_HEDGE_WORKERS_PER_PROVIDER} "
+        f"per provider, LLM_MAX_IN_FLIGHT {settings.LLM_MAX_IN_FLIGHT or 'unlimited'})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--stall", type=float, default=3.0)
+    parser.add_argument("--stall-probability", type=float, default=0.05)
+    parser.add_argument("--brownout", action="store_true")
+    args = parser.parse_args()
+    if args.brownout:
+        brownout(args)
+        return
+
+    llm = FakeLatencyChat(
+        latency=args.latency,
+        jitter=args.latency / 2,
+        stall=args.stall,
+        stall_probability=args.stall_probability,
+    )
+    messages = [HumanMessage(content="Jam buka toko?")]
+    # Different model names keep the latency samples of both runs apart
+    plain = ResilientLLMCaller("fake", "plain")
+    hedged = HedgedLLMCaller(
+        ResilientLLMCaller("fake", "hedged"),
+        HedgePolicy(min_samples=20, default_delay=args.latency * 3),
+    )
+
+    measure("plain", lambda: plain.invoke(llm, messages), args.calls, args.concurrency)
+    measure(
+        "hedged",
+        lambda: hedged.invoke(llm, messages),
+        args.calls,
+        args.concurrency,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Tokens and latency per answered question for the two SimpleRagWorkflow modes.
+
+Every question needs the document, so two_step pays main_agent +
+answer_by_rag, single_call feeds the ToolMessage back to main_agent and
+routed skips the tool-decision call with the local router.
+Run from the Backend directory:
+
+    python -m benchmarks.rag_mode --questions 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fakes import FakeLatencyChat, FakeRetrieveDocumentTool, percentile
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.infrastructure.ai.agents.simple_rag_agent.prompts import SimpleRagPrompt
+from src.infrastructure.ai.agents.simple_rag_agent.workflow import SimpleRagWorkflow
+
+
+async def measure(rag_mode: str, args):
+    workflow = SimpleRagWorkflow(
+        FakeRetrieveDocumentTool(args.retrieval_latency, jitter=0),
+        MemorySaver(),
+        SimpleRagPrompt("friendly", "Kamu adalah customer service toko."),
+        llm_model="gpt-4o-mini",
+        include_short_memory=True,
+        rag_mode=rag_mode,
+    )
+    workflow._llm = FakeLatencyChat(latency=args.llm_latency, jitter=0)
+
+    latencies, tokens, llm_calls = [], [], []
+    for index in range(args.questions):
+        context = ExecutionContext("bench")
+        state = SimpleRagState(messages=[], user_message=f"pertanyaan nomor {index}")
+        started = time.perf_counter()
+        await workflow.arun(state, "bench", context)
+        latencies.append(time.perf_counter() - started)
+        tokens.append(context.total_tokens)
+        llm_calls.append(len(context.usage.records()))
+    return latencies, tokens, llm_calls
+
+
+async def main(args):
+    print(
+        f"llm latency={args.llm_latency}s retrieval latency={args.retrieval_latency}s "
+        f"questions={args.questions} (same thread, short memory on)"
+    )
+    for rag_mode in ("two_step", "single_call", "routed"):
+        latencies, tokens, llm_calls = await measure(rag_mode, args)
+        print(
+            f"{rag_mode:<12} llm calls/answer={sum(llm_calls) / len(llm_calls):.1f} "
+            f"tokens/answer={sum(tokens) / len(tokens):8.1f} "
+            f"p50={percentile(latencies, 50) * 1000:7.1f}ms "
+            f"p95={percentile(latencies, 95) * 1000:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--retrieval-latency", type=float, default=0.3)
+    asyncio.run(main(parser.parse_args()))
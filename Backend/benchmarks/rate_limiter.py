@@ -0,0 +1,97 @@
+"""
+Burst of LLM calls against a provider that 429s above its concurrency limit.
+
+Without shaping, every call hits the provider at once, most get a 429 and
+come back as retries. With the limiter's in-flight cap the burst is queued
+instead. Run from the Backend directory:
+
+    python -m benchmarks.rate_limiter --calls 64 --provider-limit 8
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import percentile
+from src.core.utils.metrics import metrics
+from src.infrastructure.ai.components import (
+    CircuitBreaker,
+    ProviderRateLimiter,
+    ResilientLLMCaller,
+    RetryPolicy,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FakeProvider:
+    def __init__(self, limit: int, latency: float):
+        self.limit = limit
+        self.latency = latency
+        self.active = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        with self.lock:
+            if self.active >= self.limit:
+                self.rejected += 1
+                raise RateLimited("429 Too Many Requests")
+            self.active += 1
+        try:
+            time.sleep(self.latency)
+            return "ok"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def run(name: str, max_in_flight: int, args):
+    provider = FakeProvider(args.provider_limit, args.latency)
+    caller = ResilientLLMCaller(
+        "fake",
+        name,
+        retry_policy=RetryPolicy(max_attempts=6, base_delay=0.2),
+        breaker=CircuitBreaker("fake", name, failure_threshold=10_000),
+        limiter=ProviderRateLimiter("fake", name, 100_000, 100_000_000, max_in_flight),
+    )
+
+    def call(index):
+        started = time.perf_counter()
+        try:
+            caller.invoke(provider, "hi")
+            failed = False
+        except RateLimited:
+            failed = True
+        return time.perf_counter() - started, failed
+
+    with ThreadPoolExecutor(args.calls) as pool:
+        results = list(pool.map(call, range(args.calls)))
+
+    latencies = [latency for latency, _ in results]
+    print(
+        f"{name:<10} 429s={provider.rejected:4d} "
+        f"failed={sum(failed for _, failed in results):3d} "
+        f"p50={percentile(latencies, 50) * 1000:6.0f}ms "
+        f"p95={percentile(latencies, 95) * 1000:6.0f}ms "
+        f"queue_wait_p95="
+        f"{(metrics.percentile('llm_queue_wait_seconds', 95, provider='fake', model=name) or 0) * 1000:6.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--provider-limit", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    run("unshaped", args.calls, args)
+    run("shaped", args.provider_limit, args)
+
+
+if __name__ == "__main__":
+    main()
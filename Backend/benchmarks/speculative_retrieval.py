@@ -0,0 +1,73 @@
+"""
+Latency of SimpleRagWorkflow with and without speculative retrieval.
+
+Simulates a document-heavy agent: every question triggers read_document.
+Run from the Backend directory:
+
+    python -m benchmarks.speculative_retrieval --runs 40
+"""
+
+import argparse
+import asyncio
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fakes import FakeLatencyChat, FakeRetrieveDocumentTool, percentile
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.infrastructure.ai.agents.simple_rag_agent.prompts import SimpleRagPrompt
+from src.infrastructure.ai.agents.simple_rag_agent.workflow import SimpleRagWorkflow
+
+QUESTION = "jam buka toko di hari minggu"
+
+
+def build_workflow(speculative: bool, args) -> SimpleRagWorkflow:
+    workflow = SimpleRagWorkflow(
+        FakeRetrieveDocumentTool(args.retrieval_latency),
+        MemorySaver(),
+        SimpleRagPrompt("friendly", "Kamu adalah customer service toko."),
+        llm_model="gpt-4o-mini",
+        speculative_retrieval=speculative,
+    )
+    # The LLM rewrites the question into keywords, as it does in practice
+    workflow._llm = FakeLatencyChat(
+        latency=args.llm_latency, tool_query="jam buka minggu"
+    )
+    return workflow
+
+
+async def measure(speculative: bool, args) -> list[float]:
+    workflow = build_workflow(speculative, args)
+    samples = []
+    for index in range(args.runs):
+        state = SimpleRagState(messages=[], user_message=QUESTION)
+        started = time.perf_counter()
+        await workflow.arun(state, f"bench-{index}", ExecutionContext(f"{index}"))
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def main(args):
+    print(
+        f"llm latency={args.llm_latency}s retrieval latency={args.retrieval_latency}s "
+        f"runs={args.runs}"
+    )
+    baseline = await measure(False, args)
+    speculative = await measure(True, args)
+    for name, samples in (("baseline", baseline), ("speculative", speculative)):
+        print(
+            f"{name:<12} p50={percentile(samples, 50) * 1000:7.1f}ms "
+            f"p95={percentile(samples, 95) * 1000:7.1f}ms"
+        )
+    for pct in (50, 95):
+        saved = percentile(baseline, pct) - percentile(speculative, pct)
+        print(f"saved p{pct}: {saved * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--retrieval-latency", type=float, default=0.3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Per-turn latency and checkpoint growth of SimpleRagWorkflow vs conversation length.
+
+The LLM and retrieval are instant, so the numbers are graph/reducer/checkpoint
+overhead only. "writes" are the node outputs persisted by the checkpointer
+for the turn, "blobs" the channel snapshots.
+Run from the Backend directory:
+
+    python -m benchmarks.state_updates --turns 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fakes import FakeLatencyChat, FakeRetrieveDocumentTool
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.infrastructure.ai.agents.simple_rag_agent.prompts import SimpleRagPrompt
+from src.infrastructure.ai.agents.simple_rag_agent.workflow import SimpleRagWorkflow
+
+
+def stored_bytes(saver: MemorySaver, thread_id: str) -> tuple[int, int]:
+    writes = sum(
+        len(value[2][1])
+        for key, inner in saver.writes.items()
+        if key[0] == thread_id
+        for value in inner.values()
+    )
+    blobs = sum(
+        len(value[1]) for key, value in saver.blobs.items() if key[0] == thread_id
+    )
+    return writes, blobs
+
+
+async def main(args):
+    saver = MemorySaver()
+    workflow = SimpleRagWorkflow(
+        FakeRetrieveDocumentTool(0, jitter=0, chunk="isi dokumen " * 20),
+        saver,
+        SimpleRagPrompt("friendly", "Kamu adalah customer service toko."),
+        llm_model="gpt-4o-mini",
+        include_short_memory=True,
+    )
+    workflow._llm = FakeLatencyChat(latency=0, jitter=0)
+    # Summaries are not part of this measurement
+    workflow.schedule_summary_refresh = lambda graph, thread_id: None
+
+    checkpoints = sorted({1, 10, 50, 100, 200, args.turns})
+    print(
+        f"{'turn':>5} {'messages':>9} {'turn ms':>9} {'writes KB':>10} {'blobs KB':>9}"
+    )
+    for turn in range(1, args.turns + 1):
+        before_writes, before_blobs = stored_bytes(saver, "bench")
+        state = SimpleRagState(messages=[], user_message=f"pertanyaan {turn}")
+        started = time.perf_counter()
+        result = await workflow.arun(state, "bench", ExecutionContext("bench"))
+        elapsed = time.perf_counter() - started
+        after_writes, after_blobs = stored_bytes(saver, "bench")
+        if turn in checkpoints:
+            print(
+                f"{turn:>5} {len(result['messages']):>9} {elapsed * 1000:>9.1f} "
+                f"{(after_writes - before_writes) / 1024:>10.1f} "
+                f"{(after_blobs - before_blobs) / 1024:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+Per message latency of sendMessage with a session per call vs the shared one.
+
+A local aiohttp server stands in for the Bot API. "per_call" opens a new
+ClientSession and connector for every message, which is what
+TelegramManager used to do; "shared" goes through TelegramManager and its
+keep-alive pool. The stub is plain HTTP on localhost, so the gap shown is
+only connection setup; against api.telegram.org every new connection also
+pays a DNS lookup and a TLS handshake. Run from the Backend directory:
+
+    python -m benchmarks.telegram_session --messages 500 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.fakes import percentile
+from src.infrastructure.telegram import TelegramManager
+
+
+async def send_message(request: web.Request) -> web.Response:
+    body = await request.json()
+    return web.json_response(
+        {"ok": True, "result": {"chat": {"id": body["chat_id"]}, "text": body["text"]}}
+    )
+
+
+async def start_stub() -> web.AppRunner:
+    app = web.Application()
+    app.router.add_post("/bot{token}/sendMessage", send_message)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+async def send_per_call(base_url: str, chat_id: int) -> None:
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=False),
+        timeout=aiohttp.ClientTimeout(total=10),
+    ) as session:
+        async with session.post(
+            f"{base_url}/botTOKEN/sendMessage",
+            json={"chat_id": chat_id, "text": "halo"},
+        ) as response:
+            await response.json()
+
+
+async def measure(name: str, send, args) -> None:
+    timings = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(chat_id: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await send(chat_id)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(args.messages)))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:<9} p50={percentile(timings, 50) * 1000:6.2f}ms "
+        f"p95={percentile(timings, 95) * 1000:6.2f}ms "
+        f"throughput={args.messages / elapsed:7.0f} msg/s"
+    )
+
+
+async def run(args) -> None:
+    runner = await start_stub()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+    manager = TelegramManager(base_url)
+    # Measure the connection handling, not Telegram's rate limits
+    manager.send_queue.bot_rate = manager.send_queue.chat_rate = 1e6
+    try:
+        await measure("per_call", lambda chat: send_per_call(base_url, chat), args)
+        await measure(
+            "shared",
+            lambda chat: manager.send_message("agent", "TOKEN", chat, "halo"),
+            args,
+        )
+    finally:
+        await manager.close()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
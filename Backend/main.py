@@ -1,3 +1,5 @@
+import asyncio
+
 import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
@@ -27,9 +29,14 @@ from src.config.config import settings
 from src.config.database import create_tables
 from src.config.limiter import limiter
 from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
 from src.core.utils.response import error_response
 from src.domain.events import event_handler
 from src.domain.events.redis_event import event_bus
+from src.domain.repositories import history_write_queue
+from src.infrastructure.ai.components import memory_write_queue
+from src.infrastructure.redis.checkpointer import setup_agent_checkpointer
+from src.infrastructure.telegram import telegram_manager, telegram_update_queue
 
 # Import all models to ensure they are registered with SQLAlchemy metadata
 # This ensures all tables are created during database initialization
@@ -107,6 +114,12 @@ async def startup_event():
         # Start Redis event bus
         await event_bus.start()
         logger.info("Redis event bus started")
+
+        # Create checkpoint indexes when agent state is kept in Redis
+        await setup_agent_checkpointer()
+
+        # Keep-alive connections to the Telegram Bot API
+        await telegram_manager.start()
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         raise
@@ -120,6 +133,19 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error stopping Redis event bus: {e}")
 
+    # Answer the Telegram updates already acknowledged to Telegram
+    finished = await telegram_update_queue.stop(30.0)
+    logger.info(f"Telegram update queue stopped (finished={finished})")
+    await telegram_manager.close()
+
+    # Write queued history messages before the process exits
+    flushed = await history_write_queue.stop(30.0)
+    logger.info(f"History write queue stopped (flushed={flushed})")
+
+    # Persist queued long-term memory writes before the process exits
+    flushed = await asyncio.to_thread(memory_write_queue.shutdown, 30.0)
+    logger.info(f"Long-term memory queue stopped (flushed={flushed})")
+
 
 # Global exception handlers
 @app.exception_handler(StarletteHTTPException)
@@ -161,6 +187,11 @@ async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
 
 
+@app.get("/metrics")
+async def metrics_snapshot():
+    return metrics.snapshot()
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -92,7 +92,11 @@ class AgentController(BaseController):
             self.handle_unexpected_error(e)
 
     async def invoke_agent_in_playground(
-        self, agent_id: str, invoke_request: InvokeAgentRequest, current_user: dict
+        self,
+        agent_id: str,
+        invoke_request: InvokeAgentRequest,
+        current_user: dict,
+        deadline: Optional[float] = None,
     ) -> InvokeAgentResponseData:
         """
         Invoke an agent with a user message.
@@ -101,6 +105,7 @@ class AgentController(BaseController):
             agent_id: ID of the agent to invoke
             invoke_request: Request containing message, username, and platform
             current_user: Current authenticated user from JWT
+            deadline: time.monotonic() by which the agent must answer
 
         Returns:
             InvokeAgentResponseData with agent response and metadata
@@ -120,6 +125,7 @@ class AgentController(BaseController):
                 username=username,
                 user_platform="api",
                 user_message=invoke_request.message,
+                deadline=deadline,
             )
 
             # Map result to response schema
@@ -141,11 +147,15 @@ class AgentController(BaseController):
             raise
 
     async def invoke_agent_with_api_key(
-        self, agent_id: str, api_key: str, payload: InvokeAgentApiRequest
+        self,
+        agent_id: str,
+        api_key: str,
+        payload: InvokeAgentApiRequest,
+        deadline: Optional[float] = None,
     ):
         try:
             invoke_agent = await self.agent_service.invoke_agent_api(
-                agent_id, api_key, payload
+                agent_id, api_key, payload, deadline
             )
             return InvokeAgentResponseData(
                 user_message=payload.message,
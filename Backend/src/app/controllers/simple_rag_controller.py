@@ -56,6 +56,15 @@ class SimpleRAGController(BaseController):
                     long_term_memory=agent_data.get("long_term_memory", False),
                     tone=agent_data.get("tone"),
                     base_prompt=agent_data.get("base_prompt"),
+                    speculative_retrieval=agent_data.get(
+                        "speculative_retrieval", False
+                    ),
+                    rag_mode=agent_data.get("rag_mode", "two_step"),
+                    hedge_requests=agent_data.get("hedge_requests", False),
+                    fallback_llm_provider=agent_data.get("fallback_llm_provider"),
+                    fallback_llm_model=agent_data.get("fallback_llm_model"),
+                    response_cache=agent_data.get("response_cache", False),
+                    response_cache_threshold=agent_data.get("response_cache_threshold"),
                 )
             except Exception as e:
                 raise ValueError(e)
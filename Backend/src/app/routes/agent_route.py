@@ -27,6 +27,7 @@ from src.app.validators.agent_schema import (
 )
 from src.config.database import get_db
 from src.config.limiter import limiter
+from src.core.utils.deadline import request_deadline
 from src.core.utils.response import success_response
 
 router = APIRouter(prefix="/api/agents", tags=["agents"])
@@ -123,9 +124,10 @@ async def invokeAgent(
     Returns:
         ResponseAPI: Success response with agent response and metadata
     """
+    deadline = request_deadline(request)
     controller = AgentController(db, request)
     result = await controller.invoke_agent_in_playground(
-        agent_id, invoke_request, current_user
+        agent_id, invoke_request, current_user, deadline
     )
     return success_response("Invoke agent is successfully", result)
 
@@ -146,8 +148,11 @@ async def invokeAgentApiKey(
     ),
     db: AsyncSession = Depends(get_db),
 ):
+    deadline = request_deadline(request)
     controller = AgentController(db, request)
-    result = await controller.invoke_agent_with_api_key(agent_id, api_key, payload)
+    result = await controller.invoke_agent_with_api_key(
+        agent_id, api_key, payload, deadline
+    )
     return success_response("Invoke agent is successfully", result)
 
 
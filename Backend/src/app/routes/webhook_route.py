@@ -1,40 +1,39 @@
-from fastapi import APIRouter, Depends, Request, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Request, status
 
 from src.app.controllers.webhook_controller import WebhookController
-from src.config.database import get_db
-from src.config.limiter import limiter
 from src.core.utils.response import success_response
 
 router = APIRouter(prefix="/api", tags=["integrations"])
 
 
 @router.post("/webhook/telegram/{agent_id}", status_code=status.HTTP_200_OK)
-async def telegram_webhook(
-    agent_id: str, request: Request, db: AsyncSession = Depends(get_db)
-):
-    try:
-        payload = await request.json()
-        message = payload.get("message", {})
-        chat = message.get("chat", {})
-        user = message.get("from", {})
+async def telegram_webhook(agent_id: str, request: Request):
+    # Telegram only waits a few seconds before redelivering the update, so
+    # the agent runs in the background and the update is acknowledged here
+    payload = await request.json()
+    message = payload.get("message", {})
+    chat = message.get("chat", {})
+    user = message.get("from", {})
 
-        chat_id = chat.get("id")
-        text = message.get("text")
-        username = user.get("first_name")
+    chat_id = chat.get("id")
+    text = message.get("text")
+    username = user.get("first_name")
 
-        if not all([chat_id, text, username]):
-            return success_response("Invalid payload")
+    if not all([chat_id, text, username]):
+        return success_response("Invalid payload")
 
-        data = {
-            "agent_id": agent_id,
-            "username": username,
-            "chat_id": chat_id,
-            "text": text,
-        }
-        controller = WebhookController(db, request)
-        await controller.invoke_telegram_agent(data)
-        return success_response("Successfully sent the message")
-    except Exception as e:
-        # Log the error if you have a logger
-        raise
+    data = {
+        "agent_id": agent_id,
+        "update_id": payload.get("update_id"),
+        "username": username,
+        "chat_id": chat_id,
+        "text": text,
+    }
+    controller = WebhookController()
+    if not controller.queue_telegram_update(data):
+        # Telegram redelivers the update later
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webhook queue is full, please retry later",
+        )
+    return success_response("Message queued")
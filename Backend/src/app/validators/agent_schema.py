@@ -28,6 +28,14 @@ class BaseAgentSchema(BaseModel):
 
 class CreateAgent(BaseAgentSchema):
     llm_provider: str
+    # Runtime options, stored with the agent object in Redis (not in MySQL)
+    speculative_retrieval: bool = False
+    rag_mode: Literal["two_step", "single_call", "routed"] = "two_step"
+    hedge_requests: bool = False
+    fallback_llm_provider: Optional[str] = None
+    fallback_llm_model: Optional[str] = None
+    response_cache: bool = False
+    response_cache_threshold: Optional[float] = None
 
     class Config:
         orm_mode = True
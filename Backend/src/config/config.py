@@ -1,3 +1,5 @@
+from typing import Dict, Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -16,6 +18,102 @@ class Settings(BaseSettings):
     REDIS_PORT: int
     REDIS_DB: int
 
+    # Where agent conversation state lives: "memory" (per worker) or "redis"
+    AGENT_CHECKPOINTER: Literal["memory", "redis"] = "memory"
+    AGENT_CHECKPOINT_TTL_MINUTES: int = 60 * 24 * 7
+    AGENT_CHECKPOINT_KEEP_LAST: int = 3
+    # The in-process saver forgets threads idle for the TTL above, and the
+    # least recently used ones past this many
+    AGENT_MEMORY_CHECKPOINT_MAX_THREADS: int = 10_000
+
+    # Overall time budget of one agent invocation (all LLM calls and retries)
+    AGENT_INVOCATION_TIMEOUT_SECONDS: float = 60.0
+    # Per stage ceilings inside that budget; a slow memory lookup is skipped,
+    # a slow retrieval answers without documents
+    AGENT_MEMORY_TIMEOUT_SECONDS: float = 3.0
+    AGENT_RETRIEVAL_TIMEOUT_SECONDS: float = 10.0
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    # Sent to the user (and stored with is_success=False) when the deadline passes
+    AGENT_TIMEOUT_FALLBACK_REPLY: str = (
+        "Maaf, saat ini kami sedang mengalami kendala. Silakan coba lagi sebentar lagi."
+    )
+
+    # Identical invocations (agent, user, message) arriving while one is in
+    # flight, or up to this many seconds after it finished, share its result
+    INVOKE_COALESCE_WINDOW_SECONDS: float = 3.0
+
+    # Write-behind of history + metadata rows: flushed every N ms or N rows.
+    # A full queue makes InvokeAgent write synchronously instead.
+    HISTORY_WRITE_FLUSH_INTERVAL_MS: int = 200
+    HISTORY_WRITE_BATCH_ROWS: int = 100
+    HISTORY_WRITE_MAX_PENDING: int = 5000
+
+    # User agent ids known to exist, skips the lookup on every invocation.
+    # "redis" shares them between workers, each worker keeps a local copy.
+    USER_AGENT_CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    USER_AGENT_CACHE_MAX_ENTRIES: int = 50_000
+    USER_AGENT_CACHE_TTL_SECONDS: int = 60 * 10
+
+    # Cached API key checks (per worker), revoking a key evicts it locally
+    API_KEY_CACHE_TTL_SECONDS: float = 60.0
+    API_KEY_NEGATIVE_CACHE_TTL_SECONDS: float = 10.0
+    API_KEY_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Shared keep-alive connection pool of the Telegram Bot API client
+    TELEGRAM_API_BASE_URL: str = "https://api.telegram.org"
+    TELEGRAM_MAX_CONNECTIONS: int = 100
+    TELEGRAM_MAX_CONNECTIONS_PER_HOST: int = 50
+    TELEGRAM_KEEPALIVE_SECONDS: float = 60.0
+    TELEGRAM_DNS_CACHE_SECONDS: int = 300
+
+    # Outbound sendMessage limits per bot (Telegram allows ~30/s per bot and
+    # ~1/s per chat); a 429 pauses the bot for its retry_after
+    TELEGRAM_BOT_MESSAGES_PER_SECOND: float = 30.0
+    TELEGRAM_CHAT_MESSAGES_PER_SECOND: float = 1.0
+    TELEGRAM_CHAT_BURST: int = 1
+    TELEGRAM_SEND_MAX_ATTEMPTS: int = 5
+    TELEGRAM_SEND_MAX_PENDING_PER_BOT: int = 1000
+
+    # Telegram replies start as a placeholder that is edited while the agent
+    # streams its answer, at most once per interval. Edits also take tokens
+    # of the send limits above, keep the interval >= 1 / chat rate.
+    TELEGRAM_STREAM_REPLIES: bool = True
+    TELEGRAM_STREAM_EDIT_INTERVAL_MS: int = 1000
+    TELEGRAM_STREAM_PLACEHOLDER: str = "..."
+
+    # Telegram webhook updates are acknowledged at once and run in the
+    # background: in order per chat, at most N at a time per bot
+    TELEGRAM_UPDATE_CONCURRENCY_PER_BOT: int = 4
+    TELEGRAM_UPDATE_MAX_PENDING: int = 1000
+    TELEGRAM_UPDATE_DEDUPE_TTL_SECONDS: float = 60 * 60
+    TELEGRAM_UPDATE_DEDUPE_MAX_ENTRIES: int = 50_000
+
+    # Rate shaping of LLM calls per provider/model, off by default (0 is
+    # unlimited). Enable it per "provider" or "provider/model" with
+    # LLM_RATE_LIMITS, sized to the provider account's quota, e.g.
+    # {"openai/gpt-4o-mini": {"rpm": 5000, "tpm": 2000000, "max_in_flight": 64}}
+    LLM_RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    LLM_DEFAULT_RPM: int = 0
+    LLM_DEFAULT_TPM: int = 0
+    LLM_MAX_IN_FLIGHT: int = 0
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {}
+    # Threads per provider for hedged calls. A losing attempt keeps its thread
+    # until the provider answers (up to LLM_REQUEST_TIMEOUT_SECONDS) and every
+    # hedged call can use two, so keep it at least 2 x the provider's
+    # max_in_flight when it has one: then the rate limiter, not this pool,
+    # queues the calls.
+    LLM_HEDGE_WORKERS_PER_PROVIDER: int = 64
+
+    # Opt-in per agent response cache (exact + embedding similarity tier)
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    RESPONSE_CACHE_MAX_SEMANTIC_ENTRIES: int = 200
+    RESPONSE_CACHE_EMBEDDING_MODEL: str = "text-embedding-3-small"
+
+    # Vector store of the long-term memory (mem0)
+    QDRANT_HOST: str = "localhost"
+    QDRANT_PORT: int = 6333
+
     OPENAI_API_KEY: str
     THIS_APP_URL: str
     FRONTEND_URL: str = "http://localhost:3000"
@@ -27,3 +27,16 @@ class InvalidApiKeyException(BaseCustomeException):
                 "value": api_key,
             },
         )
+
+
+class AgentDeadlineExceededException(BaseCustomeException):
+    def __init__(self, stage: str = "invocation"):
+        self.stage = stage
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "error": "AGENT_DEADLINE_EXCEEDED",
+                "message": "The agent took too long to respond",
+                "stage": stage,
+            },
+        )
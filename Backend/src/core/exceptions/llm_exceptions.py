@@ -0,0 +1,44 @@
+from fastapi import status
+
+from src.core.exceptions import BaseCustomeException
+
+
+class LLMProviderException(BaseCustomeException):
+    """Base HTTP exception for LLM provider related errors."""
+
+
+class CircuitOpenException(LLMProviderException):
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "LLM_PROVIDER_UNAVAILABLE",
+                "message": f"LLM provider {provider} ({model}) is temporarily unavailable",
+            },
+        )
+
+
+class LLMDeadlineExceededException(LLMProviderException):
+    def __init__(self, message: str = "The agent took too long to respond"):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "error": "LLM_DEADLINE_EXCEEDED",
+                "message": message,
+            },
+        )
+
+
+class LLMCallCancelledException(LLMProviderException):
+    """Raised inside a cancelled LLM call, e.g. a hedged call that lost the race."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=499,  # client closed request
+            detail={
+                "error": "LLM_CALL_CANCELLED",
+                "message": "LLM call was cancelled",
+            },
+        )
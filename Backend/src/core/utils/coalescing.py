@@ -0,0 +1,74 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Flight:
+    task: "asyncio.Task[Any]"
+    loop: asyncio.AbstractEventLoop
+
+
+class RequestCoalescer:
+    """
+    Share one execution between identical concurrent requests.
+
+    The first caller for a key starts the work; callers with the same key
+    that arrive while it runs, or within ``window_seconds`` after it
+    finished successfully, get the same result instead of running it again.
+    Failed results are forgotten right away so a retry runs for real.
+    In-process only, every worker coalesces its own requests.
+    """
+
+    def __init__(self, window_seconds: float = settings.INVOKE_COALESCE_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    async def run(
+        self,
+        key: Hashable,
+        work: Callable[[], Awaitable[Any]],
+        keep: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is not None and flight.loop is loop:
+            metrics.increment("invoke_coalesced_total")
+            logger.info(f"Request {key} attached to an in-flight execution")
+            # Shielded, a cancelled caller doesn't cancel the others' result
+            return await asyncio.shield(flight.task)
+
+        task = loop.create_task(work())
+        flight = self._flights[key] = _Flight(task, loop)
+        task.add_done_callback(lambda done: self._on_done(key, flight, keep))
+        return await asyncio.shield(task)
+
+    def _on_done(
+        self, key: Hashable, flight: _Flight, keep: Optional[Callable[[Any], bool]]
+    ) -> None:
+        task = flight.task
+        succeeded = (
+            not task.cancelled()
+            and task.exception() is None
+            and (keep is None or keep(task.result()))
+        )
+        if succeeded and self.window_seconds > 0:
+            flight.loop.call_later(self.window_seconds, self._forget, key, flight)
+        else:
+            self._forget(key, flight)
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+invoke_coalescer = RequestCoalescer()
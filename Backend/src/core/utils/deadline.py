@@ -0,0 +1,27 @@
+import time
+from typing import Optional
+
+from fastapi import Request
+
+from src.config.config import settings
+
+# Callers with their own timeout can ask for a shorter budget (seconds)
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+
+def request_deadline(request: Optional[Request] = None) -> float:
+    """
+    time.monotonic() by which the agent invocation of this request must end.
+
+    Starts when the route is entered, so time spent before the agent runs
+    (auth, database lookups) counts against the same budget.
+    """
+    timeout = settings.AGENT_INVOCATION_TIMEOUT_SECONDS
+    if request is not None:
+        try:
+            requested = float(request.headers.get(REQUEST_TIMEOUT_HEADER, timeout))
+            if requested > 0:
+                timeout = min(timeout, requested)
+        except ValueError:
+            pass
+    return time.monotonic() + timeout
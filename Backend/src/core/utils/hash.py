@@ -1,3 +1,4 @@
+import hashlib
 from typing import Any
 
 from passlib.context import CryptContext
@@ -12,3 +13,8 @@ class PasswordHashed:
 
     def verify_password(self, plain_password: str, hashed_password: Any) -> bool:
         return self.pwd_context.verify(plain_password, hashed_password)
+
+
+def hash_api_key(api_key: str) -> str:
+    """Fixed length (64 hex chars) SHA-256 of an API key, what the DB indexes."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
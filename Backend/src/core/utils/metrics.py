@@ -0,0 +1,96 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """
+    Small in-process metrics registry (counters, gauges and latency samples).
+
+    Metrics are identified by a name plus keyword labels, e.g.
+    ``metrics.increment("llm_retries_total", provider="openai")``.
+    Latency samples keep a bounded window so percentiles follow recent traffic.
+    """
+
+    def __init__(self, sample_window: int = 1024):
+        self.sample_window = sample_window
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = defaultdict(float)
+        self._gauges: Dict[LabelKey, float] = {}
+        self._samples: Dict[LabelKey, Deque[float]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _format(key: LabelKey) -> str:
+        name, labels = key
+        if not labels:
+            return name
+        return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.sample_window)
+            samples.append(value)
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def get_gauge(self, name: str, **labels: Any) -> Optional[float]:
+        with self._lock:
+            return self._gauges.get(self._key(name, labels))
+
+    def percentile(self, name: str, pct: float, **labels: Any) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(self._key(name, labels), ()))
+        return self._percentile(samples, pct)
+
+    def sample_count(self, name: str, **labels: Any) -> int:
+        with self._lock:
+            return len(self._samples.get(self._key(name, labels), ()))
+
+    @staticmethod
+    def _percentile(samples: list, pct: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {self._format(k): v for k, v in self._counters.items()}
+            gauges = {self._format(k): v for k, v in self._gauges.items()}
+            samples = {self._format(k): list(v) for k, v in self._samples.items()}
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "latencies": {
+                key: {
+                    "count": len(values),
+                    "p50": self._percentile(values, 50),
+                    "p95": self._percentile(values, 95),
+                    "p99": self._percentile(values, 99),
+                }
+                for key, values in samples.items()
+            },
+        }
+
+
+metrics = MetricsRegistry()
@@ -19,6 +19,8 @@ class ApiKey(Base):
         nullable=False,
     )
     api_key = sa.Column(sa.String(100), nullable=False)
+    # SHA-256 of api_key, API invocations look keys up by this
+    api_key_hash = sa.Column(sa.CHAR(64), nullable=False, unique=True, index=True)
     expires_at = sa.Column(sa.DateTime(timezone=True), nullable=False)
     created_at = sa.Column(sa.DateTime(timezone=True), server_default=sa.func.now())
 
@@ -17,6 +17,11 @@ class Metadata(Base):
     response_time = sa.Column(sa.Float, nullable=False)
     model = sa.Column(sa.Enum("gpt-3.5-turbo", "gpt-4o"))
     is_success = sa.Column(sa.Boolean, nullable=False, server_default=sa.text("1"))
+    # Input tokens read from / written to the provider's prompt cache
+    cached_tokens = sa.Column(sa.Integer, nullable=False, server_default=sa.text("0"))
+    cache_creation_tokens = sa.Column(
+        sa.Integer, nullable=False, server_default=sa.text("0")
+    )
 
     history_message = relationship("HistoryMessage", back_populates="message_metadata")
 
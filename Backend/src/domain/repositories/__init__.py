@@ -2,6 +2,7 @@ from .agent_repository import AgentRepository
 from .api_key_repository import ApiKeyRepository
 from .document_repository import DocumentRepository
 from .history_message_repository import HistoryMessageRepository
+from .history_write_queue import HistoryWriteQueue, history_write_queue
 from .integration_repository import IntegrationRepository
 from .metadata_repository import MetadataRepository
 from .platform_repository import PlatformRepository
@@ -18,4 +19,6 @@ __all__ = [
     "PlatformRepository",
     "IntegrationRepository",
     "ApiKeyRepository",
+    "HistoryWriteQueue",
+    "history_write_queue",
 ]
@@ -4,6 +4,7 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.utils.hash import hash_api_key
 from src.domain.models.api_key_entity import ApiKey
 from src.domain.models.integration_entity import Integration
 from src.domain.models.platform_entity import Platform
@@ -28,7 +29,11 @@ class ApiKeyRepository(IApiKeyRepository):
         expires_at: datetime | None = None,
     ) -> ApiKey:
         new_api_key = ApiKey(
-            user_id=user_id, agent_id=agent_id, api_key=api_key, expires_at=expires_at
+            user_id=user_id,
+            agent_id=agent_id,
+            api_key=api_key,
+            api_key_hash=hash_api_key(api_key),
+            expires_at=expires_at,
         )
 
         self.db.add(new_api_key)
@@ -38,7 +43,7 @@ class ApiKeyRepository(IApiKeyRepository):
 
     async def get_active_api_key(self, agent_id: str, api_key: str) -> ApiKey | None:
         query = select(ApiKey).where(
-            ApiKey.api_key == api_key,
+            ApiKey.api_key_hash == hash_api_key(api_key),
             ApiKey.agent_id == agent_id,
             ApiKey.expires_at > datetime.utcnow(),
         )
@@ -0,0 +1,153 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.config import settings
+from src.config.database import AsyncSessionLocal
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+from src.domain.models.history_entity import HistoryMessage
+from src.domain.models.metadata_entity import Metadata
+from src.domain.use_cases.interfaces import HistoryRecord, IHistoryWriteQueue
+
+logger = get_logger(__name__)
+
+
+class HistoryWriteQueue(IHistoryWriteQueue):
+    """
+    Write-behind queue for history messages and their metadata.
+
+    InvokeAgent submits each turn and returns the reply right away; a
+    background task writes the queued turns every ``flush_interval_ms`` or
+    as soon as ``max_batch_rows`` are waiting. A batch is one transaction
+    holding every history row together with its metadata row. If the batch
+    fails its rows are retried one by one so a single bad row only loses
+    itself. The queue is bounded, ``submit`` returns False when it is full
+    or stopping and the caller writes synchronously. ``stop`` flushes
+    everything that is still queued.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        flush_interval_ms: int = settings.HISTORY_WRITE_FLUSH_INTERVAL_MS,
+        max_batch_rows: int = settings.HISTORY_WRITE_BATCH_ROWS,
+        max_pending: int = settings.HISTORY_WRITE_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch_rows = max_batch_rows
+        self.max_pending = max_pending
+
+        self._pending: List[HistoryRecord] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def submit(self, record: HistoryRecord) -> bool:
+        if self._stopping or len(self._pending) >= self.max_pending:
+            metrics.increment("history_write_rejected_total")
+            return False
+
+        self._ensure_flusher()
+        self._pending.append(record)
+        metrics.set_gauge("history_write_queue_depth", len(self._pending))
+        if len(self._pending) >= self.max_batch_rows:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> None:
+        self._ensure_flusher()
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[: self.max_batch_rows]
+                del self._pending[: self.max_batch_rows]
+                metrics.set_gauge("history_write_queue_depth", len(self._pending))
+                await self._write(batch)
+
+    async def stop(self, timeout: float = 30.0) -> bool:
+        """Stop accepting turns and write the queued ones, False on timeout."""
+        self._stopping = True
+        flushed = True
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            flushed = False
+            logger.warning(
+                f"History write queue stopped with {len(self._pending)} rows pending"
+            )
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        return flushed
+
+    def _ensure_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Asyncio primitives belong to one loop, e.g. a new one per test
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flusher = None
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"History write flush failed: {e}")
+
+    async def _write(self, batch: List[HistoryRecord]) -> None:
+        try:
+            async with self.session_factory() as session:
+                session.add_all([self._to_entity(record) for record in batch])
+                await session.commit()
+            metrics.increment("history_write_rows_total", len(batch))
+            return
+        except Exception as e:
+            logger.warning(
+                f"History batch of {len(batch)} rows failed, retrying one by one: {e}"
+            )
+
+        for record in batch:
+            try:
+                async with self.session_factory() as session:
+                    session.add(self._to_entity(record))
+                    await session.commit()
+                metrics.increment("history_write_rows_total")
+            except Exception as e:
+                metrics.increment("history_write_dropped_total")
+                logger.error(f"Dropped history message of {record.user_agent_id}: {e}")
+
+    @staticmethod
+    def _to_entity(record: HistoryRecord) -> HistoryMessage:
+        return HistoryMessage(
+            user_agent_id=record.user_agent_id,
+            user_message=record.user_message,
+            response=record.response,
+            message_metadata=Metadata(
+                total_tokens=record.total_tokens,
+                response_time=record.response_time,
+                model=record.model,
+                is_success=record.is_success,
+                cached_tokens=record.cached_tokens,
+                cache_creation_tokens=record.cache_creation_tokens,
+            ),
+        )
+
+
+history_write_queue = HistoryWriteQueue()
@@ -22,6 +22,8 @@ class MetadataRepository(IMetadata):
         response_time: float,
         model: str,
         is_success: bool = True,
+        cached_tokens: int = 0,
+        cache_creation_tokens: int = 0,
     ) -> Metadata:
         new_message_metadata = Metadata(
             history_message_id=history_message_id,
@@ -29,6 +31,8 @@ class MetadataRepository(IMetadata):
             response_time=response_time,
             model=model,
             is_success=is_success,
+            cached_tokens=cached_tokens,
+            cache_creation_tokens=cache_creation_tokens,
         )
 
         self.db.add(new_message_metadata)
@@ -1,6 +1,7 @@
 from typing import Literal
 
 from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.models.user_agent_entity import UserAgent
@@ -31,3 +32,18 @@ class UserAgentRepository(IUserAgentRepository):
         await self.db.flush()
 
         return new_user_agent
+
+    async def upsert_user_agent(
+        self,
+        id: str,
+        agent_id: str,
+        username: str,
+        user_platform: Literal["telegram"] | Literal["whatsapp"] | Literal["api"],
+    ) -> None:
+        """Insert the user agent, a no-op when it already exists."""
+        statement = mysql_insert(UserAgent).values(
+            id=id, agent_id=agent_id, username=username, user_platform=user_platform
+        )
+        # ON DUPLICATE KEY keeps foreign key errors, unlike INSERT IGNORE
+        statement = statement.on_duplicate_key_update(id=statement.inserted.id)
+        await self.db.execute(statement)
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,6 +18,7 @@ from src.core.exceptions.agent_exceptions import (
 )
 from src.core.exceptions.database_exceptions import DatabaseException
 from src.core.exceptions.integration_exceptions import IntegrationNotFoundException
+from src.core.utils.coalescing import invoke_coalescer
 from src.domain.repositories import (
     AgentRepository,
     ApiKeyRepository,
@@ -25,6 +26,7 @@ from src.domain.repositories import (
     IntegrationRepository,
     MetadataRepository,
     UserAgentRepository,
+    history_write_queue,
 )
 from src.domain.service.base import BaseService
 from src.domain.use_cases.agent import (
@@ -47,7 +49,10 @@ from src.domain.use_cases.agent import (
 )
 from src.infrastructure.ai.agents import BaseAgentStateModel
 from src.infrastructure.data import agent_manager
+from src.infrastructure.redis.api_key_cache import api_key_cache
 from src.infrastructure.redis.redis_storage import RedisStorage
+from src.infrastructure.redis.response_cache import response_cache
+from src.infrastructure.redis.user_agent_cache import user_agent_cache
 
 
 class AgentService(BaseService):
@@ -74,7 +79,9 @@ class AgentService(BaseService):
             self.format_agent_data_use_case,
             self.calculate_stats_use_case,
         )
-        self.delete_agent_use_case = DeleteAgentUseCase(self.agent_repo)
+        self.delete_agent_use_case = DeleteAgentUseCase(
+            self.agent_repo, user_agent_cache, api_key_cache
+        )
 
         # Invoke agent
         self.store_agent_in_memory = StoreAgentInMemory(agent_manager)
@@ -96,11 +103,15 @@ class AgentService(BaseService):
             agent_manager,
             self.storage_agent_obj,
             self.initial_agent_again,
+            response_cache,
+            invoke_coalescer,
+            history_write_queue,
+            user_agent_cache,
         )
 
         # Invoke agent with api key
         self.invoke_agent_apikey_usecase = InvokeAgentApi(
-            self.apikey_repo, self.invoke_agent_use_case
+            self.apikey_repo, self.invoke_agent_use_case, api_key_cache
         )
 
     async def get_all_agents(self, page: int, limit: int) -> AgentPaginateOut:
@@ -182,6 +193,7 @@ class AgentService(BaseService):
         username: str,
         user_platform: Literal["telegram", "whatsapp", "api"],
         user_message: str,
+        deadline: Optional[float] = None,
     ):
         """
         Invoke an agent with user message.
@@ -191,6 +203,7 @@ class AgentService(BaseService):
             username: Username of the user invoking the agent
             user_platform: Platform where the user is invoking from
             user_message: Message from the user
+            deadline: time.monotonic() by which the agent must answer
 
         Returns:
             InvokeAgentOutput with response and metadata
@@ -219,6 +232,7 @@ class AgentService(BaseService):
                     username,
                     user_platform,
                     BaseAgentStateModel(messages=[], user_message=user_message),
+                    deadline,
                 )
             )
 
@@ -253,7 +267,11 @@ class AgentService(BaseService):
             raise
 
     async def invoke_agent_api(
-        self, agent_id: str, api_key: str, payload: InvokeAgentApiRequest
+        self,
+        agent_id: str,
+        api_key: str,
+        payload: InvokeAgentApiRequest,
+        deadline: Optional[float] = None,
     ):
         try:
             # Check integration is exist
@@ -275,6 +293,7 @@ class AgentService(BaseService):
                     payload.message,
                     api_key,
                     BaseAgentStateModel(messages=[], user_message=payload.message),
+                    deadline,
                 )
             )
             if not invoke_agent.is_success():
@@ -21,6 +21,7 @@ from src.domain.use_cases.agent import (
     UploadedDocumentHandler,
     UploadedDocumentInput,
 )
+from src.infrastructure.redis.response_cache import response_cache
 from src.infrastructure.vector_store.chroma_db import RAGSystem
 
 
@@ -32,6 +33,7 @@ class DocumentService(BaseService):
         self.save_file = SaveFileHandler()
 
         self.vector_store = RAGSystem("chroma_db")
+        self.response_cache = response_cache
 
         # Use Cases
         self.uploaded_document_handler_usecase = UploadedDocumentHandler(
@@ -119,6 +121,8 @@ class DocumentService(BaseService):
                     "Add document to agent use case does not returned data"
                 )
             await self.db.commit()
+            # Cached answers were based on the old documents
+            await self.response_cache.invalidate(payload.agent_id)
             return AddDocumentResponseData(
                 agent_id=payload.agent_id,
                 filename=document_data.file_name,
@@ -155,6 +159,7 @@ class DocumentService(BaseService):
                 raise RuntimeError("Delete document use case does not returned data")
 
             await self.db.commit()
+            await self.response_cache.invalidate(payload.agent_id)
             return result
         except DocumentNotFound as e:
             self.logger.warning(e)
@@ -30,6 +30,7 @@ from src.domain.use_cases.agent import (
     TelegramIntegration,
     TelegramIntegrationInput,
 )
+from src.infrastructure.redis.api_key_cache import api_key_cache
 from src.infrastructure.telegram import telegram_manager
 
 
@@ -54,7 +55,7 @@ class IntegrationService(BaseService):
             self.api_key_repository, self.integration_repository, telegram_manager
         )
         self.delete_api_integration_usecase = DeleteApiIntegration(
-            self.integration_repository, self.api_key_repository
+            self.integration_repository, self.api_key_repository, api_key_cache
         )
         self.get_all_integration_by_agent_id_usecase = GetAllIntegrationByAgentId(
             self.integration_repository
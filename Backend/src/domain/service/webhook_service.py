@@ -1,16 +1,23 @@
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.app.validators.telegram_schema import TelegramSendMessage
+from src.config.config import settings
+from src.config.database import AsyncSessionLocal
 from src.core.exceptions.integration_exceptions import (
     TelegramApiKeyNotFound,
     TelegramResponseException,
 )
+from src.core.utils.coalescing import invoke_coalescer
+from src.core.utils.deadline import request_deadline
 from src.domain.repositories import (
     AgentRepository,
     ApiKeyRepository,
     HistoryMessageRepository,
     MetadataRepository,
     UserAgentRepository,
+    history_write_queue,
 )
 from src.domain.service.base import BaseService
 from src.domain.use_cases.agent import (
@@ -23,11 +30,15 @@ from src.domain.use_cases.agent import (
     InvokeAgentInput,
     SendTelegramUserMessage,
     SendTelegramUserMessageInput,
+    StartTelegramReplyStream,
+    StartTelegramReplyStreamInput,
     StoreAgentInMemory,
 )
 from src.infrastructure.ai.agents import BaseAgentStateModel
 from src.infrastructure.data import agent_manager
 from src.infrastructure.redis.redis_storage import RedisStorage
+from src.infrastructure.redis.response_cache import response_cache
+from src.infrastructure.redis.user_agent_cache import user_agent_cache
 from src.infrastructure.telegram import telegram_manager
 
 
@@ -61,14 +72,32 @@ class WebhookService(BaseService):
             agent_manager,
             self.storage_agent_obj,
             self.initial_agent_again,
+            response_cache,
+            invoke_coalescer,
+            history_write_queue,
+            user_agent_cache,
         )
 
         self.send_telegram_user_message_usecase = SendTelegramUserMessage(
             self.api_key_repo, telegram_manager
         )
+        self.start_telegram_reply_stream = StartTelegramReplyStream(
+            self.api_key_repo, telegram_manager
+        )
 
-    async def invoked_agent_and_send_to_telegram(self, payload: TelegramSendMessage):
+    async def invoked_agent_and_send_to_telegram(
+        self, payload: TelegramSendMessage, deadline: Optional[float] = None
+    ):
+        reply_stream = None
         try:
+            # The user sees a placeholder right away, edited as the answer streams
+            if settings.TELEGRAM_STREAM_REPLIES:
+                started = await self.start_telegram_reply_stream.execute(
+                    StartTelegramReplyStreamInput(payload.agent_id, payload.chat_id)
+                )
+                if started.is_success():
+                    reply_stream = started.get_data()
+
             invoked_agent = await self.invoke_agent_use_case.execute(
                 InvokeAgentInput(
                     payload.agent_id,
@@ -76,6 +105,8 @@ class WebhookService(BaseService):
                     payload.username,
                     "telegram",
                     BaseAgentStateModel(messages=[], user_message=payload.text),
+                    deadline,
+                    reply_stream.update if reply_stream else None,
                 )
             )
 
@@ -93,7 +124,7 @@ class WebhookService(BaseService):
 
             sending_message = await self.send_telegram_user_message_usecase.execute(
                 SendTelegramUserMessageInput(
-                    payload.agent_id, payload.chat_id, response.response
+                    payload.agent_id, payload.chat_id, response.response, reply_stream
                 )
             )
 
@@ -116,3 +147,26 @@ class WebhookService(BaseService):
                 f"Unexpexted error while invoked agent and sending to telegram: {str(e)}"
             )
             raise TelegramResponseException()
+        finally:
+            if reply_stream is not None and not reply_stream.is_finished:
+                # Don't leave the placeholder hanging, this also ends its task
+                await self._finish_reply_stream(reply_stream)
+
+    async def _finish_reply_stream(self, reply_stream) -> None:
+        try:
+            await reply_stream.finish(settings.AGENT_TIMEOUT_FALLBACK_REPLY)
+        except Exception as e:
+            self.logger.error(f"Failed to finish the telegram reply stream: {str(e)}")
+
+
+async def process_telegram_update(payload: TelegramSendMessage) -> None:
+    """
+    Run one queued Telegram update with its own database session.
+
+    The deadline starts here rather than at the webhook, the time spent
+    waiting behind earlier messages of the chat doesn't count against it.
+    """
+    async with AsyncSessionLocal() as db:
+        await WebhookService(db).invoked_agent_and_send_to_telegram(
+            payload, request_deadline()
+        )
@@ -69,6 +69,8 @@ from .integration import (
     GetAllIntegrationByAgentIdInput,
     SendTelegramUserMessage,
     SendTelegramUserMessageInput,
+    StartTelegramReplyStream,
+    StartTelegramReplyStreamInput,
     TelegramIntegration,
     TelegramIntegrationInput,
 )
@@ -153,6 +155,8 @@ __all__ = [
     "TelegramIntegrationInput",
     "SendTelegramUserMessageInput",
     "SendTelegramUserMessage",
+    "StartTelegramReplyStream",
+    "StartTelegramReplyStreamInput",
     "GetAllIntegrationByAgentId",
     "GetAllIntegrationByAgentIdInput",
     "DeleteDocument",
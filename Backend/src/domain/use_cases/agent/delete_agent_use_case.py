@@ -3,10 +3,15 @@ Use case for deleting an agent.
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
 from src.app.validators.agent_schema import BaseAgentSchema
 from src.domain.use_cases.base import BaseUseCase, UseCaseResult
-from src.domain.use_cases.interfaces import IAgentRepository
+from src.domain.use_cases.interfaces import (
+    IAgentRepository,
+    IApiKeyCache,
+    IUserAgentCache,
+)
 
 
 @dataclass
@@ -31,8 +36,15 @@ class DeleteAgentUseCase(BaseUseCase[DeleteAgentInput, DeleteAgentOutput]):
     and returning the deleted agent information.
     """
 
-    def __init__(self, agent_repository: IAgentRepository):
+    def __init__(
+        self,
+        agent_repository: IAgentRepository,
+        user_agent_cache: Optional[IUserAgentCache] = None,
+        api_key_cache: Optional[IApiKeyCache] = None,
+    ):
         self.agent_repository = agent_repository
+        self.user_agent_cache = user_agent_cache
+        self.api_key_cache = api_key_cache
 
     def validate_input(self, input_data: DeleteAgentInput) -> UseCaseResult[None]:
         """Validate input data."""
@@ -72,6 +84,13 @@ class DeleteAgentUseCase(BaseUseCase[DeleteAgentInput, DeleteAgentOutput]):
             if not deleted_agent:
                 return UseCaseResult.not_found_error("Agent", input_data.agent_id)
 
+            # Its user agents are deleted by the cascade
+            if self.user_agent_cache is not None:
+                await self.user_agent_cache.invalidate_agent(input_data.agent_id)
+            # and so are its API keys
+            if self.api_key_cache is not None:
+                self.api_key_cache.evict_agent(input_data.agent_id)
+
             # Convert to schema
             agent_schema = BaseAgentSchema(
                 id=deleted_agent.id,
@@ -11,6 +11,8 @@ class CreateMetadataInput:
     response_time: float
     model: str
     is_success: bool = True
+    cached_tokens: int = 0
+    cache_creation_tokens: int = 0
 
 
 @dataclass
@@ -32,6 +34,8 @@ class CreateMetadata(BaseUseCase[CreateMetadataInput, CreateMetadataOutput]):
                 input_data.response_time,
                 input_data.model,
                 input_data.is_success,
+                input_data.cached_tokens,
+                input_data.cache_creation_tokens,
             )
 
             return UseCaseResult.success_result(CreateMetadataOutput(new_metadata.id))
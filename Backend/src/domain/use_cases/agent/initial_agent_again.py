@@ -43,6 +43,13 @@ class InitialAgentAgain(BaseUseCase[InitialAgentAgainInput, InitialAgentAgainOut
                         input_data.agent_obj.get("base_prompt"),
                         input_data.agent_obj.get("short_memory"),
                         input_data.agent_obj.get("long_memory"),
+                        bool(input_data.agent_obj.get("speculative_retrieval", False)),
+                        input_data.agent_obj.get("rag_mode", "two_step"),
+                        bool(input_data.agent_obj.get("hedge_requests", False)),
+                        input_data.agent_obj.get("fallback_llm_provider"),
+                        input_data.agent_obj.get("fallback_llm_model"),
+                        bool(input_data.agent_obj.get("response_cache", False)),
+                        input_data.agent_obj.get("response_cache_threshold"),
                     )
                 )
 
@@ -14,6 +14,10 @@ from .telegram.send_telegram_user_message import (
     SendTelegramUserMessageInput,
     SendTelegramUserMessageOutput,
 )
+from .telegram.start_telegram_reply_stream import (
+    StartTelegramReplyStream,
+    StartTelegramReplyStreamInput,
+)
 from .telegram.telegram_integration import TelegramIntegration, TelegramIntegrationInput
 from .telegram.delete_telegram_integration import (
     DeleteTelegramIntegration,
@@ -47,6 +51,8 @@ __all__ = [
     "SendTelegramUserMessage",
     "SendTelegramUserMessageInput",
     "SendTelegramUserMessageOutput",
+    "StartTelegramReplyStream",
+    "StartTelegramReplyStreamInput",
     "DeleteTelegramIntegration",
     "DeleteTelegramIntegrationInput",
     "DeleteTelegramIntegrationOutput",
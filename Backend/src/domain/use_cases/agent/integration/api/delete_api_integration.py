@@ -1,9 +1,13 @@
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, Optional
 
 from src.core.exceptions.integration_exceptions import IntegrationNotFoundException
 from src.domain.use_cases.base import BaseUseCase, UseCaseResult
-from src.domain.use_cases.interfaces import IApiKeyRepository, IIntergrationRepository
+from src.domain.use_cases.interfaces import (
+    IApiKeyCache,
+    IApiKeyRepository,
+    IIntergrationRepository,
+)
 
 
 @dataclass
@@ -24,9 +28,11 @@ class DeleteApiIntegration(
         self,
         integration_repository: IIntergrationRepository,
         api_key_repository: IApiKeyRepository,
+        api_key_cache: Optional[IApiKeyCache] = None,
     ):
         self.integration_repository = integration_repository
         self.api_key_repository = api_key_repository
+        self.api_key_cache = api_key_cache
 
     async def execute(
         self, input_data: DeleteApiIntegrationInput
@@ -45,6 +51,9 @@ class DeleteApiIntegration(
             await self.api_key_repository.delete_api_key_by_agent_id(
                 input_data.agent_id
             )
+            # The revoked key must stop working right away on this worker
+            if self.api_key_cache is not None:
+                self.api_key_cache.evict_agent(input_data.agent_id)
             return UseCaseResult.success_result(
                 DeleteApiIntegrationOutput(success=True)
             )
@@ -1,12 +1,12 @@
 from dataclasses import dataclass
-from typing import Any, Literal
+from typing import Any, Literal, Optional
 
 import aiohttp
 
 from src.core.exceptions.integration_exceptions import TelegramApiKeyNotFound
 from src.domain.use_cases.base import BaseUseCase, UseCaseResult
 from src.domain.use_cases.interfaces import IApiKeyRepository
-from src.infrastructure.telegram import TelegramManager
+from src.infrastructure.telegram import TelegramManager, TelegramReplyStream
 
 
 @dataclass
@@ -14,6 +14,8 @@ class SendTelegramUserMessageInput:
     agent_id: str
     chat_id: str | int
     message: str
+    # Started by StartTelegramReplyStream, the message replaces its placeholder
+    reply_stream: Optional[TelegramReplyStream] = None
 
 
 @dataclass
@@ -34,6 +36,17 @@ class SendTelegramUserMessage(
         self, input_data: SendTelegramUserMessageInput
     ) -> UseCaseResult[SendTelegramUserMessageOutput]:
         try:
+            if input_data.reply_stream is not None:
+                send_message = await input_data.reply_stream.finish(input_data.message)
+                if not send_message["status"]:
+                    return UseCaseResult.error_result(
+                        "Failed to send telegram message",
+                        RuntimeError("Failed to send telegram message"),
+                    )
+                return UseCaseResult.success_result(
+                    SendTelegramUserMessageOutput(send_message["status"])
+                )
+
             telegram_api_key = (
                 await self.api_key_repository.get_telegram_api_key_by_agent_id(
                     input_data.agent_id
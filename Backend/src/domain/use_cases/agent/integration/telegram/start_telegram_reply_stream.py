@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+
+from src.core.exceptions.integration_exceptions import TelegramApiKeyNotFound
+from src.domain.use_cases.base import BaseUseCase, UseCaseResult
+from src.domain.use_cases.interfaces import IApiKeyRepository
+from src.infrastructure.telegram import TelegramManager, TelegramReplyStream
+
+
+@dataclass
+class StartTelegramReplyStreamInput:
+    agent_id: str
+    chat_id: str | int
+
+
+class StartTelegramReplyStream(
+    BaseUseCase[StartTelegramReplyStreamInput, TelegramReplyStream]
+):
+    """Send the placeholder of a progressive reply, see TelegramReplyStream."""
+
+    def __init__(
+        self, api_key_repository: IApiKeyRepository, telegram_manager: TelegramManager
+    ):
+        self.api_key_repository = api_key_repository
+        self.telegram_manager = telegram_manager
+
+    async def execute(
+        self, input_data: StartTelegramReplyStreamInput
+    ) -> UseCaseResult[TelegramReplyStream]:
+        try:
+            telegram_api_key = (
+                await self.api_key_repository.get_telegram_api_key_by_agent_id(
+                    input_data.agent_id
+                )
+            )
+            if not telegram_api_key:
+                return UseCaseResult.error_result(
+                    "Telegram api key not found", TelegramApiKeyNotFound()
+                )
+
+            reply_stream = self.telegram_manager.reply_stream(
+                input_data.agent_id, telegram_api_key, input_data.chat_id
+            )
+            return UseCaseResult.success_result(reply_stream.start())
+        except Exception as e:
+            return UseCaseResult.error_result(
+                f"Unexpected error while starting telegram reply: {str(e)}", e
+            )
@@ -1,15 +1,26 @@
+import hashlib
+import time
 from dataclasses import dataclass
-from typing import Literal
+from typing import Callable, Literal, Optional, Tuple
 
+from src.config.config import settings
 from src.core.exceptions.agent_exceptions import AgentNotFoundException
+from src.core.utils.coalescing import RequestCoalescer
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
 from src.domain.use_cases.base import BaseUseCase, UseCaseResult
 from src.domain.use_cases.interfaces import (
+    HistoryRecord,
+    IAgentManager,
     IAgentRepository,
+    IHistoryWriteQueue,
+    IResponseCache,
     IStorageAgentObj,
+    IUserAgentCache,
     IUserAgentRepository,
 )
-from src.infrastructure.ai.agents import BaseAgentStateModel
-from src.infrastructure.data import AgentManager
+from src.infrastructure.ai.agents import AgentExecutionResult, BaseAgentStateModel
+from src.infrastructure.ai.components import UsageLedger
 
 from ..history_message import (
     CreateHistoryMessage,
@@ -23,6 +34,8 @@ from ..user_agent import (
     CreateUserAgentInput,
 )
 
+logger = get_logger(__name__)
+
 
 @dataclass
 class InvokeAgentInput:
@@ -31,6 +44,10 @@ class InvokeAgentInput:
     username: str
     user_platform: Literal["telegram", "whatsapp", "api"]
     state_input: BaseAgentStateModel
+    # time.monotonic() set by the route; None uses the agent's default timeout
+    deadline: Optional[float] = None
+    # Gets the reply generated so far while the agent streams it
+    on_partial_response: Optional[Callable[[str], None]] = None
 
 
 @dataclass
@@ -39,6 +56,8 @@ class InvokeAgentOutput:
     response: str
     total_tokens: int | float
     response_time: int | float
+    # False when the deadline passed and the fallback reply was sent
+    is_success: bool = True
 
 
 class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
@@ -49,9 +68,13 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
         create_user_agent: CreateUserAgent,
         create_history_message: CreateHistoryMessage,
         create_metadata: CreateMetadata,
-        agent_manager: AgentManager,
+        agent_manager: IAgentManager,
         storage_agent_obj: IStorageAgentObj,
         initial_agent_again: InitialAgentAgain,
+        response_cache: Optional[IResponseCache] = None,
+        coalescer: Optional[RequestCoalescer] = None,
+        history_write_queue: Optional[IHistoryWriteQueue] = None,
+        user_agent_cache: Optional[IUserAgentCache] = None,
     ):
         self.agent_repository = agent_repository
         self.user_agent_repository = user_agent_repository
@@ -61,6 +84,10 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
         self.agent_manager = agent_manager
         self.store_agent_obj = storage_agent_obj
         self.initial_agent_again = initial_agent_again
+        self.response_cache = response_cache
+        self.coalescer = coalescer
+        self.history_write_queue = history_write_queue
+        self.user_agent_cache = user_agent_cache
 
     async def execute(
         self, input_data: InvokeAgentInput
@@ -69,12 +96,19 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
             # Is user agent exist
 
             user_agent_id = input_data.agent_id + input_data.unique_id
-            user_agent_data = await self.user_agent_repository.get_user_agent_by_id(
-                user_agent_id
-            )
-            print(f"USER_AGENT_DATA: {user_agent_data}")
+            created_user_agent = False
+            if self.user_agent_cache is not None:
+                # Known ids are committed rows, no lookup needed. Unknown ones
+                # go straight to the upsert below, no read first.
+                user_agent_data = await self.user_agent_cache.contains(
+                    input_data.agent_id, user_agent_id
+                )
+            else:
+                user_agent_data = await self.user_agent_repository.get_user_agent_by_id(
+                    user_agent_id
+                )
             if not user_agent_data:
-                # Create user agent
+                # Create user agent (upsert, concurrent first messages are fine)
                 new_user_agent = await self.create_user_agent.execute(
                     CreateUserAgentInput(
                         input_data.agent_id,
@@ -95,14 +129,11 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
                     )
 
                 user_agent_id = user_agent_data.id
+                created_user_agent = True
 
             # Get agent in agent manager
             agent = self.agent_manager.get_agent_in_memory(input_data.agent_id)
-            print(
-                f"ALL AGENTS IN MEMORY: {self.agent_manager.get_all_agents_in_memory()}"
-            )
             if not agent:
-                print("AGENT DOESNT EXISTTTT")
                 # if agent doens't exist, get agent from storage obj
                 get_agent_from_storage_obj = await self.store_agent_obj.get_agent(
                     input_data.agent_id
@@ -135,50 +166,96 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
 
                 agent = get_agent.agent
 
-            agent.execute(input_data.state_input, user_agent_id)
-
-            # get agent response
-            response = agent.get_response()
+            user_message = input_data.state_input.user_message
+            cacheable = self.response_cache is not None and agent.is_cacheable_turn(
+                user_message
+            )
+            started_at = time.perf_counter()
+            cached_response = (
+                await self.response_cache.get(
+                    input_data.agent_id, user_message, agent.response_cache_threshold
+                )
+                if cacheable
+                else None
+            )
 
-            if response is None:
-                return UseCaseResult.error_result(
-                    "The agent did not response",
-                    RuntimeError("The agent did not response"),
+            if cached_response is not None:
+                # Cache hit: no LLM call, recorded with 0 tokens
+                response = cached_response
+                total_tokens = 0
+                usage = UsageLedger()
+                response_time = round(time.perf_counter() - started_at, 2)
+                llm_model = agent.get_llm_model()
+                is_success = True
+                try:
+                    await agent.arecord_turn(user_agent_id, user_message, response)
+                except Exception as e:
+                    # The reply is already known, only the agent's memory misses it
+                    logger.error(
+                        f"Failed to record cached turn of {user_agent_id}: {e}"
+                    )
+            else:
+                execution, shared = await self._run_agent(
+                    agent, input_data, user_agent_id
                 )
 
-            # get agent token usage
-            total_tokens = agent.get_token_usage()
+                # get agent response
+                response = execution.response
+                is_success = execution.is_success
 
-            # get agent response time
-            response_time = agent.get_response_time()
+                if not is_success:
+                    # Deadline exceeded, reply with the fallback instead of an error
+                    response = settings.AGENT_TIMEOUT_FALLBACK_REPLY
+                elif response is None:
+                    return UseCaseResult.error_result(
+                        "The agent did not response",
+                        RuntimeError("The agent did not response"),
+                    )
 
-            # get agent llm model
-            llm_model = agent.get_llm_model()
+                # get agent token usage, a shared run is charged to its leader
+                total_tokens = 0 if shared else execution.total_tokens
+                usage = UsageLedger() if shared else execution.usage
 
-            # Save history message
-            new_history_message = await self.create_history_message.execute(
-                CreateHistoryMessageInput(
-                    user_agent_id, input_data.state_input.user_message, response
-                )
-            )
-            if not new_history_message.is_success():
-                return self._return_exception(new_history_message)
-
-            history_message_data = new_history_message.get_data()
-            if not history_message_data:
-                return UseCaseResult.error_result(
-                    "History message data is empty",
-                    RuntimeError("History message data is empty"),
-                )
+                # get agent response time
+                response_time = execution.response_time
 
-            # Create message metadata
-            new_metadata = await self.create_metadata.execute(
-                CreateMetadataInput(
-                    history_message_data.id, total_tokens, response_time, llm_model
-                )
+                # get agent llm model
+                llm_model = execution.llm_model
+
+                if not shared:
+                    self._report_prompt_cache(llm_model, usage)
+
+                if cacheable and is_success and not shared:
+                    await self.response_cache.set(
+                        input_data.agent_id, user_message, response
+                    )
+
+            # Save history message + metadata. A new user agent is only
+            # flushed in this session, so its first turn is written here too.
+            record = HistoryRecord(
+                user_agent_id,
+                input_data.state_input.user_message,
+                response,
+                total_tokens,
+                response_time,
+                llm_model,
+                is_success,
+                usage.cached_tokens,
+                usage.cache_creation_tokens,
             )
-            if not new_metadata.is_success():
-                return self._return_exception(new_metadata)
+            queued = (
+                self.history_write_queue is not None
+                and not created_user_agent
+                and self.history_write_queue.submit(record)
+            )
+            if not queued:
+                saved = await self._save_history(record)
+                if not saved.is_success():
+                    return self._return_exception(saved)
+
+            if created_user_agent and self.user_agent_cache is not None:
+                # Only once the turn went through, a failed one is rolled back
+                await self.user_agent_cache.add(input_data.agent_id, user_agent_id)
 
             return UseCaseResult.success_result(
                 InvokeAgentOutput(
@@ -186,6 +263,7 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
                     response,
                     total_tokens,
                     response_time,
+                    is_success,
                 )
             )
 
@@ -193,3 +271,96 @@ class InvokeAgent(BaseUseCase[InvokeAgentInput, InvokeAgentOutput]):
             return UseCaseResult.error_result(
                 f"Unexpected error while invoked agent: {str(e)}", e
             )
+
+    async def _run_agent(
+        self, agent, input_data: InvokeAgentInput, user_agent_id: str
+    ) -> Tuple[AgentExecutionResult, bool]:
+        """
+        Run the agent, sharing the run with identical concurrent requests.
+
+        Client retries of the same message wait for the first one's run, so
+        the LLM is called once. Only the agent call is shared: every request
+        does its own DB work on its own session. Returns the execution and
+        whether it was another request's run.
+        """
+
+        def run():
+            # Every call gets its own result, so a shared agent can run concurrently
+            return agent.aexecute(
+                input_data.state_input,
+                user_agent_id,
+                deadline=input_data.deadline,
+                on_partial_response=input_data.on_partial_response,
+            )
+
+        if self.coalescer is None:
+            return await run(), False
+
+        led = False
+
+        def lead():
+            nonlocal led
+            led = True
+            return run()
+
+        message_hash = hashlib.sha256(
+            input_data.state_input.user_message.encode()
+        ).hexdigest()
+        execution = await self.coalescer.run(
+            (input_data.agent_id, input_data.unique_id, message_hash),
+            lead,
+            keep=lambda execution: (
+                execution.is_success and execution.response is not None
+            ),
+        )
+        return execution, not led
+
+    @staticmethod
+    def _report_prompt_cache(model: str, usage: UsageLedger) -> None:
+        """Tokens served from the provider's prompt cache, and their share."""
+        metrics.increment("llm_input_tokens_total", usage.input_tokens, model=model)
+        metrics.increment("llm_cached_tokens_total", usage.cached_tokens, model=model)
+        metrics.increment(
+            "llm_cache_creation_tokens_total", usage.cache_creation_tokens, model=model
+        )
+        input_tokens = metrics.get_counter("llm_input_tokens_total", model=model)
+        if input_tokens:
+            cached_tokens = metrics.get_counter("llm_cached_tokens_total", model=model)
+            metrics.set_gauge(
+                "llm_cache_hit_ratio",
+                round(cached_tokens / input_tokens, 4),
+                model=model,
+            )
+
+    async def _save_history(self, record: HistoryRecord) -> UseCaseResult[int]:
+        new_history_message = await self.create_history_message.execute(
+            CreateHistoryMessageInput(
+                record.user_agent_id, record.user_message, record.response
+            )
+        )
+        if not new_history_message.is_success():
+            return new_history_message
+
+        history_message_data = new_history_message.get_data()
+        if not history_message_data:
+            return UseCaseResult.error_result(
+                "History message data is empty",
+                RuntimeError("History message data is empty"),
+            )
+
+        # Create message metadata
+        new_metadata = await self.create_metadata.execute(
+            CreateMetadataInput(
+                history_message_data.id,
+                record.total_tokens,
+                record.response_time,
+                record.model,
+                record.is_success,
+                record.cached_tokens,
+                record.cache_creation_tokens,
+            )
+        )
+        if not new_metadata.is_success():
+            return new_metadata
+
+        return UseCaseResult.success_result(history_message_data.id)
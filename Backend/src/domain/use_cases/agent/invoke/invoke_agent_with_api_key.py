@@ -1,8 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from src.core.exceptions.agent_exceptions import InvalidApiKeyException
 from src.domain.use_cases.base import BaseUseCase, UseCaseResult
-from src.domain.use_cases.interfaces import IApiKeyRepository
+from src.domain.use_cases.interfaces import IApiKeyCache, IApiKeyRepository
 from src.infrastructure.ai.agents import BaseAgentStateModel
 
 from .invoke_agent import InvokeAgent, InvokeAgentInput, InvokeAgentOutput
@@ -16,6 +17,7 @@ class InvokeAgentApiInput:
     message: str
     api_key: str
     state: BaseAgentStateModel
+    deadline: Optional[float] = None
 
 
 class InvokeAgentApi(BaseUseCase[InvokeAgentApiInput, InvokeAgentOutput]):
@@ -23,19 +25,35 @@ class InvokeAgentApi(BaseUseCase[InvokeAgentApiInput, InvokeAgentOutput]):
         self,
         api_key_repository: IApiKeyRepository,
         invoke_agent_usecase: InvokeAgent,
+        api_key_cache: Optional[IApiKeyCache] = None,
     ):
         self.api_key_repository = api_key_repository
         self.invoke_agent = invoke_agent_usecase
+        self.api_key_cache = api_key_cache
+
+    async def is_valid_api_key(self, agent_id: str, api_key: str) -> bool:
+        if self.api_key_cache is not None:
+            cached = self.api_key_cache.lookup(agent_id, api_key)
+            if cached is not None:
+                return cached
+
+        active_api_key = await self.api_key_repository.get_active_api_key(
+            agent_id, api_key
+        )
+        if self.api_key_cache is not None:
+            self.api_key_cache.remember(
+                agent_id,
+                api_key,
+                active_api_key.expires_at if active_api_key else None,
+            )
+        return active_api_key is not None
 
     async def execute(
         self, input_data: InvokeAgentApiInput
     ) -> UseCaseResult[InvokeAgentOutput]:
         try:
             # Validate api key
-            validate_api_key = await self.api_key_repository.get_active_api_key(
-                input_data.agent_id, input_data.api_key
-            )
-            if validate_api_key is None:
+            if not await self.is_valid_api_key(input_data.agent_id, input_data.api_key):
                 raise InvalidApiKeyException(input_data.api_key)
 
             invoke_agent = await self.invoke_agent.execute(
@@ -45,6 +63,7 @@ class InvokeAgentApi(BaseUseCase[InvokeAgentApiInput, InvokeAgentOutput]):
                     input_data.username,
                     "api",
                     input_data.state,
+                    input_data.deadline,
                 )
             )
 
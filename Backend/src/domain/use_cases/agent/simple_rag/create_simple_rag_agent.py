@@ -100,6 +100,7 @@ class CreateSimpleRagAgent(
                 collection_name = get_data_collection_name.collection_name
 
             # Store agent obj
+            agent_data = input_data.agent_data
             agent_obj = {
                 "base_prompt": get_data_agent.base_prompt,
                 "tone": get_data_agent.tone,
@@ -111,6 +112,14 @@ class CreateSimpleRagAgent(
                 "short_memory": get_data_agent.short_term_memory,
                 "long_memory": get_data_agent.long_term_memory,
                 "role": "simple RAG agent",
+                # Read again by InitialAgentAgain when the agent is rebuilt
+                "speculative_retrieval": agent_data.get("speculative_retrieval", False),
+                "rag_mode": agent_data.get("rag_mode", "two_step"),
+                "hedge_requests": agent_data.get("hedge_requests", False),
+                "fallback_llm_provider": agent_data.get("fallback_llm_provider"),
+                "fallback_llm_model": agent_data.get("fallback_llm_model"),
+                "response_cache": agent_data.get("response_cache", False),
+                "response_cache_threshold": agent_data.get("response_cache_threshold"),
             }
             store_agent_obj_result = await self.store_agent_obj.execute(
                 StoreAgentObjInput(agent_id, agent_obj)
@@ -131,6 +140,13 @@ class CreateSimpleRagAgent(
                     get_data_agent.base_prompt,
                     get_data_agent.short_term_memory,
                     get_data_agent.long_term_memory,
+                    agent_obj["speculative_retrieval"],
+                    agent_obj["rag_mode"],
+                    agent_obj["hedge_requests"],
+                    agent_obj["fallback_llm_provider"],
+                    agent_obj["fallback_llm_model"],
+                    agent_obj["response_cache"],
+                    agent_obj["response_cache_threshold"],
                 )
             )
 
@@ -18,6 +18,13 @@ class InitialSimpleRagAgentInput:
     base_prompt: Optional[str] = None
     include_short_memory: bool = False
     include_long_memory: bool = False
+    speculative_retrieval: bool = False
+    rag_mode: Literal["two_step", "single_call", "routed"] = "two_step"
+    hedge_requests: bool = False
+    fallback_llm_provider: Optional[str] = None
+    fallback_llm_model: Optional[str] = None
+    response_cache: bool = False
+    response_cache_threshold: Optional[float] = None
 
 
 @dataclass
@@ -45,6 +52,13 @@ class InitialSimpleRagAgent(
                 input_data.base_prompt,
                 input_data.include_short_memory,
                 input_data.include_long_memory,
+                input_data.speculative_retrieval,
+                input_data.rag_mode,
+                input_data.hedge_requests,
+                input_data.fallback_llm_provider,
+                input_data.fallback_llm_model,
+                input_data.response_cache,
+                input_data.response_cache_threshold,
             )
 
             # save the agent in memory
@@ -1,8 +1,8 @@
 from dataclasses import dataclass
 
 from src.domain.use_cases.base import BaseUseCase, UseCaseResult
+from src.domain.use_cases.interfaces import IAgentManager
 from src.infrastructure.ai.agents import BaseAgent
-from src.infrastructure.data import AgentManager
 
 
 @dataclass
@@ -19,7 +19,7 @@ class StoreAgentInMemoryOutput:
 class StoreAgentInMemory(
     BaseUseCase[StoreAgentInMemoryInput, StoreAgentInMemoryOutput]
 ):
-    def __init__(self, agent_obj_manager: AgentManager):
+    def __init__(self, agent_obj_manager: IAgentManager):
         self.agent_obj_manager = agent_obj_manager
 
     def execute(
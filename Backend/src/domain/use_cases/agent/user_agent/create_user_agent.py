@@ -28,8 +28,8 @@ class CreateUserAgent(BaseUseCase[CreateUserAgentInput, CreateUserAgentOutput]):
         try:
             id = input_data.agent_id + input_data.unique_id
 
-            # create agent entity
-            await self.user_agent_repository.create_user_agent(
+            # create agent entity, concurrent first messages may race here
+            await self.user_agent_repository.upsert_user_agent(
                 id, input_data.agent_id, input_data.username, input_data.user_platform
             )
 
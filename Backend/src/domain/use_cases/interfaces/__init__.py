@@ -2,14 +2,19 @@
 Repository interfaces for use cases.
 """
 
+from .agent_manager_interface import IAgentManager
 from .agent_obj_interface import IStorageAgentObj
 from .agent_repository_interface import IAgentRepository
+from .api_key_cache_interface import IApiKeyCache
 from .api_key_repository_interface import IApiKeyRepository
 from .document_repository_interface import DocumentRepositoryInterface
 from .history_message_repository_interface import IHistoryMessageRepository
+from .history_write_queue_interface import HistoryRecord, IHistoryWriteQueue
 from .integration_repository_interface import IIntergrationRepository
 from .metadata_respository_interface import IMetadata
 from .platform_repository_interface import IPlatformReporitory
+from .response_cache_interface import IResponseCache
+from .user_agent_cache_interface import IUserAgentCache
 from .user_agent_repository_interface import IUserAgentRepository
 from .user_repository_interface import UserRepositoryInterface
 
@@ -18,10 +23,16 @@ __all__ = [
     "UserRepositoryInterface",
     "DocumentRepositoryInterface",
     "IStorageAgentObj",
+    "IAgentManager",
     "IUserAgentRepository",
     "IHistoryMessageRepository",
     "IMetadata",
     "IIntergrationRepository",
     "IPlatformReporitory",
     "IApiKeyRepository",
+    "IResponseCache",
+    "IHistoryWriteQueue",
+    "HistoryRecord",
+    "IUserAgentCache",
+    "IApiKeyCache",
 ]
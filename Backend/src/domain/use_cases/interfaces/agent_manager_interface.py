@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from src.infrastructure.ai.agents import BaseAgent
+
+
+class IAgentManager(ABC):
+    @abstractmethod
+    def store_agent_in_memory(self, agent_id: str, agent: "BaseAgent"):
+        pass
+
+    @abstractmethod
+    def get_agent_in_memory(self, agent_id: str) -> Optional["BaseAgent"]:
+        pass
+
+    @abstractmethod
+    def get_all_agents_in_memory(self) -> Dict[str, Any]:
+        pass
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+
+class IApiKeyCache(ABC):
+    """Recent API key checks, so most invocations validate without the DB."""
+
+    @abstractmethod
+    def lookup(self, agent_id: str, api_key: str) -> Optional[bool]:
+        """True/False for a cached valid/invalid key, None when unknown."""
+        pass
+
+    @abstractmethod
+    def remember(
+        self, agent_id: str, api_key: str, expires_at: Optional[datetime]
+    ) -> None:
+        """Cache a check result, ``expires_at`` is None for an invalid key."""
+        pass
+
+    @abstractmethod
+    def evict_agent(self, agent_id: str) -> None:
+        """Forget every key of the agent, e.g. when it is revoked."""
+        pass
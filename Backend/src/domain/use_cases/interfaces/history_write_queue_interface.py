@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass
+class HistoryRecord:
+    """One conversation turn: a history message plus its metadata row."""
+
+    user_agent_id: str
+    user_message: str
+    response: str
+    total_tokens: int | float
+    response_time: float
+    model: str
+    is_success: bool = True
+    cached_tokens: int = 0
+    cache_creation_tokens: int = 0
+
+
+class IHistoryWriteQueue(ABC):
+    @abstractmethod
+    def submit(self, record: HistoryRecord) -> bool:
+        """Queue the turn for a batched write, False when it was not accepted."""
+        pass
+
+    @abstractmethod
+    async def flush(self) -> None:
+        """Write every queued turn now."""
+        pass
@@ -14,6 +14,8 @@ class IMetadata(ABC):
         response_time: float,
         model: str,
         is_success: bool = True,
+        cached_tokens: int = 0,
+        cache_creation_tokens: int = 0,
     ) -> Metadata:
         pass
 
@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class IResponseCache(ABC):
+    @abstractmethod
+    async def get(
+        self,
+        agent_id: str,
+        user_message: str,
+        similarity_threshold: Optional[float] = None,
+    ) -> Optional[str]:
+        """Cached response of the agent for this message, if any."""
+        pass
+
+    @abstractmethod
+    async def set(self, agent_id: str, user_message: str, response: str) -> None:
+        pass
+
+    @abstractmethod
+    async def invalidate(self, agent_id: str) -> None:
+        """Drop every cached response of the agent."""
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+
+
+class IUserAgentCache(ABC):
+    """Ids of user agents known to exist, so invocations can skip the lookup."""
+
+    @abstractmethod
+    async def contains(self, agent_id: str, user_agent_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def add(self, agent_id: str, user_agent_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def invalidate_agent(self, agent_id: str) -> None:
+        """Forget every user agent of the agent, e.g. when it is deleted."""
+        pass
@@ -18,3 +18,14 @@ class IUserAgentRepository(ABC):
         user_platform: Literal["telegram", "whatsapp", "api"],
     ) -> UserAgent:
         pass
+
+    @abstractmethod
+    async def upsert_user_agent(
+        self,
+        id: str,
+        agent_id: str,
+        username: str,
+        user_platform: Literal["telegram", "whatsapp", "api"],
+    ) -> None:
+        """Create the user agent unless it exists, safe under concurrency."""
+        pass
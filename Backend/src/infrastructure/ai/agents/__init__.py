@@ -2,6 +2,14 @@
 # from .base_workflow import BaseWorkflow
 from .base_agent import BaseAgent
 from .base_model import BaseAgentStateModel
+from .execution import AgentExecutionResult, ExecutionContext
 from .simple_rag_agent import SimpleRagAgent, SimpleRagState
 
-__all__ = ["SimpleRagAgent", "SimpleRagState", "BaseAgent", "BaseAgentStateModel"]
+__all__ = [
+    "SimpleRagAgent",
+    "SimpleRagState",
+    "BaseAgent",
+    "BaseAgentStateModel",
+    "AgentExecutionResult",
+    "ExecutionContext",
+]
@@ -1,35 +1,114 @@
-import time
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
+
+from src.config.config import settings
+from src.core.exceptions.agent_exceptions import AgentDeadlineExceededException
+from src.core.exceptions.llm_exceptions import LLMDeadlineExceededException
+
+from ..components import references_history
 
 from .base_model import BaseAgentStateModel
 from .base_workflow import BaseWorkflow
+from .execution import AgentExecutionResult, ExecutionContext
+
+DEADLINE_EXCEPTIONS = (AgentDeadlineExceededException, LLMDeadlineExceededException)
 
 
 class BaseAgent:
     def __init__(self, workflow: BaseWorkflow):
         self.workflow = workflow
-        self._response_time = 0
-        self._result = None
-
-    def get_response_time(self):
-        return self._response_time
-
-    def get_token_usage(self):
-        return self.workflow.get_total_token()
+        # Opt-in response cache, see is_cacheable_turn
+        self.response_cache_enabled = False
+        self.response_cache_threshold: Optional[float] = None
 
     def get_llm_model(self):
         return self.workflow.llm_model
 
-    def execute(self, state: BaseAgentStateModel, thread_id) -> Dict[str, Any] | Any:
-        start_time = time.perf_counter()
-        result = self.workflow.run(state, thread_id)
-        self._result = result
-        end_time = time.perf_counter()
-        self._response_time = round(end_time - start_time, 2)
-        return result
+    def execute(
+        self,
+        state: BaseAgentStateModel,
+        thread_id: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> AgentExecutionResult:
+        context = self._new_context(thread_id, timeout, deadline)
+        try:
+            result = self.workflow.run(state, thread_id, context)
+        except DEADLINE_EXCEPTIONS:
+            return self._build_timeout_result(context)
+        return self._build_result(result, context)
+
+    async def aexecute(
+        self,
+        state: BaseAgentStateModel,
+        thread_id: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        on_partial_response: Optional[Callable[[str], None]] = None,
+    ) -> AgentExecutionResult:
+        """
+        Run the workflow within ``deadline`` (time.monotonic()) or ``timeout``.
+
+        When the deadline passes the result has no response and
+        ``is_success=False``; the caller decides what to reply. With
+        ``on_partial_response`` the answer is streamed to it as it is
+        generated, the result still holds the complete response.
+        """
+        context = self._new_context(thread_id, timeout, deadline)
+        context.on_partial_response = on_partial_response
+        try:
+            result = await self.workflow.arun(state, thread_id, context)
+        except DEADLINE_EXCEPTIONS:
+            return self._build_timeout_result(context)
+        return self._build_result(result, context)
+
+    def is_cacheable_turn(self, user_message: str) -> bool:
+        """
+        Whether the answer to this message may come from the response cache.
+
+        Only for turns that don't depend on the conversation: long-term memory
+        personalizes every answer, and with short memory the message must not
+        refer to earlier turns.
+        """
+        if not self.response_cache_enabled or self.workflow.use_long_memory:
+            return False
+        if self.workflow.use_short_memory and references_history(user_message):
+            return False
+        return True
+
+    async def arecord_turn(
+        self, thread_id: str, user_message: str, response: str
+    ) -> None:
+        """Add a turn answered outside the workflow (cache hit) to its history."""
+        await self.workflow.append_turn(thread_id, user_message, response)
+
+    def _new_context(
+        self, thread_id: str, timeout: Optional[float], deadline: Optional[float]
+    ) -> ExecutionContext:
+        # Every stage of the invocation shares one deadline
+        return ExecutionContext.with_timeout(
+            thread_id, timeout or settings.AGENT_INVOCATION_TIMEOUT_SECONDS, deadline
+        )
 
-    def get_response(self):
-        if self._result is None:
-            return None
+    def _build_timeout_result(self, context: ExecutionContext) -> AgentExecutionResult:
+        context.cancelled.set()
+        return AgentExecutionResult(
+            response=None,
+            total_tokens=context.total_tokens,
+            response_time=context.elapsed(),
+            llm_model=self.get_llm_model(),
+            usage=context.usage,
+            is_success=False,
+        )
 
-        return self._result.get("response")
+    def _build_result(
+        self, result: Dict[str, Any] | Any, context: ExecutionContext
+    ) -> AgentExecutionResult:
+        response = result.get("response") if result is not None else None
+        return AgentExecutionResult(
+            response=response,
+            total_tokens=context.total_tokens,
+            response_time=context.elapsed(),
+            llm_model=self.get_llm_model(),
+            state=result or {},
+            usage=context.usage,
+        )
@@ -9,3 +9,7 @@ class BaseAgentStateModel(BaseModel):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     user_message: str = ""
     response: Optional[str] = "none"
+    # Rolling summary of turns that no longer fit the history window.
+    # Defaults are None so a new turn's input doesn't overwrite the checkpoint.
+    conversation_summary: Optional[str] = None
+    summarized_count: Optional[int] = None
@@ -1,4 +1,6 @@
 import asyncio
+import json
+import random
 import time
 from abc import ABC, abstractmethod
 from typing import (
@@ -6,28 +8,48 @@ from typing import (
     Awaitable,
     Callable,
     Dict,
-    List,
     Optional,
     Sequence,
     TypeVar,
     Union,
 )
 
-import tiktoken
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    SystemMessage,
+)
+from langchain_core.runnables import RunnableConfig
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 
+from src.config.config import settings
+from src.core.exceptions.agent_exceptions import AgentDeadlineExceededException
 from src.core.utils.logger import get_logger
-
-from ..components import LongTermMemory
+from src.core.utils.metrics import metrics
+
+from ..components import (
+    ConversationHistoryManager,
+    HedgedLLMCaller,
+    HedgePolicy,
+    LongTermMemory,
+    ResilientLLMCaller,
+    UsageLedger,
+    UsageRecord,
+    tokenizer_service,
+)
 from .base_model import BaseAgentStateModel
+from .execution import ExecutionContext
 
 R = TypeVar("R")
 
 
 class BaseWorkflow(ABC):
+    # Nodes whose LLM output is the reply to the user, see astream_answer
+    answer_nodes: Sequence[str] = ()
+
     def __init__(
         self,
         llm_model: str,
@@ -35,27 +57,133 @@ class BaseWorkflow(ABC):
         use_long_memory: bool,
         use_short_memory: bool,
         user_memory_id: Optional[str] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
     ):
         self.llm_model = llm_model
         self.provider = provider.lower()
         self._llm = None  # lazy init
+        # Retries, deadline and the (provider, model) circuit breaker
+        self.llm_caller = ResilientLLMCaller(self.provider, llm_model)
+        # Opt-in: hedge slow calls and fail over to another provider/model
+        self.hedge_policy = hedge_policy
+        self._fallback_llm = None
+        self.hedged_caller = None
+        if hedge_policy:
+            fallback_caller = (
+                ResilientLLMCaller(
+                    hedge_policy.fallback_provider.lower(), hedge_policy.fallback_model
+                )
+                if hedge_policy.has_fallback
+                else None
+            )
+            self.hedged_caller = HedgedLLMCaller(
+                self.llm_caller, hedge_policy, fallback_caller
+            )
         self.logger = get_logger(__name__)
-        self._total_token: int = 0
 
         self.use_short_memory = use_short_memory
         self.use_long_memory = use_long_memory
         self.memory_id = user_memory_id
         self._memory = None
-
-        try:
-            self.tokenizer = tiktoken.encoding_for_model(llm_model)
-        except KeyError:
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.history_manager = ConversationHistoryManager(llm_model)
+        self._summary_tasks: Dict[str, asyncio.Task] = {}
 
     @abstractmethod
-    def run(self, state, thread_id: str) -> Dict[str, Any] | Any:
+    def run(
+        self, state, thread_id: str, context: ExecutionContext
+    ) -> Dict[str, Any] | Any:
         pass
 
+    async def arun(
+        self, state, thread_id: str, context: ExecutionContext
+    ) -> Dict[str, Any] | Any:
+        """Run the workflow without blocking the event loop."""
+        return await self.run_until_deadline(
+            asyncio.to_thread(self.run, state, thread_id, context), context
+        )
+
+    async def run_until_deadline(
+        self, run: Awaitable[R], context: ExecutionContext
+    ) -> R:
+        """
+        Await ``run`` until the invocation deadline.
+
+        Past it the run is cancelled, ``context.cancelled`` tells the nodes
+        still working in threads to stop, and AgentDeadlineExceededException
+        is raised.
+        """
+        try:
+            return await asyncio.wait_for(run, timeout=context.remaining())
+        except asyncio.TimeoutError:
+            context.cancelled.set()
+            self.logger.warning(
+                f"Invocation of {context.thread_id} cancelled, deadline exceeded"
+            )
+            raise AgentDeadlineExceededException()
+
+    async def astream_answer(
+        self, graph: Any, state: Any, config: RunnableConfig, context: ExecutionContext
+    ) -> Dict[str, Any]:
+        """
+        Run ``graph`` like ``ainvoke`` while streaming the answer's tokens.
+
+        Tokens of the ``answer_nodes`` LLM calls are accumulated per call and
+        ``context.on_partial_response`` gets the text generated so far; a new
+        call (e.g. the answer after a tool call, or a retry) starts over.
+        Returns the final state, as ``ainvoke`` does.
+        """
+        result: Dict[str, Any] = {}
+        message_id = None
+        partial = ""
+        async for mode, chunk in graph.astream(
+            state, config=config, stream_mode=["messages", "values"]
+        ):
+            if mode == "values":
+                result = chunk
+                continue
+            message, metadata = chunk
+            if not isinstance(message, AIMessageChunk) or (
+                self.answer_nodes
+                and metadata.get("langgraph_node") not in self.answer_nodes
+            ):
+                continue
+            if message.id != message_id:
+                message_id, partial = message.id, ""
+            text = (
+                message.content
+                if isinstance(message.content, str)
+                else "".join(
+                    block.get("text", "")
+                    for block in message.content
+                    if isinstance(block, dict)
+                )
+            )
+            if text:
+                partial += text
+                try:
+                    context.on_partial_response(partial)
+                except Exception as e:
+                    self.logger.warning(f"Partial response callback failed: {e}")
+        return result
+
+    def build_config(self, thread_id: str, context: ExecutionContext) -> RunnableConfig:
+        # "workflow" lets shared graph templates reach this agent's pieces
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "execution_context": context,
+                "workflow": self,
+            }
+        }
+
+    def get_execution_context(self, config: RunnableConfig) -> ExecutionContext:
+        configurable = config.get("configurable", {})
+        context = configurable.get("execution_context")
+        if context is None:
+            # Graph invoked without going through run/arun, keep counting locally
+            context = ExecutionContext(configurable.get("thread_id", ""))
+        return context
+
     @property
     def memory(self) -> LongTermMemory:
         if not self.memory_id:
@@ -68,6 +196,12 @@ class BaseWorkflow(ABC):
 
         return self._memory
 
+    def get_memory(self, config: RunnableConfig) -> LongTermMemory:
+        """Long-term memory of the user behind this invocation."""
+        memory_id = self.memory_id or self.get_execution_context(config).thread_id
+        # Cheap: every LongTermMemory shares the process-wide mem0 backend
+        return LongTermMemory(memory_id)
+
     @property
     def llm(self):
         """Lazy initialization of LLM instance"""
@@ -78,28 +212,38 @@ class BaseWorkflow(ABC):
             )
         return self._llm
 
-    def _sum_token(self, token: int):
-        self._total_token += token
+    @property
+    def fallback_llm(self):
+        """Lazy initialization of the hedge/failover LLM, if configured"""
+        if (
+            self._fallback_llm is None
+            and self.hedge_policy
+            and self.hedge_policy.has_fallback
+        ):
+            self._fallback_llm = self._get_llm_provider(
+                self.hedge_policy.fallback_provider.lower(),
+                self.hedge_policy.fallback_model,
+            )
+        return self._fallback_llm
 
     def _get_llm_provider(self, provider: str, model: str):
         """Return the appropriate LLM instance based on provider."""
+        # Ceiling per request; the invocation deadline usually cuts it shorter
+        timeout = settings.LLM_REQUEST_TIMEOUT_SECONDS
         if provider == "openai":
-            return ChatOpenAI(model=model)
+            return ChatOpenAI(model=model, timeout=timeout)
         elif provider == "anthropic":
             return ChatAnthropic(
                 model_name=model,
                 temperature=0.7,
-                timeout=60,  # default timeout 60 detik
+                timeout=timeout,
                 stop=None,
             )
         elif provider == "google":
-            return ChatGoogleGenerativeAI(model=model)
+            return ChatGoogleGenerativeAI(model=model, timeout=timeout)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
-    def get_total_token(self):
-        return self._total_token
-
     def is_include_long_memory(self) -> bool:
         if self.use_long_memory:
             return True
@@ -127,9 +271,9 @@ class BaseWorkflow(ABC):
                             f"Max retries ({max_retries}) exceeded. Last error: {e}"
                         )
                         raise
-                    delay = base_delay * (2**attempt)
+                    delay = self._backoff_delay(attempt, base_delay)
                     self.logger.warning(
-                        f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s..."
+                        f"Attempt {attempt + 1} failed: {e}. Retrying in {delay:.2f}s..."
                     )
                     await asyncio.sleep(delay)
 
@@ -152,38 +296,91 @@ class BaseWorkflow(ABC):
                             f"Max retries ({max_retries}) exceeded. Last error: {e}"
                         )
                         raise
-                    delay = base_delay * (2**attempt)
+                    delay = self._backoff_delay(attempt, base_delay)
                     self.logger.warning(
-                        f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s..."
+                        f"Attempt {attempt + 1} failed: {e}. Retrying in {delay:.2f}s..."
                     )
                     time.sleep(delay)
 
+    def _backoff_delay(self, attempt: int, base_delay: float) -> float:
+        # Full jitter so retries of concurrent requests don't line up
+        return random.uniform(0, base_delay * (2**attempt))
+
+    def _get_deadline(self, config: Optional[RunnableConfig]) -> Optional[float]:
+        if config is None:
+            return None
+        return self.get_execution_context(config).deadline
+
     def _estimate_tokens(self, text: str) -> int:
-        """Estimate token count for text using tiktoken"""
-        try:
-            token = len(self.tokenizer.encode(text))
-            return token
-        except Exception as e:
-            self.logger.warning(f"Error estimating tokens: {str(e)}")
-            return len(text) // 4  # fallback
+        """Estimate token count for text with the shared tokenizer"""
+        return tokenizer_service.count_tokens(text, self.llm_model)
+
+    def _estimate_messages_tokens(self, messages: Sequence[BaseMessage]) -> int:
+        tokens = 0
+        for message in messages:
+            text = self._handle_prompt_token([message])
+            static = isinstance(
+                message, SystemMessage
+            ) and not self.history_manager.is_summary_message(message)
+            if static:
+                # System prompts are static segments, count them once. The
+                # summary changes per thread and would only churn the cache.
+                tokens += tokenizer_service.count_static_tokens(text, self.llm_model)
+            else:
+                tokens += self._estimate_tokens(text)
+        return tokens
 
-    def _handle_prompt_token(self, prompts: List[BaseMessage]) -> str:
+    def _handle_prompt_token(self, prompts: Sequence[BaseMessage]) -> str:
         list_prompt = []
         for prompt in prompts:
-            list_prompt.append(prompt.content)
+            if isinstance(prompt.content, str):
+                list_prompt.append(prompt.content)
+            else:
+                # Content blocks (e.g. cache-controlled system prompts)
+                list_prompt.extend(
+                    block.get("text", "") if isinstance(block, dict) else str(block)
+                    for block in prompt.content
+                )
+            if isinstance(prompt, AIMessage) and prompt.tool_calls:
+                list_prompt.append(
+                    json.dumps([call["args"] for call in prompt.tool_calls])
+                )
 
         return " ".join(list_prompt)
 
-    def estimate_total_tokens(
-        self, prompts: List[BaseMessage], user_message: str, response_llm: str
-    ):
-        tokens = (
-            self._estimate_tokens(self._handle_prompt_token(prompts))
-            + self._estimate_tokens(user_message)
-            + self._estimate_tokens(response_llm)
+    def record_usage(
+        self,
+        config: RunnableConfig,
+        node: str,
+        messages: Sequence[BaseMessage],
+        response: BaseMessage,
+    ) -> UsageRecord:
+        """
+        Record token usage of one LLM call in the invocation's usage ledger.
+
+        The provider's ``usage_metadata`` is used as is; the prompt is only
+        re-tokenized when the provider did not report usage.
+        """
+        context = self.get_execution_context(config)
+        # A hedged or failed-over call may have been answered by the fallback
+        response_metadata = getattr(response, "response_metadata", None) or {}
+        model = (
+            response_metadata.get("model_name")
+            or response_metadata.get("model")
+            or self.llm_model
         )
-        self._sum_token(tokens)
-        return tokens
+        record = UsageLedger.from_usage_metadata(
+            node, model, getattr(response, "usage_metadata", None)
+        )
+        if record is None:
+            record = UsageRecord(
+                node=node,
+                model=model,
+                input_tokens=self._estimate_messages_tokens(messages),
+                output_tokens=self._estimate_messages_tokens([response]),
+                source="estimated",
+            )
+        return context.usage.record(record)
 
     def estimate_structured_output_tokens(
         self, prompt: str, response_content: str = ""
@@ -199,37 +396,47 @@ class BaseWorkflow(ABC):
             self.logger.warning(f"Error estimating structured output tokens: {str(e)}")
             return 100
 
-    def call_llm(self, messages: Any) -> Any:
-        """Generalized method to call LLM (async or sync safe)."""
+    def call_llm(self, messages: Any, config: Optional[RunnableConfig] = None) -> Any:
+        """
+        Call the LLM with retries, the invocation deadline and circuit breaker,
+        hedged against the fallback provider when a hedge policy is set.
+
+        ``config`` is the node's RunnableConfig; it carries the deadline of
+        the current invocation.
+        """
         try:
             llm = self.llm
 
-            # if hasattr(llm, "ainvoke") and asyncio.iscoroutinefunction(llm.ainvoke):
-            #     response = await llm.ainvoke(messages)
-            if hasattr(llm, "invoke"):
-                response = llm.invoke(messages)
-            else:
+            if not hasattr(llm, "invoke"):
                 raise TypeError("Provided LLM does not support invoke/ainvoke.")
 
-            return response
+            return self._invoke_llm(messages, config, lambda model: model)
 
         except Exception as e:
             self.logger.error(f"Error while invoking LLM: {e}")
             raise
 
-    def call_llm_with_tool(self, messages: Any, tools: Sequence[Any]) -> Any:
+    def call_llm_with_tool(
+        self,
+        messages: Any,
+        tools: Sequence[Any],
+        config: Optional[RunnableConfig] = None,
+    ) -> Any:
         """
         Call LLM with tools bound to it.
 
         Args:
             messages: Messages to send to LLM (can be list of BaseMessage or string)
             tools: Sequence of tools to bind to LLM (e.g., [tool1, tool2, ...])
+            config: Node config carrying the invocation deadline
 
         Returns:
             LLM response with tool bindings
 
         Raises:
             TypeError: If LLM does not support bind_tools or invoke/ainvoke
+            CircuitOpenException: If the provider's circuit breaker is open
+            LLMDeadlineExceededException: If the invocation deadline passed
             Exception: If error occurs during LLM invocation
         """
         try:
@@ -239,34 +446,118 @@ class BaseWorkflow(ABC):
             if not hasattr(llm, "bind_tools"):
                 raise TypeError("Provided LLM does not support bind_tools method.")
 
-            llm_with_tools = llm.bind_tools(tools)
-            self.logger.debug(f"Bound {len(tools)} tools to LLM")
+            self.logger.debug(f"Binding {len(tools)} tools to LLM")
 
-            # Call LLM with tools (async or sync safe)
-            # if hasattr(llm_with_tools, "ainvoke") and asyncio.iscoroutinefunction(
-            #     llm_with_tools.ainvoke
-            # ):
-            # response = await llm_with_tools.ainvoke(messages)
-            if hasattr(llm_with_tools, "invoke"):
-                response = llm_with_tools.invoke(messages)
-            else:
-                raise TypeError("LLM with tools does not support invoke/ainvoke.")
-
-            return response
+            return self._invoke_llm(
+                messages, config, lambda model: model.bind_tools(tools)
+            )
 
         except Exception as e:
             self.logger.error(f"Error while invoking LLM with tools: {e}")
             raise
 
+    def _invoke_llm(
+        self,
+        messages: Any,
+        config: Optional[RunnableConfig],
+        prepare: Callable[[Any], Any],
+    ) -> Any:
+        """Invoke ``prepare(llm)``, hedged against the fallback when enabled."""
+        deadline = self._get_deadline(config)
+        runnable = prepare(self.llm)
+        if not hasattr(runnable, "invoke"):
+            raise TypeError("LLM does not support invoke/ainvoke.")
+        cancel_event = self.get_execution_context(config).cancelled if config else None
+        if self.hedged_caller is None:
+            return self.llm_caller.invoke(runnable, messages, deadline, cancel_event)
+
+        fallback_llm = self.fallback_llm
+        return self.hedged_caller.invoke(
+            runnable,
+            messages,
+            deadline,
+            prepare(fallback_llm) if fallback_llm is not None else None,
+            cancel_event,
+        )
+
     def get_all_previous_messages(self, messages: Sequence[BaseMessage]):
-        all_previous_messages = []
-        if self.use_short_memory:
-            all_previous_messages = messages
-        if len(all_previous_messages) > 6:
-            all_previous_messages = all_previous_messages[
-                6 : len(all_previous_messages)
-            ]
-        return all_previous_messages
+        """Newest turns of the conversation that fit in the history budget."""
+        if not self.use_short_memory:
+            return []
+        return self.history_manager.window(messages).messages
+
+    def get_summary_message(self, state: BaseAgentStateModel) -> Optional[BaseMessage]:
+        if not self.use_short_memory:
+            return None
+        return self.history_manager.summary_message(state.conversation_summary)
+
+    def schedule_summary_refresh(self, graph: Any, thread_id: str) -> None:
+        """
+        Fold turns that left the history window into the rolling summary.
+
+        Runs in the background after the response has been returned; one
+        refresh per thread at a time.
+        """
+        if not self.use_short_memory:
+            return
+        running = self._summary_tasks.get(thread_id)
+        if running and not running.done():
+            return
+
+        task = asyncio.create_task(self._refresh_summary(graph, thread_id))
+        self._summary_tasks[thread_id] = task
+        task.add_done_callback(lambda t: self._on_summary_done(thread_id, t))
+
+    def _on_summary_done(self, thread_id: str, task: asyncio.Task) -> None:
+        if self._summary_tasks.get(thread_id) is task:
+            del self._summary_tasks[thread_id]
+        if not task.cancelled() and task.exception():
+            self.logger.warning(
+                f"Failed to refresh conversation summary: {task.exception()}"
+            )
+
+    async def _refresh_summary(self, graph: Any, thread_id: str) -> None:
+        # The workflow is needed by the shared graph's edges on aupdate_state
+        config = self.build_config(thread_id, ExecutionContext(thread_id))
+        snapshot = await graph.aget_state(config)
+        values = snapshot.values or {}
+        messages = values.get("messages", [])
+        summarized_count = values.get("summarized_count") or 0
+
+        window = await asyncio.to_thread(self.history_manager.window, messages)
+        if window.folded_count <= summarized_count:
+            return
+
+        prompt = self.history_manager.build_summary_prompt(
+            values.get("conversation_summary"),
+            messages[summarized_count : window.folded_count],
+        )
+        response = await self.llm_caller.ainvoke(self.llm, prompt)
+        # Runs after the turn was saved, so it is counted on its own
+        usage = self.record_usage(config, "summary", prompt, response)
+        metrics.increment(
+            "llm_summary_tokens_total", usage.total_tokens, model=usage.model
+        )
+        # Stored in the checkpoint, so the summary is only computed once
+        await graph.aupdate_state(
+            config,
+            {
+                "conversation_summary": response.content,
+                "summarized_count": window.folded_count,
+            },
+        )
+        self.logger.info(
+            f"Conversation summary refreshed ({window.folded_count} messages folded)"
+        )
+
+    async def append_turn(
+        self, thread_id: str, user_message: str, response: str
+    ) -> None:
+        """
+        Add a turn answered outside the graph (e.g. a cached response) to the
+        conversation state. Workflows that keep conversation state override it.
+        """
+        return None
 
     def get_content_state_last_message(self, state_messages: Sequence[BaseMessage]):
         return state_messages[-1].content
@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.core.exceptions.agent_exceptions import AgentDeadlineExceededException
+
+from ..components.tools import SpeculativeRetrievalTask
+from ..components.usage import UsageLedger
+
+R = TypeVar("R")
+
+# Retrieval and memory lookups run here so a hung call can be abandoned
+_stage_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="agent-stage")
+
+
+@dataclass
+class ExecutionContext:
+    """
+    Bookkeeping for a single agent invocation.
+
+    One context is created per call and passed to the graph nodes through
+    ``config["configurable"]``, so concurrent calls on the same agent instance
+    never share token counters or results.
+    """
+
+    thread_id: str
+    usage: UsageLedger = field(default_factory=UsageLedger)
+    started_at: float = field(default_factory=time.perf_counter)
+    # time.monotonic() by which the whole invocation (every stage) must finish
+    deadline: Optional[float] = None
+    speculative_retrieval: Optional[SpeculativeRetrievalTask] = None
+    # Long-term memory found for this turn, loaded before the first LLM call
+    memory_context: Optional[str] = None
+    # Set once the deadline passed, stops LLM retries still running in threads
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    # Called with the answer generated so far while the LLM streams it
+    on_partial_response: Optional[Callable[[str], None]] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.usage.total_tokens
+
+    def elapsed(self) -> float:
+        return round(time.perf_counter() - self.started_at, 2)
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.cancelled.is_set() or self.remaining() == 0.0
+
+    def run_stage(
+        self, stage: str, timeout: float, func: Callable[..., R], *args: Any
+    ) -> R:
+        """
+        Run ``func(*args)`` bounded by ``timeout`` and the invocation deadline.
+
+        Raises AgentDeadlineExceededException when either passes; the call
+        keeps running in its thread but the node stops waiting for it.
+        """
+        remaining = self.remaining()
+        budget = timeout if remaining is None else min(timeout, remaining)
+        if budget <= 0 or self.cancelled.is_set():
+            raise AgentDeadlineExceededException(stage)
+
+        future = _stage_executor.submit(func, *args)
+        try:
+            return future.result(timeout=budget)
+        except FutureTimeoutError:
+            future.cancel()
+            raise AgentDeadlineExceededException(stage)
+
+    @classmethod
+    def with_timeout(
+        cls,
+        thread_id: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> "ExecutionContext":
+        if timeout:
+            timeout_deadline = time.monotonic() + timeout
+            deadline = min(deadline, timeout_deadline) if deadline else timeout_deadline
+        return cls(thread_id, deadline=deadline)
+
+
+@dataclass
+class AgentExecutionResult:
+    response: Optional[str]
+    total_tokens: int
+    response_time: float
+    llm_model: str
+    state: Dict[str, Any] = field(default_factory=dict)
+    usage: UsageLedger = field(default_factory=UsageLedger)
+    # False when the deadline passed before the agent answered
+    is_success: bool = True
@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from langchain_core.runnables import RunnableConfig
+
+
+def workflow_node(method_name: str, with_config: bool = True) -> Callable[..., Any]:
+    """
+    Graph node (or edge condition) that runs a method of the workflow.
+
+    The workflow instance travels in ``config["configurable"]["workflow"]``,
+    so a compiled graph holds no agent specific state and can be shared.
+    """
+
+    def node(state: Any, config: RunnableConfig) -> Any:
+        workflow = config.get("configurable", {}).get("workflow")
+        if workflow is None:
+            raise ValueError("Graph was invoked without its workflow in the config")
+        method = getattr(workflow, method_name)
+        return method(state, config) if with_config else method(state)
+
+    node.__name__ = method_name.lstrip("_")
+    return node
+
+
+class GraphTemplateCache:
+    """
+    Compiled graphs shared by every workflow instance with the same topology.
+
+    The key describes the topology (workflow type, enabled nodes, checkpointer);
+    agent specific pieces (prompts, tools, LLM) are read from the workflow in
+    the config at run time. Bounded, least recently used entries go first.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._graphs: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get_or_compile(self, key: Hashable, compile_graph: Callable[[], Any]) -> Any:
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                graph = self._graphs[key] = compile_graph()
+                while len(self._graphs) > self.max_size:
+                    self._graphs.popitem(last=False)
+            else:
+                self._graphs.move_to_end(key)
+            return graph
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+
+graph_templates = GraphTemplateCache()
@@ -1,14 +1,12 @@
 from typing import Literal, Optional
 
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.checkpoint.redis import RedisSaver
-
-from src.infrastructure.redis.redis_storage import RedisStorage
+from src.infrastructure.redis.checkpointer import get_agent_checkpointer
 
+from ...components import HedgePolicy
 from ...components.tools import RetrieveDocumentTool
 from .. import BaseAgent
 from .prompts import SimpleRagPrompt
-from .workflow import SimpleRagWorkflow
+from .workflow import RagMode, SimpleRagWorkflow
 
 
 class SimpleRagAgent(BaseAgent):
@@ -22,14 +20,26 @@ class SimpleRagAgent(BaseAgent):
         base_prompt: Optional[str] = None,
         include_short_memory: bool = False,
         include_long_memory: bool = False,
+        speculative_retrieval: bool = False,
+        rag_mode: RagMode = "two_step",
+        hedge_requests: bool = False,
+        fallback_llm_provider: Optional[str] = None,
+        fallback_llm_model: Optional[str] = None,
+        response_cache: bool = False,
+        response_cache_threshold: Optional[float] = None,
     ):
         self.retrieve_document_tool = RetrieveDocumentTool(
             chromadb_path, collection_name
         )
-        # self.state_saver = RedisStorage()
-        # self.checkpoint = RedisSaver(redis_url=self.state_saver.redis_url)
-        self.checkpoint = MemorySaver()
-        self.prompts = SimpleRagPrompt(tone, base_prompt)
+        # Shared MemorySaver or async Redis saver (AGENT_CHECKPOINTER)
+        self.checkpoint = get_agent_checkpointer()
+        self.prompts = SimpleRagPrompt(tone, base_prompt, llm_provider)
+        # Opt-in: hedge slow LLM calls, failing over to the fallback model
+        hedge_policy = (
+            HedgePolicy(fallback_llm_provider, fallback_llm_model)
+            if hedge_requests
+            else None
+        )
         super().__init__(
             SimpleRagWorkflow(
                 self.retrieve_document_tool,
@@ -39,5 +49,11 @@ class SimpleRagAgent(BaseAgent):
                 llm_model,
                 include_short_memory,
                 include_long_memory,
+                speculative_retrieval,
+                rag_mode,
+                hedge_policy=hedge_policy,
             )
         )
+        # Opt-in: answer repeated questions from the response cache
+        self.response_cache_enabled = response_cache
+        self.response_cache_threshold = response_cache_threshold
@@ -1,28 +1,76 @@
-from typing import Literal, Optional
+from dataclasses import dataclass, field
+from typing import List, Literal, Optional, Sequence
 
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 from app.AI.utils.tone import get_tone
 
 load_dotenv()
 
 
+@dataclass
+class CompiledPrompt:
+    """
+    A prompt split into a static prefix and a per-turn suffix.
+
+    The prefix is identical on every turn of an agent, so it is always sent
+    first to keep the provider's prompt cache warm.
+    """
+
+    prefix: SystemMessage
+    suffix: List[BaseMessage] = field(default_factory=list)
+
+    def to_messages(
+        self,
+        previous_messages: Sequence[BaseMessage] = (),
+        summary: Optional[BaseMessage] = None,
+    ) -> List[BaseMessage]:
+        # The summary only changes when it is refreshed, keep it near the prefix
+        head = [self.prefix, summary] if summary else [self.prefix]
+        return [*head, *previous_messages, *self.suffix]
+
+
 class SimpleRagPrompt:
     def __init__(
         self,
         tone: Literal["friendly", "formal", "casual", "profesional"],
         base_prompt: Optional[str] = None,
+        llm_provider: str = "openai",
     ):
         self.base_prompt = base_prompt
         self.tone = tone
+        self.llm_provider = llm_provider.lower()
 
-    def main_agent(self, user_message: str, previous_context: Optional[str] = None):
-        # Get tone-based personality and communication style
+        # Static prefixes are built once per agent, not on every turn
         tone_prompt = get_tone(self.tone)
-        return [
-            SystemMessage(
-                content=f"""
+        self._main_agent_prefix = self._cacheable_system_message(
+            self._main_agent_template(tone_prompt)
+        )
+        self._describe_document_prefix = self._cacheable_system_message(
+            self._describe_document_template(tone_prompt)
+        )
+        self._answer_rag_prefix = self._cacheable_system_message(
+            self._answer_rag_template(tone_prompt)
+        )
+
+    def _cacheable_system_message(self, content: str) -> SystemMessage:
+        if self.llm_provider == "anthropic":
+            # Anthropic only caches blocks explicitly marked with cache_control
+            return SystemMessage(
+                content=[
+                    {
+                        "type": "text",
+                        "text": content,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ]
+            )
+        # OpenAI and Google cache a stable prefix automatically
+        return SystemMessage(content=content)
+
+    def _main_agent_template(self, tone_prompt: str) -> str:
+        return f"""
 Kamu adalah AI Assistant yang memiliki kepribadian dan gaya komunikasi tertentu.
 
 BASE PROMPT (Tugas Utama):
@@ -31,7 +79,7 @@ BASE PROMPT (Tugas Utama):
 KEPRIBADIAN DAN GAYA KOMUNIKASI:
 {tone_prompt}
 
-PENTING: Selalu konsisten dengan kepribadian dan gaya komunikasi yang telah ditentukan di atas. 
+PENTING: Selalu konsisten dengan kepribadian dan gaya komunikasi yang telah ditentukan di atas.
 Jangan pernah mengubah kepribadian atau gaya komunikasi selama percakapan.
 
 FITUR DAN TOOLS:
@@ -45,20 +93,11 @@ INSTRUKSI UTAMA:
 4. Jangan terlalu mengandalkan tool untuk menjawab, gunakan state messages history untuk menjawab pertanyaan.
 5. Gunakan tool seperlunya saja.
 
-PERCAKAPAN SEBELUMNYA:
-{previous_context if previous_context else "Belum ada percakapan sebelumnya"}
-
-Sekarang, jawablah pertanyaan pengguna dengan konsisten mengikuti kepribadian dan gaya komunikasi yang telah ditentukan.
+Jawablah pertanyaan pengguna dengan konsisten mengikuti kepribadian dan gaya komunikasi yang telah ditentukan.
 """
-            ),
-            HumanMessage(content=user_message),
-        ]
 
-    def agent_describe_document(self, user_message: str, document: str):
-        tone_prompt = get_tone(self.tone)
-        return [
-            SystemMessage(
-                content=f"""
+    def _describe_document_template(self, tone_prompt: str) -> str:
+        return f"""
 Kamu adalah agent yang bertugas untuk mendeskripsikan document yang telah diberikan oleh pengguna.
 
 KEPRIBADIAN DAN GAYA KOMUNIKASI:
@@ -71,21 +110,9 @@ INSTRUKSI:
 2. Pastikan deskripsi tersebut sesuai dengan instruksi pengguna (jika ada).
 3. Gunakan gaya komunikasi yang sesuai dengan kepribadian yang ditentukan.
 """
-            ),
-            HumanMessage(
-                content=f"""
-instruksi:{user_message}
-Berikut adalah isi dokumen yang harus kamu deskripsikan:
-{document}
-"""
-            ),
-        ]
 
-    def agent_answer_rag_question(self, user_message: str, tool_message):
-        tone_prompt = get_tone(self.tone)
-        return [
-            SystemMessage(
-                content=f"""
+    def _answer_rag_template(self, tone_prompt: str) -> str:
+        return f"""
 Kamu adalah agent yang bertugas untuk menjelaskan hasil pencarian dari agent sebelumnya mengenai document RAG.
 
 KEPRIBADIAN DAN GAYA KOMUNIKASI:
@@ -93,18 +120,78 @@ KEPRIBADIAN DAN GAYA KOMUNIKASI:
 
 PENTING: Selalu konsisten dengan kepribadian dan gaya komunikasi yang telah ditentukan di atas.
 
-HASIL PENCARIAN DOCUMENT RAG:
-{tool_message}
-
 INSTRUKSI:
-1. Pastikan kamu menjawab pertanyaan pengguna berdasarkan hasil pencarian document tersebut.
+1. Pastikan kamu menjawab pertanyaan pengguna berdasarkan hasil pencarian document yang diberikan.
 2. Gunakan gaya komunikasi yang sesuai dengan kepribadian yang ditentukan.
 3. Sampaikan informasi dengan cara yang sesuai dengan karakteristik kepribadian.
+"""
+
+    def _memory_section(self, memory_context: Optional[str]) -> str:
+        if not memory_context:
+            return ""
+        return f"""
+INFORMASI TENTANG PENGGUNA (dari percakapan sebelumnya):
+{memory_context}
+"""
+
+    def main_agent(
+        self,
+        user_message: str,
+        previous_context: Optional[str] = None,
+        memory_context: Optional[str] = None,
+    ) -> CompiledPrompt:
+        if not previous_context and not memory_context:
+            user_content = user_message
+        else:
+            user_content = self._memory_section(memory_context)
+            if previous_context:
+                user_content += f"""
+PERCAKAPAN SEBELUMNYA:
+{previous_context}
+"""
+            user_content += f"""
+PESAN PENGGUNA:
+{user_message}
+"""
+        return CompiledPrompt(
+            self._main_agent_prefix, [HumanMessage(content=user_content)]
+        )
+
+    def agent_describe_document(self, user_message: str, document: str):
+        return CompiledPrompt(
+            self._describe_document_prefix,
+            [
+                HumanMessage(
+                    content=f"""
+instruksi:{user_message}
+Berikut adalah isi dokumen yang harus kamu deskripsikan:
+{document}
+"""
+                )
+            ],
+        )
+
+    def agent_answer_rag_question(
+        self,
+        user_message: str,
+        tool_message,
+        memory_context: Optional[str] = None,
+    ):
+        # Search results change every turn, so they go after the cached prefix
+        return CompiledPrompt(
+            self._answer_rag_prefix,
+            [
+                HumanMessage(
+                    content=f"""{self._memory_section(memory_context)}
+HASIL PENCARIAN DOCUMENT RAG:
+{tool_message}
 
+PERTANYAAN PENGGUNA:
+{user_message}
 """
-            ),
-            HumanMessage(content=user_message),
-        ]
+                )
+            ],
+        )
 
 
 # if __name__ == "__main__":
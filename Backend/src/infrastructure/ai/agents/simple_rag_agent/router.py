@@ -0,0 +1,59 @@
+import re
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Pesan basa-basi yang tidak butuh pencarian dokumen
+SMALL_TALK_WORDS = {
+    "halo",
+    "hallo",
+    "hai",
+    "hi",
+    "hello",
+    "hey",
+    "pagi",
+    "siang",
+    "sore",
+    "malam",
+    "selamat",
+    "terima",
+    "kasih",
+    "makasih",
+    "thanks",
+    "thank",
+    "you",
+    "ok",
+    "oke",
+    "okay",
+    "sip",
+    "baik",
+    "ya",
+    "iya",
+    "tidak",
+    "nggak",
+    "bye",
+    "dah",
+    "sampai",
+    "jumpa",
+}
+
+
+class LocalRagRouter:
+    """
+    Decide without an LLM call whether a message needs the documents.
+
+    Only obvious small talk is routed to the main agent, anything else goes
+    straight to retrieval so the answer costs a single LLM call.
+    """
+
+    def __init__(self, max_small_talk_words: int = 4):
+        self.max_small_talk_words = max_small_talk_words
+
+    def needs_retrieval(self, user_message: str) -> bool:
+        words = _WORD_PATTERN.findall(user_message.lower())
+        if not words:
+            return False
+        if len(words) <= self.max_small_talk_words and all(
+            word in SMALL_TALK_WORDS for word in words
+        ):
+            return False
+        return True
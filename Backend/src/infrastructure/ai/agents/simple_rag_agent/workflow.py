@@ -1,20 +1,32 @@
-from typing import Any, Dict
+import uuid
+from typing import Any, Dict, Literal, Optional
 
 from dotenv import load_dotenv
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, START, StateGraph
-from langgraph.prebuilt import ToolNode
 
-from ...components.tools import RetrieveDocumentTool
+from src.config.config import settings
+from src.core.exceptions.agent_exceptions import AgentDeadlineExceededException
+
+from ...components import HedgePolicy, memory_write_queue
+from ...components.tools import RetrieveDocumentTool, SpeculativeRetrieval
 from ..base_workflow import BaseWorkflow
+from ..execution import ExecutionContext
+from ..graph_templates import graph_templates, workflow_node
 from .models import SimpleRagState
 from .prompts import SimpleRagPrompt
+from .router import LocalRagRouter
 
 load_dotenv()
 
+RagMode = Literal["two_step", "single_call", "routed"]
+
 
 class SimpleRagWorkflow(BaseWorkflow):
+    answer_nodes = ("main_agent", "answer_by_rag")
+
     def __init__(
         self,
         retrieve_document_tool: RetrieveDocumentTool,
@@ -24,83 +36,327 @@ class SimpleRagWorkflow(BaseWorkflow):
         llm_model: str = "gpt-3.5-turbo",
         include_short_memory: bool = False,
         include_long_memory: bool = False,
+        speculative_retrieval: bool = False,
+        rag_mode: RagMode = "two_step",
+        max_tool_rounds: int = 2,
+        hedge_policy: Optional[HedgePolicy] = None,
     ):
         super().__init__(
-            llm_model, llm_provider, include_long_memory, include_short_memory
+            llm_model,
+            llm_provider,
+            include_long_memory,
+            include_short_memory,
+            hedge_policy=hedge_policy,
         )
         self.retrieve_document_tool = retrieve_document_tool
-        # Use MemorySaver for now since RedisSaver has async issues
-        # Can be replaced with RedisSaver when async support is fully implemented
-        # self.checkpointer = MemorySaver() if state_saver is None else MemorySaver()
+        # MemorySaver or AsyncRedisSaver, the graph is always run with ainvoke
         self.checkpointer = state_saver
         self.prompts = prompt
+        # two_step: answer_by_rag re-prompts with the search result
+        # single_call: the ToolMessage goes back to the main agent conversation
+        # routed: a local router skips the tool-decision call for questions
+        self.rag_mode = rag_mode
+        self.router = LocalRagRouter() if rag_mode == "routed" else None
+        # Opt-in: retrieve for the user message while the LLM decides on tools.
+        # The routed mode always prefetches, it knows retrieval is needed.
+        self.speculative_retrieval = (
+            SpeculativeRetrieval(self.retrieve_document_tool.read_document)
+            if speculative_retrieval or self.router
+            else None
+        )
+        self.max_tool_rounds = max_tool_rounds
         self.build = self._build_workflow()
 
     def _build_workflow(self):
-        graph = StateGraph(SimpleRagState)
-        graph.add_node("main_agent", self._main_agent)
-        graph.add_node(
-            "read_document", ToolNode(tools=[self.retrieve_document_tool.read_document])
+        # Compiled once per topology, shared by every agent with the same options
+        key = (
+            type(self).__name__,
+            self.rag_mode,
+            self._needs_gather_context(),
+            self.speculative_retrieval is not None,
+            self.checkpointer,
         )
-        graph.add_node("answer_by_rag", self._answer_by_rag)
-        graph.add_edge(START, "main_agent")
+        return graph_templates.get_or_compile(key, self._compile_workflow)
+
+    def _needs_gather_context(self) -> bool:
+        return bool(self.is_include_long_memory() or self.speculative_retrieval)
+
+    def _compile_workflow(self):
+        graph = StateGraph(SimpleRagState)
+        graph.add_node("main_agent", workflow_node("_main_agent"))
+        graph.add_node("read_document", workflow_node("_read_document"))
+        entry = START
+        if self._needs_gather_context():
+            graph.add_node("gather_context", workflow_node("_gather_context"))
+            graph.add_edge(START, "gather_context")
+            entry = "gather_context"
+        if self.router:
+            graph.add_node("prepare_retrieval", workflow_node("_prepare_retrieval"))
+            graph.add_conditional_edges(
+                entry,
+                workflow_node("_route_message"),
+                {"retrieve": "prepare_retrieval", "chat": "main_agent"},
+            )
+            graph.add_edge("prepare_retrieval", "read_document")
+        else:
+            graph.add_edge(entry, "main_agent")
         graph.add_conditional_edges(
             "main_agent",
-            self.conditional_tool_call,
+            workflow_node("conditional_tool_call", with_config=False),
             {"tool_call": "read_document", "end": END},
         )
 
-        graph.add_edge("read_document", "answer_by_rag")
-        graph.add_edge("answer_by_rag", END)
+        if self.rag_mode == "single_call":
+            graph.add_edge("read_document", "main_agent")
+        else:
+            graph.add_node("answer_by_rag", workflow_node("_answer_by_rag"))
+            graph.add_edge("read_document", "answer_by_rag")
+            graph.add_edge("answer_by_rag", END)
 
         return graph.compile(checkpointer=self.checkpointer)
 
-    def _main_agent(self, state: SimpleRagState) -> Dict[str, Any]:
-        prompt = self.prompts.main_agent(state.user_message)
+    def _gather_context(
+        self, state: SimpleRagState, config: RunnableConfig
+    ) -> Dict[str, Any]:
+        """
+        Fan out the lookups the LLM calls depend on before the first one.
+
+        Document retrieval is started in the background first, then the
+        long-term memory is searched on this thread, so both run concurrently
+        and the main agent only waits for the slower of the two.
+        """
+        context = self.get_execution_context(config)
+        if self.speculative_retrieval and (
+            not self.router or self.router.needs_retrieval(state.user_message)
+        ):
+            context.speculative_retrieval = self.speculative_retrieval.start(
+                state.user_message
+            )
+
+        if self.is_include_long_memory():
+            try:
+                context.memory_context = context.run_stage(
+                    "memory",
+                    settings.AGENT_MEMORY_TIMEOUT_SECONDS,
+                    self.get_memory(config).get_context,
+                    state.user_message,
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to load long-term memory: {e}")
+        return {}
+
+    def _main_agent(
+        self, state: SimpleRagState, config: RunnableConfig
+    ) -> Dict[str, Any]:
+        if self.rag_mode == "single_call" and state.messages:
+            if isinstance(self.get_state_last_message(state.messages), ToolMessage):
+                return self._answer_with_tool_result(state, config)
+
+        context = self.get_execution_context(config)
+        prompt = self.prompts.main_agent(
+            state.user_message, memory_context=context.memory_context
+        )
         all_previous_messages = self.get_all_previous_messages(state.messages)
-        messages: list[Any] = [prompt[0]] + list(all_previous_messages) + [prompt[1]]
+        messages = prompt.to_messages(
+            all_previous_messages, self.get_summary_message(state)
+        )
 
         response = self.call_llm_with_tool(
-            messages, [self.retrieve_document_tool.read_document]
+            messages, [self.retrieve_document_tool.read_document], config
+        )
+        if self.speculative_retrieval and not response.tool_calls:
+            self.speculative_retrieval.cancel(context.speculative_retrieval)
+
+        # With a tool call the answer comes after the tool result
+        if not response.tool_calls:
+            self._remember(config, state.user_message, response)
+
+        self.record_usage(config, "main_agent", messages, response)
+
+        return {
+            # add_messages appends, so only the new messages are returned
+            "messages": [HumanMessage(content=state.user_message), response],
+            "response": response.content,
+        }
+
+    def _answer_with_tool_result(
+        self, state: SimpleRagState, config: RunnableConfig
+    ) -> Dict[str, Any]:
+        """
+        Second main agent turn in single_call mode.
+
+        The first call's messages are replayed unchanged and the tool call and
+        its result are appended, so the whole first prompt is a cacheable
+        prefix and no separate RAG prompt is needed.
+        """
+        turn_start = self._current_turn_start(state.messages)
+        all_previous_messages = self.get_all_previous_messages(
+            state.messages[:turn_start]
+        )
+        current_turn = list(state.messages[turn_start + 1 :])
+        prompt = self.prompts.main_agent(
+            state.user_message,
+            memory_context=self.get_execution_context(config).memory_context,
+        )
+        messages = (
+            prompt.to_messages(all_previous_messages, self.get_summary_message(state))
+            + current_turn
         )
 
-        # response = self.call_llm(messages)
+        tool_rounds = sum(isinstance(m, ToolMessage) for m in current_turn)
+        if tool_rounds >= self.max_tool_rounds:
+            # Stop the tool loop, the model has to answer with what it has
+            response = self.call_llm(messages, config)
+        else:
+            response = self.call_llm_with_tool(
+                messages, [self.retrieve_document_tool.read_document], config
+            )
+
+        if not response.tool_calls:
+            self._remember(config, state.user_message, response)
+
+        self.record_usage(config, "main_agent", messages, response)
+        return {
+            "messages": [response],
+            "response": response.content,
+        }
+
+    def _route_message(self, state: SimpleRagState, config: RunnableConfig):
+        if self.router.needs_retrieval(state.user_message):
+            return "retrieve"
+        return "chat"
+
+    def _prepare_retrieval(
+        self, state: SimpleRagState, config: RunnableConfig
+    ) -> Dict[str, Any]:
+        """Issue the read_document call the main agent would have made."""
+        tool_call = AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "read_document",
+                    "args": {"query": state.user_message},
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                }
+            ],
+        )
+        return {
+            "messages": [HumanMessage(content=state.user_message), tool_call],
+        }
+
+    def _current_turn_start(self, messages) -> int:
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], HumanMessage):
+                return index
+        return 0
+
+    def _remember(
+        self, config: RunnableConfig, user_message: str, response: AIMessage
+    ) -> None:
         if self.is_include_long_memory():
             message = [
-                HumanMessage(content=state.user_message),
+                HumanMessage(content=user_message),
                 AIMessage(content=response.content),
             ]
 
-            self.memory.add_context(message)
+            # Written in the background, mem0 extraction is slow
+            memory_write_queue.submit(self.get_memory(config), message)
 
-        self.estimate_total_tokens(prompt, state.user_message, response.content)
+    def _read_document(self, state: SimpleRagState, config: RunnableConfig):
+        """Run read_document, reusing the speculative retrieval result if any."""
+        context = self.get_execution_context(config)
+        task, context.speculative_retrieval = context.speculative_retrieval, None
+        last_message = self.get_state_last_message(state.messages)
+        tool_messages = []
+        for tool_call in getattr(last_message, "tool_calls", []):
+            query = tool_call["args"].get("query", "")
+            content = (
+                self.speculative_retrieval.resolve(task, query, context.remaining())
+                if self.speculative_retrieval
+                else None
+            )
+            # Only the first tool call may reuse the speculative result
+            task = None
+            if content is None:
+                content = self._retrieve(context, query)
+            tool_messages.append(
+                ToolMessage(
+                    content=content,
+                    name=tool_call["name"],
+                    tool_call_id=tool_call["id"],
+                )
+            )
+        return {"messages": tool_messages}
 
-        return {
-            "messages": list(state.messages)
-            + [HumanMessage(content=state.user_message)]
-            + [response],
-            "response": response.content,
-        }
+    def _retrieve(self, context: ExecutionContext, query: str) -> str:
+        try:
+            return context.run_stage(
+                "retrieval",
+                settings.AGENT_RETRIEVAL_TIMEOUT_SECONDS,
+                self.retrieve_document_tool.read_document,
+                query,
+            )
+        except AgentDeadlineExceededException:
+            if context.expired():
+                raise
+            # Only the retrieval budget ran out, answer without the documents
+            self.logger.warning(f"Document retrieval timed out for query: {query}")
+            return "Dokumen tidak dapat diambil saat ini."
 
-    def _answer_by_rag(self, state: SimpleRagState):
+    def _answer_by_rag(self, state: SimpleRagState, config: RunnableConfig):
         tool_message = self.get_content_state_last_message(state.messages)
         print(f"TOOL MESSAGE: {tool_message}")
         # llm prompt
         prompt = self.prompts.agent_answer_rag_question(
-            state.user_message, tool_message
+            state.user_message,
+            tool_message,
+            memory_context=self.get_execution_context(config).memory_context,
         )
         all_previous_messages = self.get_all_previous_messages(state.messages)
-        messages: list[Any] = [prompt[0]] + list(all_previous_messages) + [prompt[1]]
-        response = self.call_llm(messages)
+        messages = prompt.to_messages(
+            all_previous_messages, self.get_summary_message(state)
+        )
+        response = self.call_llm(messages, config)
+        self._remember(config, state.user_message, response)
 
-        self.estimate_total_tokens(prompt, state.user_message, response.content)
+        self.record_usage(config, "answer_by_rag", messages, response)
         return {
-            "messages": list(state.messages) + [response],
+            "messages": [response],
             "response": response.content,
         }
 
-    def run(self, state: SimpleRagState, thread_id: str):
-        return self.build.invoke(
-            state,
-            config={"configurable": {"thread_id": thread_id}},
+    async def append_turn(
+        self, thread_id: str, user_message: str, response: str
+    ) -> None:
+        if not self.use_short_memory:
+            return
+        # as_node runs main_agent's edge, which needs the workflow in the config
+        await self.build.aupdate_state(
+            self.build_config(thread_id, ExecutionContext(thread_id)),
+            {
+                "messages": [
+                    HumanMessage(content=user_message),
+                    AIMessage(content=response),
+                ],
+                "user_message": user_message,
+                "response": response,
+            },
+            as_node="main_agent",
+        )
+        self.schedule_summary_refresh(self.build, thread_id)
+
+    def run(self, state: SimpleRagState, thread_id: str, context: ExecutionContext):
+        return self.build.invoke(state, config=self.build_config(thread_id, context))
+
+    async def arun(
+        self, state: SimpleRagState, thread_id: str, context: ExecutionContext
+    ):
+        config = self.build_config(thread_id, context)
+        run = (
+            self.astream_answer(self.build, state, config, context)
+            if context.on_partial_response
+            else self.build.ainvoke(state, config=config)
         )
+        result = await self.run_until_deadline(run, context)
+        self.schedule_summary_refresh(self.build, thread_id)
+        return result
@@ -1,4 +1,43 @@
-from .memory.long_memory import LongTermMemory
+from .memory import (
+    ConversationHistoryManager,
+    HistoryWindow,
+    LongTermMemory,
+    MemoryWriteQueue,
+    memory_write_queue,
+    references_history,
+)
+from .resilience import (
+    CircuitBreaker,
+    HedgedLLMCaller,
+    HedgePolicy,
+    ProviderRateLimiter,
+    ResilientLLMCaller,
+    RetryPolicy,
+    circuit_breakers,
+    rate_limiters,
+)
+from .tokenizer import TokenizerService, tokenizer_service
 from .tools.retrieve_document import RetrieveDocumentTool
+from .usage import UsageLedger, UsageRecord
 
-__all__ = ["RetrieveDocumentTool", "LongTermMemory"]
+__all__ = [
+    "RetrieveDocumentTool",
+    "LongTermMemory",
+    "ConversationHistoryManager",
+    "HistoryWindow",
+    "MemoryWriteQueue",
+    "memory_write_queue",
+    "references_history",
+    "UsageLedger",
+    "UsageRecord",
+    "CircuitBreaker",
+    "HedgedLLMCaller",
+    "HedgePolicy",
+    "ProviderRateLimiter",
+    "ResilientLLMCaller",
+    "RetryPolicy",
+    "circuit_breakers",
+    "rate_limiters",
+    "TokenizerService",
+    "tokenizer_service",
+]
@@ -1,3 +1,16 @@
+from .conversation_history import (
+    ConversationHistoryManager,
+    HistoryWindow,
+    references_history,
+)
 from .long_memory import LongTermMemory
+from .memory_write_queue import MemoryWriteQueue, memory_write_queue
 
-__all__ = ["LongTermMemory"]
+__all__ = [
+    "ConversationHistoryManager",
+    "HistoryWindow",
+    "LongTermMemory",
+    "MemoryWriteQueue",
+    "memory_write_queue",
+    "references_history",
+]
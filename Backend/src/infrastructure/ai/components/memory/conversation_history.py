@@ -0,0 +1,192 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from ..tokenizer import tokenizer_service
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Kata yang merujuk ke percakapan sebelumnya
+HISTORY_REFERENCE_WORDS = {
+    "itu",
+    "ini",
+    "tersebut",
+    "tadi",
+    "sebelumnya",
+    "barusan",
+    "dia",
+    "mereka",
+    "lagi",
+    "juga",
+    "lanjut",
+    "it",
+    "that",
+    "this",
+    "those",
+    "them",
+    "he",
+    "she",
+    "they",
+    "previous",
+    "earlier",
+    "above",
+    "again",
+    "also",
+}
+
+
+def references_history(user_message: str) -> bool:
+    """
+    Whether the message may lean on earlier turns ("harganya?", "yang tadi").
+
+    Conservative: any referring word, or a word with the Indonesian "-nya"
+    suffix, counts as history dependent.
+    """
+    for word in _WORD_PATTERN.findall(user_message.lower()):
+        if word in HISTORY_REFERENCE_WORDS:
+            return True
+        if len(word) > 4 and word.endswith("nya"):
+            return True
+    return False
+
+
+# Marks the per-thread summary among the (otherwise static) system messages
+SUMMARY_MESSAGE_ID = "conversation_summary"
+
+
+@dataclass
+class HistoryWindow:
+    # Recent turns sent to the LLM as is
+    messages: List[BaseMessage] = field(default_factory=list)
+    # Number of leading messages left out of the window
+    folded_count: int = 0
+
+
+class ConversationHistoryManager:
+    """
+    Keep the prompt history bounded regardless of conversation length.
+
+    The last ``max_turns`` turns are kept verbatim as long as they fit in
+    ``token_budget``; older turns are folded into a rolling summary that is
+    refreshed after the response and stored in the agent checkpoint.
+    A turn starts at a HumanMessage, so tool calls are never split from
+    their ToolMessage.
+    """
+
+    def __init__(
+        self,
+        llm_model: str,
+        max_turns: int = 6,
+        token_budget: int = 2000,
+        summary_token_budget: int = 300,
+    ):
+        self.llm_model = llm_model
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+
+    def split_turns(self, messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([message])
+            else:
+                turns[-1].append(message)
+        return turns
+
+    def count_tokens(self, messages: Sequence[BaseMessage]) -> int:
+        return sum(
+            tokenizer_service.count_tokens_batch(
+                [self._message_text(message) for message in messages], self.llm_model
+            )
+        )
+
+    def window(self, messages: Sequence[BaseMessage]) -> HistoryWindow:
+        """
+        Select the newest turns that fit in the turn and token budgets.
+
+        The newest turn is always kept, even over the budget (e.g. with a
+        large tool result), so the conversation is never dropped entirely.
+        """
+        kept: List[List[BaseMessage]] = []
+        used_tokens = 0
+        for turn in reversed(self.split_turns(messages)):
+            if len(kept) >= self.max_turns:
+                break
+            turn_tokens = self.count_tokens(turn)
+            if kept and used_tokens + turn_tokens > self.token_budget:
+                break
+            kept.append(turn)
+            used_tokens += turn_tokens
+
+        window_messages = [message for turn in reversed(kept) for message in turn]
+        return HistoryWindow(window_messages, len(messages) - len(window_messages))
+
+    def needs_summary(
+        self, messages: Sequence[BaseMessage], summarized_count: int
+    ) -> bool:
+        return self.window(messages).folded_count > summarized_count
+
+    def summary_message(self, summary: Optional[str]) -> Optional[SystemMessage]:
+        if not summary:
+            return None
+        return SystemMessage(
+            content=f"RINGKASAN PERCAKAPAN SEBELUMNYA:\n{summary}",
+            id=SUMMARY_MESSAGE_ID,
+        )
+
+    @staticmethod
+    def is_summary_message(message: BaseMessage) -> bool:
+        return message.id == SUMMARY_MESSAGE_ID
+
+    def build_summary_prompt(
+        self, previous_summary: Optional[str], messages: Sequence[BaseMessage]
+    ) -> List[BaseMessage]:
+        conversation = "\n".join(
+            f"{self._role(message)}: {self._message_text(message)}"
+            for message in messages
+            if not isinstance(message, ToolMessage)
+            and self._message_text(message).strip()
+        )
+        return [
+            SystemMessage(
+                content=f"""
+Kamu bertugas meringkas percakapan antara pengguna dan AI assistant.
+Gabungkan ringkasan sebelumnya dengan percakapan baru menjadi satu ringkasan singkat.
+Simpan fakta penting tentang pengguna, pertanyaan yang sudah dijawab, dan keputusan yang dibuat.
+Maksimal {self.summary_token_budget} token, tanpa pembuka atau penutup.
+"""
+            ),
+            HumanMessage(
+                content=f"""
+RINGKASAN SEBELUMNYA:
+{previous_summary or "-"}
+
+PERCAKAPAN BARU:
+{conversation}
+"""
+            ),
+        ]
+
+    def _role(self, message: BaseMessage) -> str:
+        if isinstance(message, HumanMessage):
+            return "Pengguna"
+        if isinstance(message, AIMessage):
+            return "Assistant"
+        return message.type
+
+    def _message_text(self, message: BaseMessage) -> str:
+        if isinstance(message.content, str):
+            return message.content
+        return " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in message.content
+        )
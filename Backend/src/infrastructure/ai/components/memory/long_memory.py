@@ -1,21 +1,45 @@
-from typing import Any, Dict, Sequence
+import threading
+from typing import Any, Dict, Optional, Sequence
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from mem0 import Memory
 
+from src.config.config import settings
+
+_shared_memory: Optional[Memory] = None
+_shared_memory_lock = threading.Lock()
+
+
+def get_shared_memory() -> Memory:
+    """
+    One mem0 backend (vector store client, LLM and embedder) per process.
+
+    Users are kept apart by the ``user_id`` passed on every call, so every
+    LongTermMemory can share it.
+    """
+    global _shared_memory
+    if _shared_memory is None:
+        with _shared_memory_lock:
+            if _shared_memory is None:
+                _shared_memory = Memory.from_config(
+                    {
+                        "vector_store": {
+                            "provider": "qdrant",
+                            "config": {
+                                "host": settings.QDRANT_HOST,
+                                "port": settings.QDRANT_PORT,
+                            },
+                        }
+                    }
+                )
+    return _shared_memory
+
 
 class LongTermMemory:
     def __init__(self, memory_id: str):
+        # memory_id is the namespace (mem0 user_id) of this user's memories
         self.memory_id = memory_id
-        # Initialize memory
-        self.memory = Memory.from_config(
-            {
-                "vector_store": {
-                    "provider": "qdrant",
-                    "config": {"host": "localhost", "port": "6333"},
-                }
-            }
-        )
+        self.memory = get_shared_memory()
 
     def get_context(self, query: str, limit: int = 3) -> str:
         """
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Protocol, Sequence, Set
+
+from langchain_core.messages import BaseMessage
+
+from src.core.utils.logger import get_logger
+
+
+class MemoryWriter(Protocol):
+    memory_id: str
+
+    def add_context(self, list_messages: Sequence[BaseMessage]) -> object: ...
+
+
+class MemoryWriteQueue:
+    """
+    Write-behind queue for long-term memory.
+
+    mem0's ``add`` runs an LLM extraction plus vector writes, so turns are
+    queued here and written by background threads instead of the graph node.
+    Turns queued for the same memory id are written in order and merged into
+    a single ``add_context`` call. The queue is bounded: when it is full,
+    ``submit`` blocks for up to ``submit_timeout`` seconds and then drops the
+    turn.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 1000,
+        max_batch_turns: int = 5,
+        workers: int = 2,
+        submit_timeout: float = 1.0,
+    ):
+        self.max_pending = max_pending
+        self.max_batch_turns = max_batch_turns
+        self.workers = workers
+        self.submit_timeout = submit_timeout
+        self.logger = get_logger(__name__)
+
+        self._condition = threading.Condition()
+        self._pending: Dict[str, List[Sequence[BaseMessage]]] = {}
+        self._writers: Dict[str, MemoryWriter] = {}
+        self._ready: Deque[str] = deque()
+        self._in_flight: Set[str] = set()
+        self._size = 0
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    @property
+    def pending_count(self) -> int:
+        return self._size
+
+    def submit(self, writer: MemoryWriter, messages: Sequence[BaseMessage]) -> bool:
+        """Queue one turn, returns False when it was dropped."""
+        deadline = time.monotonic() + self.submit_timeout
+        with self._condition:
+            if self._stopping:
+                self.logger.warning("Memory queue is shutting down, write dropped")
+                return False
+            while self._size >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.logger.warning(
+                        f"Memory queue full ({self._size}), dropped write for "
+                        f"{writer.memory_id}"
+                    )
+                    return False
+                self._condition.wait(remaining)
+
+            memory_id = writer.memory_id
+            self._writers[memory_id] = writer
+            self._pending.setdefault(memory_id, []).append(list(messages))
+            self._size += 1
+            if memory_id not in self._in_flight and memory_id not in self._ready:
+                self._ready.append(memory_id)
+            self._start_workers()
+            self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued turn is written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._size or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float | None = 30.0) -> bool:
+        """Flush pending writes and stop the workers."""
+        flushed = self.flush(timeout)
+        if not flushed:
+            self.logger.warning(
+                f"Memory queue shutdown with {self._size} writes still pending"
+            )
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        return flushed
+
+    def _start_workers(self) -> None:
+        # Called with the condition held
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker, name="memory-write-behind", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                while not self._ready and not self._stopping:
+                    self._condition.wait()
+                if not self._ready:
+                    return
+                memory_id = self._ready.popleft()
+                turns = self._pending.get(memory_id, [])
+                batch = turns[: self.max_batch_turns]
+                del turns[: self.max_batch_turns]
+                if not turns:
+                    self._pending.pop(memory_id, None)
+                writer = self._writers[memory_id]
+                self._in_flight.add(memory_id)
+
+            try:
+                writer.add_context([message for turn in batch for message in turn])
+            except Exception as e:
+                self.logger.error(f"Failed to write memory for {memory_id}: {e}")
+            finally:
+                with self._condition:
+                    self._in_flight.discard(memory_id)
+                    self._size -= len(batch)
+                    if memory_id in self._pending:
+                        self._ready.append(memory_id)
+                    else:
+                        self._writers.pop(memory_id, None)
+                    self._condition.notify_all()
+
+
+memory_write_queue = MemoryWriteQueue()
@@ -0,0 +1,18 @@
+from .circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, circuit_breakers
+from .hedging import HedgedLLMCaller, HedgePolicy
+from .llm_resilience import ResilientLLMCaller, RetryPolicy, is_retryable_error
+from .rate_limiter import ProviderRateLimiter, RateLimiterRegistry, rate_limiters
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "circuit_breakers",
+    "HedgedLLMCaller",
+    "HedgePolicy",
+    "ResilientLLMCaller",
+    "RetryPolicy",
+    "is_retryable_error",
+    "ProviderRateLimiter",
+    "RateLimiterRegistry",
+    "rate_limiters",
+]
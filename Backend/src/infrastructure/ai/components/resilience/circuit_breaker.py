@@ -0,0 +1,148 @@
+import threading
+import time
+from typing import Dict, Literal, Tuple
+
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+_STATE_VALUE = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an LLM provider/model keeps failing.
+
+    closed -> open after ``failure_threshold`` consecutive failures;
+    open -> half_open once ``recovery_timeout`` seconds have passed, letting
+    ``half_open_max_calls`` probe calls through; a successful probe closes
+    the circuit, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.provider = provider
+        self.model = model
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.logger = get_logger(__name__)
+
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._publish_state()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._refresh_state()
+            if self._state == "closed":
+                return True
+            if (
+                self._state == "half_open"
+                and self._half_open_calls < self.half_open_max_calls
+            ):
+                self._half_open_calls += 1
+                return True
+
+        metrics.increment(
+            "llm_circuit_rejections_total", provider=self.provider, model=self.model
+        )
+        return False
+
+    def release(self) -> None:
+        """Give back a request that was allowed but never reached the provider."""
+        with self._lock:
+            if self._state == "half_open" and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state != "closed":
+                self._transition("closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._refresh_state()
+            self._failures += 1
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition("open")
+
+    def _refresh_state(self) -> None:
+        # Called with the lock held
+        if (
+            self._state == "open"
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._transition("half_open")
+
+    def _transition(self, state: CircuitState) -> None:
+        # Called with the lock held
+        previous, self._state = self._state, state
+        self._half_open_calls = 0
+        self.logger.warning(
+            f"Circuit {self.provider}/{self.model}: {previous} -> {state}"
+        )
+        metrics.increment(
+            "llm_circuit_transitions_total",
+            provider=self.provider,
+            model=self.model,
+            to=state,
+        )
+        self._publish_state()
+
+    def _publish_state(self) -> None:
+        metrics.set_gauge(
+            "llm_circuit_state",
+            _STATE_VALUE[self._state],
+            provider=self.provider,
+            model=self.model,
+        )
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per (provider, model), shared by every agent."""
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        key = (provider, model)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(
+                    provider,
+                    model,
+                    failure_threshold=self.failure_threshold,
+                    recovery_timeout=self.recovery_timeout,
+                )
+            return breaker
+
+
+circuit_breakers = CircuitBreakerRegistry()
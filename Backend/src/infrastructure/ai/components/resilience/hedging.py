@@ -0,0 +1,301 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks.base import BaseCallbackManager
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+
+from src.config.config import settings
+from src.core.exceptions.llm_exceptions import (
+    CircuitOpenException,
+    LLMCallCancelledException,
+    LLMDeadlineExceededException,
+)
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+from .llm_resilience import ResilientLLMCaller, is_retryable_error
+
+# Primary and hedged calls run here while the node thread waits for the
+# winner. A loser can't be aborted and holds its thread until the provider
+# answers, so each provider gets its own pool: a brownout of one provider
+# doesn't queue the calls (and failovers) to the others.
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_threads_in_use: Dict[str, int] = {}
+
+# How often a waiting node thread checks the invocation's cancel event
+_CANCEL_POLL_SECONDS = 0.1
+
+
+def _executor_for(provider: str) -> ThreadPoolExecutor:
+    with _executors_lock:
+        executor = _executors.get(provider)
+        if executor is None:
+            executor = _executors[provider] = ThreadPoolExecutor(
+                max_workers=settings.LLM_HEDGE_WORKERS_PER_PROVIDER,
+                thread_name_prefix=f"llm-hedge-{provider}",
+            )
+        return executor
+
+
+def _track_threads(provider: str, delta: int) -> None:
+    with _executors_lock:
+        in_use = _threads_in_use.get(provider, 0) + delta
+        _threads_in_use[provider] = in_use
+    metrics.set_gauge("llm_hedge_threads_in_use", in_use, provider=provider)
+
+
+def _run_tracked(provider: str, fn: Any, *args: Any) -> Any:
+    _track_threads(provider, 1)
+    try:
+        return fn(*args)
+    finally:
+        _track_threads(provider, -1)
+
+
+def _submit(caller: ResilientLLMCaller, *args: Any) -> Future:
+    """Run ``caller.invoke`` on its provider's pool in a copy of the caller's context."""
+    # Keeps LangChain callbacks (tracing) attached to the node
+    context = contextvars.copy_context()
+    config = context.get(var_child_runnable_config)
+    if config and config.get("callbacks"):
+        # Both attempts streaming would interleave two answers, hedged calls
+        # only deliver the winner's final text
+        context.run(
+            var_child_runnable_config.set,
+            {**config, "callbacks": _without_streaming(config["callbacks"])},
+        )
+    return _executor_for(caller.provider).submit(
+        context.run, _run_tracked, caller.provider, caller.invoke, *args
+    )
+
+
+def _without_streaming(callbacks: Any) -> Any:
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        for handler in list(callbacks.handlers + callbacks.inheritable_handlers):
+            if isinstance(handler, _StreamingCallbackHandler):
+                callbacks.remove_handler(handler)
+        return callbacks
+    return [
+        handler
+        for handler in callbacks
+        if not isinstance(handler, _StreamingCallbackHandler)
+    ]
+
+
+@dataclass
+class HedgePolicy:
+    """
+    Opt-in hedging and failover of an agent's LLM calls.
+
+    When the primary call is still running after the primary model's
+    ``latency_percentile`` latency (``default_delay`` until ``min_samples``
+    latencies were observed), a duplicate is sent to the fallback
+    provider/model, or to the primary again when no fallback is configured.
+    """
+
+    fallback_provider: Optional[str] = None
+    fallback_model: Optional[str] = None
+    latency_percentile: float = 95.0
+    min_samples: int = 20
+    default_delay: float = 8.0
+    min_delay: float = 0.5
+
+    @property
+    def has_fallback(self) -> bool:
+        return bool(self.fallback_provider and self.fallback_model)
+
+    def hedge_delay(self, provider: str, model: str) -> float:
+        labels = {"provider": provider, "model": model}
+        if metrics.sample_count("llm_latency_seconds", **labels) < self.min_samples:
+            return self.default_delay
+        latency = metrics.percentile(
+            "llm_latency_seconds", self.latency_percentile, **labels
+        )
+        return max(self.min_delay, latency or self.default_delay)
+
+
+def portable_messages(messages: Any) -> Any:
+    """Drop provider specific ``cache_control`` markers from content blocks."""
+    if not isinstance(messages, list):
+        return messages
+
+    portable = []
+    for message in messages:
+        content = getattr(message, "content", None)
+        if isinstance(message, BaseMessage) and isinstance(content, list):
+            blocks = [
+                {k: v for k, v in block.items() if k != "cache_control"}
+                if isinstance(block, dict)
+                else block
+                for block in content
+            ]
+            message = message.model_copy(update={"content": blocks})
+        portable.append(message)
+    return portable
+
+
+class HedgedLLMCaller:
+    """
+    Race a slow primary LLM call against a hedged duplicate.
+
+    The first successful response wins; the other call is cancelled (a call
+    that has not started yet is dropped, a running one stops retrying and its
+    response is discarded). With a fallback configured, calls fail over to it
+    right away while the primary's circuit is open, and when the primary
+    fails with a retryable error.
+    """
+
+    def __init__(
+        self,
+        primary: ResilientLLMCaller,
+        policy: HedgePolicy,
+        fallback: Optional[ResilientLLMCaller] = None,
+    ):
+        self.primary = primary
+        self.policy = policy
+        self.fallback = fallback
+        self.logger = get_logger(__name__)
+
+    def invoke(
+        self,
+        primary_runnable: Any,
+        messages: Any,
+        deadline: Optional[float] = None,
+        fallback_runnable: Any = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Any:
+        if self.fallback is not None and fallback_runnable is not None:
+            hedge_caller, hedge_runnable = self.fallback, fallback_runnable
+            hedge_messages = self._messages_for(self.fallback, messages)
+        else:
+            hedge_caller, hedge_runnable = self.primary, primary_runnable
+            hedge_messages = messages
+        can_fail_over = hedge_caller is not self.primary
+
+        if can_fail_over and self.primary.breaker.is_open():
+            self._count("llm_failover_total", reason="circuit_open")
+            return hedge_caller.invoke(
+                hedge_runnable, hedge_messages, deadline, cancel_event
+            )
+
+        primary_cancel = threading.Event()
+        primary = _submit(
+            self.primary, primary_runnable, messages, deadline, primary_cancel
+        )
+        races = {primary: ("primary", primary_cancel)}
+        done, _ = self._wait(races, self._hedge_delay(deadline), cancel_event)
+        if done:
+            error = primary.exception()
+            if error is None:
+                return primary.result()
+            if not can_fail_over or not self._should_fail_over(error):
+                raise error
+            self.logger.warning(
+                f"LLM {self.primary.provider}/{self.primary.model} failed, "
+                f"failing over to {hedge_caller.provider}/{hedge_caller.model}"
+            )
+            self._count("llm_failover_total", reason="error")
+            return hedge_caller.invoke(
+                hedge_runnable, hedge_messages, deadline, cancel_event
+            )
+
+        self._count("llm_hedges_total")
+        hedge_cancel = threading.Event()
+        hedge = _submit(
+            hedge_caller, hedge_runnable, hedge_messages, deadline, hedge_cancel
+        )
+        races[hedge] = ("hedge", hedge_cancel)
+        return self._first_success(races, deadline, cancel_event)
+
+    def _first_success(
+        self,
+        races: Dict[Future, Tuple[str, threading.Event]],
+        deadline: Optional[float],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Any:
+        pending = set(races)
+        errors: List[BaseException] = []
+        while pending:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            done, pending = self._wait(
+                {future: races[future] for future in pending}, timeout, cancel_event
+            )
+            if not done:
+                self._cancel(races, pending)
+                raise LLMDeadlineExceededException()
+
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+                    continue
+                self._cancel(races, pending)
+                self._count("llm_hedge_wins_total", winner=races[future][0])
+                return future.result()
+
+        raise errors[0]
+
+    def _wait(
+        self,
+        races: Dict[Future, Tuple[str, threading.Event]],
+        timeout: Optional[float],
+        cancel_event: Optional[threading.Event],
+    ) -> Tuple[set, set]:
+        """
+        Wait up to ``timeout`` for the first of ``races`` to finish.
+
+        When the invocation is cancelled first, the races are told to stop
+        and LLMCallCancelledException is raised.
+        """
+        if cancel_event is None:
+            return wait(races, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            poll = _CANCEL_POLL_SECONDS
+            if end is not None:
+                poll = min(poll, max(0.0, end - time.monotonic()))
+            done, pending = wait(races, timeout=poll, return_when=FIRST_COMPLETED)
+            if done or (end is not None and time.monotonic() >= end):
+                return done, pending
+            if cancel_event.is_set():
+                self._cancel(races, pending)
+                raise LLMCallCancelledException()
+
+    @staticmethod
+    def _cancel(races: Dict[Future, Tuple[str, threading.Event]], losers: set) -> None:
+        for future in losers:
+            races[future][1].set()
+            future.cancel()
+
+    def _hedge_delay(self, deadline: Optional[float]) -> float:
+        delay = self.policy.hedge_delay(self.primary.provider, self.primary.model)
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        return delay
+
+    def _messages_for(self, caller: ResilientLLMCaller, messages: Any) -> Any:
+        if caller.provider == self.primary.provider:
+            return messages
+        return portable_messages(messages)
+
+    @staticmethod
+    def _should_fail_over(error: BaseException) -> bool:
+        if isinstance(error, CircuitOpenException):
+            return True
+        return is_retryable_error(error)
+
+    def _count(self, name: str, **labels: Any) -> None:
+        metrics.increment(
+            name, provider=self.primary.provider, model=self.primary.model, **labels
+        )
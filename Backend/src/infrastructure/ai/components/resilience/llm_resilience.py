@@ -0,0 +1,228 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.core.exceptions.llm_exceptions import (
+    CircuitOpenException,
+    LLMCallCancelledException,
+    LLMDeadlineExceededException,
+    LLMProviderException,
+)
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+from .circuit_breaker import CircuitBreaker, circuit_breakers
+from .rate_limiter import (
+    ProviderRateLimiter,
+    RateLimitLease,
+    estimate_tokens,
+    rate_limiters,
+)
+
+# Rate limits, timeouts, overload and server errors are worth another attempt
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Providers whose SDK accepts a per-request ``timeout``
+_TIMEOUT_AWARE_PROVIDERS = {"openai", "anthropic"}
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, LLMProviderException):
+        # Raised by this module: open circuit, deadline or cancelled hedge
+        return False
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is None:
+        # Connection errors and client-side timeouts
+        return True
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, so retries don't line up."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2**attempt)))
+
+
+class ResilientLLMCaller:
+    """
+    Call an LLM runnable with retries, a deadline and a circuit breaker.
+
+    ``deadline`` is a ``time.monotonic()`` timestamp shared by every LLM call
+    of one agent invocation; no attempt or backoff sleep goes past it.
+    Setting ``cancel_event`` stops the retry loop at the next attempt, e.g.
+    once a hedged duplicate of the call already answered. Every attempt first
+    waits for the (provider, model) rate limiter, queued under ``queue_key``.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[ProviderRateLimiter] = None,
+        queue_key: Optional[str] = None,
+    ):
+        self.provider = provider
+        self.model = model
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or circuit_breakers.get(provider, model)
+        self.limiter = limiter or rate_limiters.get(provider, model)
+        # Fair queueing unit of the rate limiter, one per agent by default
+        self.queue_key = queue_key or f"caller-{id(self)}"
+        self.logger = get_logger(__name__)
+
+    def invoke(
+        self,
+        runnable: Any,
+        messages: Any,
+        deadline: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Any:
+        estimated_tokens = estimate_tokens(messages)
+        for attempt in range(self.retry_policy.max_attempts):
+            if cancel_event is not None and cancel_event.is_set():
+                raise LLMCallCancelledException()
+            self._before_attempt(deadline)
+            reported = False
+            try:
+                lease = self.limiter.acquire(self.queue_key, estimated_tokens, deadline)
+                started = time.perf_counter()
+                try:
+                    remaining = self._remaining(deadline)
+                    response = runnable.invoke(
+                        messages, **self._timeout_kwargs(remaining)
+                    )
+                except Exception as e:
+                    lease.release()
+                    reported = self._reaches_breaker(e)
+                    delay = self._after_failure(e, attempt, deadline)
+                    if cancel_event is not None:
+                        cancel_event.wait(delay)
+                    else:
+                        time.sleep(delay)
+                    continue
+                self._after_success(started, lease, response)
+                reported = True
+                return response
+            finally:
+                if not reported:
+                    # Deadline or cancellation, a half-open probe is given back
+                    self.breaker.release()
+        raise RuntimeError("unreachable")  # _after_failure raises on last attempt
+
+    async def ainvoke(
+        self, runnable: Any, messages: Any, deadline: Optional[float] = None
+    ) -> Any:
+        estimated_tokens = estimate_tokens(messages)
+        for attempt in range(self.retry_policy.max_attempts):
+            self._before_attempt(deadline)
+            reported = False
+            try:
+                lease = await asyncio.to_thread(
+                    self.limiter.acquire, self.queue_key, estimated_tokens, deadline
+                )
+                started = time.perf_counter()
+                try:
+                    remaining = self._remaining(deadline)
+                    response = await asyncio.wait_for(
+                        runnable.ainvoke(messages, **self._timeout_kwargs(remaining)),
+                        timeout=remaining,
+                    )
+                except asyncio.TimeoutError:
+                    lease.release()
+                    self.breaker.record_failure()
+                    reported = True
+                    raise LLMDeadlineExceededException()
+                except asyncio.CancelledError:
+                    lease.release()
+                    raise
+                except Exception as e:
+                    lease.release()
+                    reported = self._reaches_breaker(e)
+                    await asyncio.sleep(self._after_failure(e, attempt, deadline))
+                    continue
+                self._after_success(started, lease, response)
+                reported = True
+                return response
+            finally:
+                if not reported:
+                    self.breaker.release()
+        raise RuntimeError("unreachable")
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            metrics.increment(
+                "llm_deadline_exceeded_total", provider=self.provider, model=self.model
+            )
+            raise LLMDeadlineExceededException()
+        return remaining
+
+    def _before_attempt(self, deadline: Optional[float]) -> None:
+        self._remaining(deadline)
+        if not self.breaker.allow_request():
+            raise CircuitOpenException(self.provider, self.model)
+
+    def _timeout_kwargs(self, remaining: Optional[float]) -> Dict[str, Any]:
+        if remaining is None or self.provider not in _TIMEOUT_AWARE_PROVIDERS:
+            return {}
+        return {"timeout": remaining}
+
+    def _after_success(
+        self, started: float, lease: RateLimitLease, response: Any
+    ) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        lease.release(usage.get("total_tokens"))
+        self.breaker.record_success()
+        metrics.observe(
+            "llm_latency_seconds",
+            time.perf_counter() - started,
+            provider=self.provider,
+            model=self.model,
+        )
+
+    @staticmethod
+    def _reaches_breaker(error: Exception) -> bool:
+        # Our own deadline and cancellation say nothing about the provider
+        return not isinstance(error, LLMProviderException)
+
+    def _after_failure(
+        self, error: Exception, attempt: int, deadline: Optional[float]
+    ) -> float:
+        """Return how long to wait before retrying, or raise the error."""
+        if not self._reaches_breaker(error):
+            raise error
+        metrics.increment("llm_errors_total", provider=self.provider, model=self.model)
+        retryable = is_retryable_error(error)
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            # The provider answered, the request itself was bad
+            self.breaker.record_success()
+
+        if not retryable or attempt + 1 >= self.retry_policy.max_attempts:
+            raise error
+
+        delay = self.retry_policy.backoff_delay(attempt)
+        remaining = self._remaining(deadline)
+        if remaining is not None:
+            delay = min(delay, remaining)
+        self.logger.warning(
+            f"LLM call to {self.provider}/{self.model} failed (attempt "
+            f"{attempt + 1}): {error}. Retrying in {delay:.2f}s..."
+        )
+        metrics.increment("llm_retries_total", provider=self.provider, model=self.model)
+        return delay
@@ -0,0 +1,365 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Protocol, Sequence, Tuple
+
+from redis import Redis
+
+from src.config.config import settings
+from src.core.exceptions.llm_exceptions import LLMDeadlineExceededException
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+# Reserved per call on top of the prompt until the real usage is known
+DEFAULT_EXPECTED_OUTPUT_TOKENS = 512
+
+
+class RateBuckets(Protocol):
+    def try_take(self, amounts: Sequence[float]) -> float:
+        """Take ``amounts`` from the buckets, or return the seconds to wait."""
+        ...
+
+    def give_back(self, amounts: Sequence[float]) -> None: ...
+
+
+class LocalRateBuckets:
+    """Token buckets kept in this process, refilled continuously; 0 is unlimited."""
+
+    def __init__(self, per_minute: Sequence[float]):
+        self.capacity = [float(limit) for limit in per_minute]
+        self.level = list(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        for index, capacity in enumerate(self.capacity):
+            if capacity > 0:
+                self.level[index] = min(
+                    capacity, self.level[index] + elapsed * capacity / 60
+                )
+
+    def try_take(self, amounts: Sequence[float]) -> float:
+        with self._lock:
+            self._refill()
+            wait = 0.0
+            for level, capacity, amount in zip(self.level, self.capacity, amounts):
+                if capacity > 0 and level < amount:
+                    wait = max(wait, (amount - level) * 60 / capacity)
+            if wait:
+                return wait
+            for index, amount in enumerate(amounts):
+                if self.capacity[index] > 0:
+                    self.level[index] -= amount
+            return 0.0
+
+    def give_back(self, amounts: Sequence[float]) -> None:
+        with self._lock:
+            for index, amount in enumerate(amounts):
+                if self.capacity[index] > 0:
+                    self.level[index] = min(
+                        self.capacity[index], self.level[index] + amount
+                    )
+
+
+# KEYS: one hash per bucket; ARGV: now, force, then (capacity, amount) per
+# bucket. Takes from every bucket or from none (force: always), returns the
+# seconds to wait. A bucket with capacity 0 is unlimited and left untouched.
+_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local force = ARGV[2] == '1'
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local amount = tonumber(ARGV[i * 2 + 2])
+    if capacity > 0 then
+        local state = redis.call('HMGET', key, 'level', 'ts')
+        local level = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        level = math.min(capacity, level + math.max(0, now - ts) * capacity / 60)
+        levels[i] = level
+        if not force and level < amount then
+            wait = math.max(wait, (amount - level) * 60 / capacity)
+        end
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local amount = tonumber(ARGV[i * 2 + 2])
+    if capacity > 0 then
+        if wait == 0 then
+            levels[i] = math.min(capacity, levels[i] - amount)
+        end
+        redis.call('HSET', key, 'level', tostring(levels[i]), 'ts', tostring(now))
+        redis.call('EXPIRE', key, 120)
+    end
+end
+return tostring(wait)
+"""
+
+
+class RedisRateBuckets:
+    """
+    Token buckets shared by every worker through Redis.
+
+    Falls back to local buckets while Redis is unreachable, so a Redis
+    outage degrades to per-process limits instead of failing LLM calls.
+    """
+
+    def __init__(self, client: Any, key_prefix: str, per_minute: Sequence[float]):
+        self.client = client
+        self.capacity = [float(limit) for limit in per_minute]
+        self.keys = [f"{key_prefix}:{index}" for index in range(len(self.capacity))]
+        self.local = LocalRateBuckets(per_minute)
+        self.logger = get_logger(__name__)
+        self._script = client.register_script(_TAKE_SCRIPT)
+
+    def _run(self, amounts: Sequence[float], force: bool = False) -> float:
+        args = [time.time(), 1 if force else 0]
+        for capacity, amount in zip(self.capacity, amounts):
+            args.extend([capacity, amount])
+        return float(self._script(keys=self.keys, args=args))
+
+    def try_take(self, amounts: Sequence[float]) -> float:
+        try:
+            return self._run(amounts)
+        except Exception as e:
+            self.logger.warning(f"Redis rate limiter unavailable, using local: {e}")
+            return self.local.try_take(amounts)
+
+    def give_back(self, amounts: Sequence[float]) -> None:
+        try:
+            self._run([-amount for amount in amounts], force=True)
+        except Exception:
+            self.local.give_back(amounts)
+
+
+@dataclass
+class RateLimitLease:
+    limiter: "ProviderRateLimiter"
+    reserved_tokens: int
+    released: bool = False
+
+    def release(self, used_tokens: Optional[int] = None) -> None:
+        if not self.released:
+            self.released = True
+            self.limiter.release(self, used_tokens)
+
+
+class ProviderRateLimiter:
+    """
+    Rate shaping of the LLM calls made to one provider key and model.
+
+    A call needs a free in-flight slot, one request from the requests/min
+    bucket and its estimated tokens from the tokens/min bucket. Waiting calls
+    are served round robin across queue keys (one per agent), so one busy
+    agent cannot starve the others. Time spent waiting is published as
+    ``llm_queue_wait_seconds``. A limit of 0 or None is unlimited; with no
+    limits at all, calls are only counted.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        requests_per_minute: Optional[int],
+        tokens_per_minute: Optional[int],
+        max_in_flight: Optional[int],
+        buckets: Optional[RateBuckets] = None,
+    ):
+        self.provider = provider
+        self.model = model
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self.max_in_flight = max_in_flight or 0
+        if buckets is None and (self.requests_per_minute or self.tokens_per_minute):
+            buckets = LocalRateBuckets(
+                [self.requests_per_minute, self.tokens_per_minute]
+            )
+        self.buckets = buckets
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._queues: Dict[str, Deque[object]] = {}
+        self._turns: Deque[str] = deque()
+
+    @property
+    def is_unlimited(self) -> bool:
+        return self.buckets is None and not self.max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def acquire(
+        self,
+        queue_key: str,
+        estimated_tokens: int,
+        deadline: Optional[float] = None,
+    ) -> RateLimitLease:
+        # A single call larger than the whole bucket would wait forever
+        tokens = min(estimated_tokens, self.tokens_per_minute or estimated_tokens)
+        if self.is_unlimited:
+            with self._condition:
+                self._in_flight += 1
+            return RateLimitLease(self, tokens)
+
+        ticket = object()
+        started = time.monotonic()
+
+        with self._condition:
+            self._queues.setdefault(queue_key, deque()).append(ticket)
+            if queue_key not in self._turns:
+                self._turns.append(queue_key)
+            self._publish_depth()
+            try:
+                while True:
+                    timeout = None
+                    if self._is_next(queue_key, ticket):
+                        if (
+                            not self.max_in_flight
+                            or self._in_flight < self.max_in_flight
+                        ):
+                            wait = (
+                                self.buckets.try_take([1, tokens])
+                                if self.buckets is not None
+                                else 0.0
+                            )
+                            if not wait:
+                                break
+                            timeout = wait
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            metrics.increment(
+                                "llm_queue_timeouts_total",
+                                provider=self.provider,
+                                model=self.model,
+                            )
+                            raise LLMDeadlineExceededException()
+                        timeout = (
+                            remaining if timeout is None else min(timeout, remaining)
+                        )
+                    self._condition.wait(timeout)
+                self._in_flight += 1
+            finally:
+                self._leave_queue(queue_key, ticket)
+
+        metrics.observe(
+            "llm_queue_wait_seconds",
+            time.monotonic() - started,
+            provider=self.provider,
+            model=self.model,
+        )
+        return RateLimitLease(self, tokens)
+
+    def release(self, lease: RateLimitLease, used_tokens: Optional[int] = None) -> None:
+        if (
+            self.buckets is not None
+            and used_tokens is not None
+            and used_tokens != lease.reserved_tokens
+        ):
+            # Settle the reservation with what the provider reported
+            self.buckets.give_back([0, lease.reserved_tokens - used_tokens])
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _is_next(self, queue_key: str, ticket: object) -> bool:
+        # Called with the condition held
+        return (
+            bool(self._turns)
+            and self._turns[0] == queue_key
+            and (self._queues[queue_key][0] is ticket)
+        )
+
+    def _leave_queue(self, queue_key: str, ticket: object) -> None:
+        # Called with the condition held; the next agent gets its turn
+        queue = self._queues[queue_key]
+        queue.remove(ticket)
+        if self._turns and self._turns[0] == queue_key:
+            self._turns.popleft()
+            if queue:
+                self._turns.append(queue_key)
+        elif not queue:
+            self._turns.remove(queue_key)
+        if not queue:
+            del self._queues[queue_key]
+        self._publish_depth()
+        self._condition.notify_all()
+
+    def _publish_depth(self) -> None:
+        metrics.set_gauge(
+            "llm_queue_depth",
+            sum(len(queue) for queue in self._queues.values()),
+            provider=self.provider,
+            model=self.model,
+        )
+
+
+def estimate_tokens(
+    messages: Any, expected_output_tokens: int = DEFAULT_EXPECTED_OUTPUT_TOKENS
+) -> int:
+    """Rough prompt size (~4 chars per token) plus the expected answer."""
+    if isinstance(messages, str):
+        text_length = len(messages)
+    else:
+        text_length = sum(
+            len(str(getattr(message, "content", message))) for message in messages
+        )
+    return text_length // 4 + expected_output_tokens
+
+
+class RateLimiterRegistry:
+    """One ProviderRateLimiter per (provider, model), shared by every agent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters: Dict[Tuple[str, str], ProviderRateLimiter] = {}
+        self._redis = None
+
+    def get(self, provider: str, model: str) -> ProviderRateLimiter:
+        key = (provider, model)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = self._create(provider, model)
+            return limiter
+
+    def _create(self, provider: str, model: str) -> ProviderRateLimiter:
+        limits = settings.LLM_RATE_LIMITS.get(
+            f"{provider}/{model}", settings.LLM_RATE_LIMITS.get(provider, {})
+        )
+        rpm = int(limits.get("rpm", settings.LLM_DEFAULT_RPM) or 0)
+        tpm = int(limits.get("tpm", settings.LLM_DEFAULT_TPM) or 0)
+        max_in_flight = int(
+            limits.get("max_in_flight", settings.LLM_MAX_IN_FLIGHT) or 0
+        )
+
+        buckets = None
+        if settings.LLM_RATE_LIMIT_BACKEND == "redis" and (rpm or tpm):
+            buckets = RedisRateBuckets(
+                self._redis_client(settings.REDIS_URL),
+                f"llm_rate:{provider}:{model}",
+                [rpm, tpm],
+            )
+        return ProviderRateLimiter(provider, model, rpm, tpm, max_in_flight, buckets)
+
+    def _redis_client(self, redis_url: str):
+        # Called with the lock held; LLM calls run in worker threads, so the
+        # buckets use the synchronous client
+        if self._redis is None:
+            self._redis = Redis.from_url(redis_url)
+        return self._redis
+
+
+rate_limiters = RateLimiterRegistry()
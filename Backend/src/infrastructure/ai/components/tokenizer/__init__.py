@@ -0,0 +1,3 @@
+from .tokenizer_service import TokenizerService, tokenizer_service
+
+__all__ = ["TokenizerService", "tokenizer_service"]
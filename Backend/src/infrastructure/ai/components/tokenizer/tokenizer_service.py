@@ -0,0 +1,93 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import tiktoken
+from tiktoken.model import encoding_name_for_model
+
+from src.core.utils.logger import get_logger
+
+
+class TokenizerService:
+    """
+    Process-wide tiktoken access.
+
+    Loading BPE ranks is slow and memory-heavy, so every encoding is loaded
+    once and shared by all agents. Token counts of static prompt segments
+    (base prompts, tone prompts) are memoized with an LRU. An encoding
+    that fails to load falls back to a character estimate and is retried
+    after ``retry_seconds``.
+    """
+
+    def __init__(
+        self,
+        default_encoding: str = "cl100k_base",
+        static_cache_size: int = 1024,
+        retry_seconds: float = 60.0,
+    ):
+        self.default_encoding = default_encoding
+        self.retry_seconds = retry_seconds
+        self._encoders: Dict[str, tiktoken.Encoding] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._logger = get_logger(__name__)
+        self.count_static_tokens = lru_cache(maxsize=static_cache_size)(
+            self.count_tokens
+        )
+
+    def encoding_name(self, model: str) -> str:
+        try:
+            return encoding_name_for_model(model)
+        except KeyError:
+            return self.default_encoding
+
+    def get_encoder(self, model: str) -> Optional[tiktoken.Encoding]:
+        name = self.encoding_name(model)
+        encoder = self._encoders.get(name)
+        if encoder is not None:
+            return encoder
+
+        with self._lock:
+            if name in self._encoders:
+                return self._encoders[name]
+            # Don't retry the download on every call while it keeps failing
+            failed_at = self._failed_at.get(name)
+            if (
+                failed_at is not None
+                and time.monotonic() - failed_at < self.retry_seconds
+            ):
+                return None
+            try:
+                self._encoders[name] = tiktoken.get_encoding(name)
+                self._logger.info(f"Loaded tokenizer encoding: {name}")
+            except Exception as e:
+                self._logger.warning(f"Failed to load encoding {name}: {str(e)}")
+                self._failed_at[name] = time.monotonic()
+                return None
+            if self._failed_at.pop(name, None) is not None:
+                # Drop the memoized fallback estimates
+                self.count_static_tokens.cache_clear()
+            return self._encoders[name]
+
+    def count_tokens(self, text: str, model: str) -> int:
+        if not text:
+            return 0
+        encoder = self.get_encoder(model)
+        if encoder is None:
+            return len(text) // 4  # fallback
+        try:
+            return len(encoder.encode(text, disallowed_special=()))
+        except Exception as e:
+            self._logger.warning(f"Error estimating tokens: {str(e)}")
+            return len(text) // 4  # fallback
+
+    def count_tokens_batch(self, texts: Sequence[str], model: str) -> List[int]:
+        encoder = self.get_encoder(model)
+        if encoder is None:
+            return [len(text) // 4 for text in texts]
+        encoded = encoder.encode_batch(list(texts), disallowed_special=())
+        return [len(tokens) for tokens in encoded]
+
+
+tokenizer_service = TokenizerService()
@@ -1,3 +1,4 @@
 from .retrieve_document import RetrieveDocumentTool
+from .speculative_retrieval import SpeculativeRetrieval, SpeculativeRetrievalTask
 
-__all__ = ["RetrieveDocumentTool"]
+__all__ = ["RetrieveDocumentTool", "SpeculativeRetrieval", "SpeculativeRetrievalTask"]
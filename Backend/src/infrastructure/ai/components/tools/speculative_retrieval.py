@@ -0,0 +1,106 @@
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from src.core.utils.logger import get_logger
+
+# Shared by every agent, retrieval is I/O bound (embedding API + ChromaDB)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative-rag")
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SpeculativeRetrievalTask:
+    query: str
+    future: Future
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+class SpeculativeRetrieval:
+    """
+    Run document retrieval for the user message while the LLM is still
+    deciding whether it needs the ``read_document`` tool.
+
+    The speculative result is only reused when the query chosen by the LLM
+    is similar enough to the user message, otherwise the tool runs normally.
+    """
+
+    def __init__(
+        self,
+        retrieve: Callable[[str], str],
+        similarity_threshold: float = 0.6,
+        wait_timeout: float = 10.0,
+    ):
+        self.retrieve = retrieve
+        self.similarity_threshold = similarity_threshold
+        self.wait_timeout = wait_timeout
+        self.logger = get_logger(__name__)
+
+    def start(self, query: str) -> SpeculativeRetrievalTask:
+        return SpeculativeRetrievalTask(query, _executor.submit(self.retrieve, query))
+
+    def cancel(self, task: Optional[SpeculativeRetrievalTask]) -> None:
+        if task is not None:
+            task.future.cancel()
+
+    def resolve(
+        self,
+        task: Optional[SpeculativeRetrievalTask],
+        tool_query: str,
+        timeout: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Return the speculative result, or None when it can't be reused.
+
+        Waits at most ``wait_timeout`` seconds, or ``timeout`` if shorter
+        (what is left of the invocation deadline).
+        """
+        if task is None:
+            return None
+
+        similarity = self.similarity(task.query, tool_query)
+        if similarity < self.similarity_threshold:
+            self.logger.info(
+                f"Speculative retrieval miss (similarity={similarity:.2f}), "
+                f"running tool for query: {tool_query}"
+            )
+            task.future.cancel()
+            return None
+
+        try:
+            wait = (
+                self.wait_timeout
+                if timeout is None
+                else min(timeout, self.wait_timeout)
+            )
+            result = task.future.result(timeout=wait)
+        except FutureTimeoutError:
+            self.logger.warning("Speculative retrieval timed out, running tool")
+            return None
+        except Exception as e:
+            self.logger.warning(f"Speculative retrieval failed: {e}")
+            return None
+
+        self.logger.info(
+            f"Speculative retrieval hit (similarity={similarity:.2f}), "
+            f"started {time.perf_counter() - task.started_at:.2f}s ago"
+        )
+        return result
+
+    @staticmethod
+    def similarity(user_query: str, tool_query: str) -> float:
+        """
+        Overlap coefficient between the two queries' words.
+
+        The LLM usually rewrites the question into a few keywords taken from
+        the user message, so a subset counts as a full match.
+        """
+        user_words = set(_WORD_PATTERN.findall(user_query.lower()))
+        tool_words = set(_WORD_PATTERN.findall(tool_query.lower()))
+        if not user_words or not tool_words:
+            return 0.0
+        return len(user_words & tool_words) / min(len(user_words), len(tool_words))
@@ -0,0 +1,3 @@
+from .usage_ledger import UsageLedger, UsageRecord
+
+__all__ = ["UsageLedger", "UsageRecord"]
@@ -0,0 +1,111 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Optional
+
+
+@dataclass
+class UsageRecord:
+    node: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cache_creation_tokens: int = 0
+    source: Literal["provider", "estimated"] = "provider"
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class UsageLedger:
+    """
+    Token usage of a single agent invocation, one record per LLM call.
+
+    Records come from the provider's ``usage_metadata`` whenever it is present,
+    so counts include tool-call tokens and match what the provider bills.
+    """
+
+    def __init__(self):
+        self._records: List[UsageRecord] = []
+        self._lock = threading.Lock()
+
+    def record(self, record: UsageRecord) -> UsageRecord:
+        with self._lock:
+            self._records.append(record)
+        return record
+
+    def records(self) -> List[UsageRecord]:
+        with self._lock:
+            return list(self._records)
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(record.input_tokens for record in self.records())
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(record.output_tokens for record in self.records())
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(record.cached_tokens for record in self.records())
+
+    @property
+    def cache_creation_tokens(self) -> int:
+        return sum(record.cache_creation_tokens for record in self.records())
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(record.total_tokens for record in self.records())
+
+    def cache_hit_ratio(self) -> float:
+        """Share of input tokens served from the provider's prompt cache."""
+        input_tokens = self.input_tokens
+        if not input_tokens:
+            return 0.0
+        return round(self.cached_tokens / input_tokens, 4)
+
+    def by_node(self) -> Dict[str, Dict[str, int]]:
+        summary: Dict[str, Dict[str, int]] = {}
+        for record in self.records():
+            node = summary.setdefault(
+                record.node,
+                {
+                    "calls": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cached_tokens": 0,
+                    "cache_creation_tokens": 0,
+                },
+            )
+            node["calls"] += 1
+            node["input_tokens"] += record.input_tokens
+            node["output_tokens"] += record.output_tokens
+            node["cached_tokens"] += record.cached_tokens
+            node["cache_creation_tokens"] += record.cache_creation_tokens
+        return summary
+
+    @staticmethod
+    def from_usage_metadata(
+        node: str, model: str, usage_metadata: Optional[Dict[str, Any]]
+    ) -> Optional[UsageRecord]:
+        """Build a record from a LangChain ``usage_metadata`` dict, if usable."""
+        if not usage_metadata:
+            return None
+
+        input_tokens = usage_metadata.get("input_tokens") or 0
+        output_tokens = usage_metadata.get("output_tokens") or 0
+        if not input_tokens and not output_tokens:
+            return None
+
+        input_details = usage_metadata.get("input_token_details") or {}
+        return UsageRecord(
+            node=node,
+            model=model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=input_details.get("cache_read") or 0,
+            cache_creation_tokens=input_details.get("cache_creation") or 0,
+            source="provider",
+        )
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from src.config.config import settings
+from src.core.utils.hash import hash_api_key
+from src.core.utils.metrics import metrics
+from src.domain.use_cases.interfaces import IApiKeyCache
+
+
+class ApiKeyCache(IApiKeyCache):
+    """
+    In-process TTL cache of API key checks, keyed by (agent_id, key hash).
+
+    Valid keys are kept for ``ttl_seconds`` (never past their own
+    ``expires_at``), invalid ones for ``negative_ttl_seconds`` so a client
+    retrying with a wrong key doesn't hit the DB each time. Bounded, least
+    recently used entries go first. Only the hash of a key is held.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.API_KEY_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = settings.API_KEY_NEGATIVE_CACHE_TTL_SECONDS,
+        max_entries: int = settings.API_KEY_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        # (agent_id, key hash) -> (valid, time.monotonic() of expiry)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bool, float]]" = (
+            OrderedDict()
+        )
+
+    def lookup(self, agent_id: str, api_key: str) -> Optional[bool]:
+        key = (agent_id, hash_api_key(api_key))
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self._entries.pop(key, None)
+            metrics.increment("api_key_cache_misses_total")
+            return None
+        self._entries.move_to_end(key)
+        metrics.increment("api_key_cache_hits_total", valid=entry[0])
+        return entry[0]
+
+    def remember(
+        self, agent_id: str, api_key: str, expires_at: Optional[datetime]
+    ) -> None:
+        now = time.monotonic()
+        if expires_at is None:
+            entry = (False, now + self.negative_ttl_seconds)
+        else:
+            ttl = min(self.ttl_seconds, self._seconds_until(expires_at))
+            if ttl <= 0:
+                return
+            entry = (True, now + ttl)
+
+        key = (agent_id, hash_api_key(api_key))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def evict_agent(self, agent_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == agent_id]:
+            del self._entries[key]
+
+    @staticmethod
+    def _seconds_until(expires_at: datetime) -> float:
+        # expires_at comes back naive (UTC) from MySQL
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+api_key_cache = ApiKeyCache()
@@ -0,0 +1,327 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from langgraph.checkpoint.redis.base import BaseRedisSaver
+from langgraph.checkpoint.redis.util import to_storage_safe_id, to_storage_safe_str
+from redisvl.query import FilterQuery
+from redisvl.query.filter import Tag
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CompactingAsyncRedisSaver(AsyncRedisSaver):
+    """
+    AsyncRedisSaver that keeps only the newest checkpoints of each thread.
+
+    Every key is written with the configured TTL (refreshed on read, the
+    ``checkpoint_latest`` pointer included), and after each put the thread is
+    compacted in the background down to ``keep_last`` checkpoints, together
+    with their pending writes. Keys keep the default
+    ``checkpoint:{thread_id}:...`` layout used by RedisStorage.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        ttl_minutes: Optional[float] = None,
+        keep_last: int = 3,
+    ):
+        ttl = (
+            {"default_ttl": ttl_minutes, "refresh_on_read": True}
+            if ttl_minutes
+            else None
+        )
+        super().__init__(redis_url, ttl=ttl)
+        self.keep_last = max(1, keep_last)
+        self._compactions: Dict[str, asyncio.Task] = {}
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        checkpoint_tuple = await super().aget_tuple(config)
+        if (
+            checkpoint_tuple is not None
+            and self.ttl_config
+            and self.ttl_config.get("refresh_on_read")
+        ):
+            # The saver refreshes the checkpoint but not the pointer to it;
+            # once the pointer expires the thread reads as empty
+            configurable = checkpoint_tuple.config["configurable"]
+            await self._redis.expire(
+                self._latest_pointer_key(
+                    configurable["thread_id"], configurable.get("checkpoint_ns", "")
+                ),
+                int(self.ttl_config["default_ttl"] * 60),
+            )
+        return checkpoint_tuple
+
+    @staticmethod
+    def _latest_pointer_key(thread_id: str, checkpoint_ns: str) -> str:
+        # Same key AsyncRedisSaver writes in aput
+        return (
+            f"checkpoint_latest:{to_storage_safe_id(thread_id)}:"
+            f"{to_storage_safe_str(checkpoint_ns)}"
+        )
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+        stream_mode: str = "values",
+    ) -> RunnableConfig:
+        next_config = await super().aput(
+            config, checkpoint, metadata, new_versions, stream_mode
+        )
+        configurable = next_config["configurable"]
+        self._schedule_compaction(
+            configurable["thread_id"], configurable.get("checkpoint_ns", "")
+        )
+        return next_config
+
+    def _schedule_compaction(self, thread_id: str, checkpoint_ns: str) -> None:
+        key = f"{thread_id}:{checkpoint_ns}"
+        running = self._compactions.get(key)
+        if running and not running.done():
+            # The running compaction will see this checkpoint next time
+            return
+
+        task = asyncio.create_task(self.acompact_thread(thread_id, checkpoint_ns))
+        self._compactions[key] = task
+        task.add_done_callback(lambda t: self._on_compaction_done(key, t))
+
+    def _on_compaction_done(self, key: str, task: asyncio.Task) -> None:
+        if self._compactions.get(key) is task:
+            del self._compactions[key]
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Failed to compact checkpoints {key}: {task.exception()}")
+
+    async def acompact_thread(self, thread_id: str, checkpoint_ns: str = "") -> int:
+        """Delete all but the newest ``keep_last`` checkpoints of a thread."""
+        safe_thread_id = to_storage_safe_id(thread_id)
+        safe_checkpoint_ns = to_storage_safe_str(checkpoint_ns)
+
+        results = await self.checkpoints_index.search(
+            FilterQuery(
+                filter_expression=(Tag("thread_id") == safe_thread_id)
+                & (Tag("checkpoint_ns") == safe_checkpoint_ns),
+                return_fields=["checkpoint_id"],
+                num_results=10000,
+            )
+        )
+        # Checkpoint ids are time ordered (uuid6), newest first
+        checkpoint_ids = sorted(
+            (getattr(doc, "checkpoint_id", "") for doc in results.docs), reverse=True
+        )
+        stale_ids = checkpoint_ids[self.keep_last :]
+        if not stale_ids:
+            return 0
+
+        keys_to_delete: List[str] = [
+            BaseRedisSaver._make_redis_checkpoint_key(
+                safe_thread_id, safe_checkpoint_ns, checkpoint_id
+            )
+            for checkpoint_id in stale_ids
+        ]
+
+        writes = await self.checkpoint_writes_index.search(
+            FilterQuery(
+                filter_expression=(Tag("thread_id") == safe_thread_id)
+                & (Tag("checkpoint_ns") == safe_checkpoint_ns)
+                & (Tag("checkpoint_id") == stale_ids),
+                return_fields=["checkpoint_id", "task_id", "idx"],
+                num_results=10000,
+            )
+        )
+        for doc in writes.docs:
+            keys_to_delete.append(
+                BaseRedisSaver._make_redis_checkpoint_writes_key(
+                    safe_thread_id,
+                    safe_checkpoint_ns,
+                    getattr(doc, "checkpoint_id", ""),
+                    getattr(doc, "task_id", ""),
+                    getattr(doc, "idx", 0),
+                )
+            )
+
+        if self._key_registry:
+            for checkpoint_id in stale_ids:
+                keys_to_delete.append(
+                    self._key_registry.make_write_keys_zset_key(
+                        thread_id, checkpoint_ns, checkpoint_id
+                    )
+                )
+
+        if self.cluster_mode:
+            for key in keys_to_delete:
+                await self._redis.delete(key)
+        else:
+            pipeline = self._redis.pipeline()
+            for key in keys_to_delete:
+                pipeline.delete(key)
+            await pipeline.execute()
+
+        logger.debug(
+            f"Compacted {len(stale_ids)} checkpoints for thread_id={thread_id}"
+        )
+        return len(stale_ids)
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    In-process saver that forgets idle threads.
+
+    Threads not read or written for ``ttl_minutes`` are dropped, and past
+    ``max_threads`` the least recently used ones go first, so the threads of
+    deleted agents and of users who left don't stay in memory for good.
+    Expired threads are swept at most once per ``sweep_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl_minutes: Optional[float] = None,
+        max_threads: Optional[int] = None,
+        sweep_interval: float = 60.0,
+    ):
+        super().__init__()
+        self.ttl_seconds = ttl_minutes * 60 if ttl_minutes else None
+        self.max_threads = max_threads
+        self.sweep_interval = sweep_interval
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def thread_count(self) -> int:
+        return len(self._last_used)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self._touch(config)
+        return super().get_tuple(config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        self._touch(config)
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        self._evict()
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self._touch(config)
+        super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._last_used.pop(thread_id, None)
+            self._delete_threads({thread_id})
+
+    def _touch(self, config: RunnableConfig) -> None:
+        thread_id = config.get("configurable", {}).get("thread_id")
+        if thread_id is None:
+            return
+        with self._lock:
+            self._last_used[str(thread_id)] = time.monotonic()
+            self._last_used.move_to_end(str(thread_id))
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            over_limit = (
+                self.max_threads is not None and len(self._last_used) > self.max_threads
+            )
+            if not over_limit and now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+
+            stale: Set[str] = set()
+            # Oldest first
+            for thread_id, used_at in self._last_used.items():
+                expired = self.ttl_seconds and now - used_at >= self.ttl_seconds
+                excess = (
+                    self.max_threads is not None
+                    and len(self._last_used) - len(stale) > self.max_threads
+                )
+                if not expired and not excess:
+                    break
+                stale.add(thread_id)
+            for thread_id in stale:
+                del self._last_used[thread_id]
+            self._delete_threads(stale)
+
+        if stale:
+            logger.debug(f"Evicted {len(stale)} idle agent threads from memory")
+
+    def _delete_threads(self, thread_ids: Set[str]) -> None:
+        if not thread_ids:
+            return
+        # One pass over writes and blobs for every thread, unlike delete_thread
+        for thread_id in thread_ids:
+            self.storage.pop(thread_id, None)
+        for key in [key for key in self.writes if key[0] in thread_ids]:
+            del self.writes[key]
+        for key in [key for key in self.blobs if key[0] in thread_ids]:
+            del self.blobs[key]
+
+
+_redis_checkpointer: Optional[CompactingAsyncRedisSaver] = None
+_memory_checkpointer = BoundedMemorySaver(
+    ttl_minutes=settings.AGENT_CHECKPOINT_TTL_MINUTES,
+    max_threads=settings.AGENT_MEMORY_CHECKPOINT_MAX_THREADS,
+)
+
+
+def get_agent_checkpointer() -> BaseCheckpointSaver:
+    """
+    Checkpointer for agent conversation state, shared by every agent.
+
+    With AGENT_CHECKPOINTER=redis it is a Redis saver, so conversations
+    survive restarts and are visible to every worker. Otherwise state lives
+    in one in-process BoundedMemorySaver that drops idle threads. Threads are
+    keyed by user agent id, so agents never share a thread; one saver lets
+    them share a compiled graph.
+    """
+    global _redis_checkpointer
+    if settings.AGENT_CHECKPOINTER != "redis":
+        return _memory_checkpointer
+
+    if _redis_checkpointer is None:
+        _redis_checkpointer = CompactingAsyncRedisSaver(
+            settings.REDIS_URL,
+            ttl_minutes=settings.AGENT_CHECKPOINT_TTL_MINUTES,
+            keep_last=settings.AGENT_CHECKPOINT_KEEP_LAST,
+        )
+    return _redis_checkpointer
+
+
+async def setup_agent_checkpointer() -> None:
+    """Create the RediSearch indexes used by the Redis checkpointer."""
+    checkpointer = get_agent_checkpointer()
+    if isinstance(checkpointer, CompactingAsyncRedisSaver):
+        await checkpointer.asetup()
+        logger.info("Redis agent checkpointer ready")
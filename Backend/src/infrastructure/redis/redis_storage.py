@@ -7,6 +7,8 @@ from src.config.config import settings
 from src.core.utils.logger import get_logger
 from src.domain.use_cases.interfaces import IStorageAgentObj
 
+from .response_cache import response_cache
+
 logger = get_logger(__name__)
 
 
@@ -66,6 +68,8 @@ class RedisStorage(IStorageAgentObj):
 
             # Simpan ulang ke Redis
             await self.store_agent(agent_id, agent)
+            # Prompt, tone or documents may have changed, cached answers are stale
+            await response_cache.invalidate(agent_id)
             logger.info(f"Agent {agent_id} updated successfully: {data}")
             return True
         except Exception as e:
@@ -131,6 +135,16 @@ class RedisStorage(IStorageAgentObj):
 
     async def get_agent_state_checkpoint(self, thread_id: str):
         try:
+            # The saver keeps a pointer to the newest checkpoint of the thread
+            latest_key = await self.redis_client.get(
+                f"checkpoint_latest:{thread_id}:__empty__"
+            )
+            if latest_key:
+                data = await self.redis_client.execute_command("JSON.GET", latest_key)
+                if data:
+                    logger.info(f"Checkpoint found for {thread_id}: {latest_key}")
+                    return json.loads(data).get("checkpoint", "")
+
             pattern = f"checkpoint:{thread_id}:*"
             async for key in self.redis_client.scan_iter(match=pattern):
                 data = await self.redis_client.execute_command("JSON.GET", key)
@@ -196,7 +210,9 @@ class RedisStorage(IStorageAgentObj):
             prefixes = [
                 f"checkpoint:{thread_id}:*",
                 f"checkpoint_write:{thread_id}:*",
-                f"checkpoint_blobs:{thread_id}:*",
+                f"checkpoint_blob:{thread_id}:*",
+                f"checkpoint_latest:{thread_id}:*",
+                f"write_keys_zset:{thread_id}:*",
             ]
 
             total_deleted = 0
@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+from src.domain.use_cases.interfaces import IResponseCache
+
+logger = get_logger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace: 'Jam buka?' -> 'jam buka'."""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", message.lower())).strip()
+
+
+@dataclass
+class _SemanticIndex:
+    generation: int
+    size: int
+    responses: List[str] = field(default_factory=list)
+    matrix: Optional[np.ndarray] = None
+
+
+class RedisResponseCache(IResponseCache):
+    """
+    Per agent cache of responses to repeated questions, shared by every worker.
+
+    Tier 1 matches the normalized message exactly; tier 2 compares the
+    message embedding with the cached ones and hits above the similarity
+    threshold. Invalidation bumps the agent's generation number, which makes
+    every older entry unreachable (they expire with their TTL). Failures are
+    logged and treated as misses, the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = settings.RESPONSE_CACHE_TTL_SECONDS,
+        max_semantic_entries: int = settings.RESPONSE_CACHE_MAX_SEMANTIC_ENTRIES,
+        similarity_threshold: float = settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    ):
+        self.redis_client = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        self.ttl_seconds = ttl_seconds
+        self.max_semantic_entries = max_semantic_entries
+        self.similarity_threshold = similarity_threshold
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+        # Local copy of each agent's semantic tier, reloaded when it changes
+        self._indexes: Dict[str, _SemanticIndex] = {}
+        # Embeddings computed on a miss, reused when the answer is stored
+        self._recent_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings(
+                model=settings.RESPONSE_CACHE_EMBEDDING_MODEL
+            )
+        return self._embeddings
+
+    def _key(self, agent_id: str, generation: int, suffix: str) -> str:
+        return f"response_cache:{agent_id}:{generation}:{suffix}"
+
+    async def _generation(self, agent_id: str) -> int:
+        return int(await self.redis_client.get(f"response_cache:{agent_id}:gen") or 0)
+
+    async def get(
+        self,
+        agent_id: str,
+        user_message: str,
+        similarity_threshold: Optional[float] = None,
+    ) -> Optional[str]:
+        try:
+            normalized = normalize_message(user_message)
+            if not normalized:
+                return None
+            digest = hashlib.sha1(normalized.encode()).hexdigest()
+            generation = await self._generation(agent_id)
+
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(self._key(agent_id, generation, f"exact:{digest}"))
+                pipe.hlen(self._key(agent_id, generation, "semantic"))
+                exact, semantic_size = await pipe.execute()
+            if exact is not None:
+                metrics.increment("response_cache_hits_total", tier="exact")
+                return exact
+
+            threshold = (
+                self.similarity_threshold
+                if similarity_threshold is None
+                else similarity_threshold
+            )
+            if threshold < 1 and semantic_size:
+                response = await self._semantic_lookup(
+                    agent_id, generation, semantic_size, digest, normalized, threshold
+                )
+                if response is not None:
+                    metrics.increment("response_cache_hits_total", tier="semantic")
+                    return response
+
+            metrics.increment("response_cache_misses_total")
+            return None
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed for {agent_id}: {e}")
+            return None
+
+    async def _semantic_lookup(
+        self,
+        agent_id: str,
+        generation: int,
+        semantic_size: int,
+        digest: str,
+        normalized: str,
+        threshold: float,
+    ) -> Optional[str]:
+        index = await self._load_index(agent_id, generation, semantic_size)
+        if index.matrix is None:
+            return None
+
+        vector = await self._embed(digest, normalized)
+        scores = index.matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= threshold:
+            return index.responses[best]
+        return None
+
+    async def _load_index(
+        self, agent_id: str, generation: int, semantic_size: int
+    ) -> _SemanticIndex:
+        index = self._indexes.get(agent_id)
+        if index and index.generation == generation and index.size == semantic_size:
+            return index
+
+        entries = await self.redis_client.hgetall(
+            self._key(agent_id, generation, "semantic")
+        )
+        index = _SemanticIndex(generation, len(entries))
+        vectors = []
+        for raw in entries.values():
+            entry = json.loads(raw)
+            index.responses.append(entry["response"])
+            vectors.append(
+                np.frombuffer(base64.b64decode(entry["embedding"]), dtype=np.float32)
+            )
+        if vectors:
+            index.matrix = np.vstack(vectors)
+        self._indexes[agent_id] = index
+        return index
+
+    async def _embed(self, digest: str, normalized: str) -> np.ndarray:
+        vector = self._recent_vectors.get(digest)
+        if vector is None:
+            raw = await self.embeddings.aembed_query(normalized)
+            vector = np.asarray(raw, dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+            self._recent_vectors[digest] = vector
+            while len(self._recent_vectors) > 1000:
+                self._recent_vectors.popitem(last=False)
+        return vector
+
+    async def set(self, agent_id: str, user_message: str, response: str) -> None:
+        try:
+            normalized = normalize_message(user_message)
+            if not normalized:
+                return
+            digest = hashlib.sha1(normalized.encode()).hexdigest()
+            generation = await self._generation(agent_id)
+            semantic_key = self._key(agent_id, generation, "semantic")
+
+            await self.redis_client.set(
+                self._key(agent_id, generation, f"exact:{digest}"),
+                response,
+                ex=self.ttl_seconds,
+            )
+            if await self.redis_client.hlen(semantic_key) >= self.max_semantic_entries:
+                return
+
+            vector = await self._embed(digest, normalized)
+            entry = {
+                "response": response,
+                "embedding": base64.b64encode(vector.tobytes()).decode(),
+            }
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(semantic_key, digest, json.dumps(entry))
+                pipe.expire(semantic_key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache response for {agent_id}: {e}")
+
+    async def invalidate(self, agent_id: str) -> None:
+        try:
+            await self.redis_client.incr(f"response_cache:{agent_id}:gen")
+            self._indexes.pop(agent_id, None)
+            logger.info(f"Response cache of agent {agent_id} invalidated")
+        except Exception as e:
+            logger.error(f"Failed to invalidate response cache of {agent_id}: {e}")
+
+
+response_cache = RedisResponseCache()
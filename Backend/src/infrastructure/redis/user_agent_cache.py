@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+from src.domain.use_cases.interfaces import IUserAgentCache
+
+logger = get_logger(__name__)
+
+
+class UserAgentCache(IUserAgentCache):
+    """
+    Bounded LRU of user agent ids known to exist, optionally shared via Redis.
+
+    Local entries expire after ``ttl_seconds`` so an id removed by another
+    worker isn't trusted forever. With a Redis client, a local miss checks
+    the agent's Redis set (``user_agents:{agent_id}``) before the caller
+    falls back to the database. Redis errors count as misses. Each write
+    pushes the set's expiry out to ``ttl_seconds``, so the set of an agent
+    that goes quiet is dropped instead of living as long as Redis does.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.USER_AGENT_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.USER_AGENT_CACHE_TTL_SECONDS,
+        redis_client: Optional[Redis] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self._entries: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+
+    def _redis_key(self, agent_id: str) -> str:
+        return f"user_agents:{agent_id}"
+
+    async def contains(self, agent_id: str, user_agent_id: str) -> bool:
+        key = (agent_id, user_agent_id)
+        expires_at = self._entries.get(key)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                metrics.increment("user_agent_cache_hits_total", tier="local")
+                return True
+            del self._entries[key]
+
+        if self.redis_client is not None:
+            try:
+                if await self.redis_client.sismember(
+                    self._redis_key(agent_id), user_agent_id
+                ):
+                    self._remember(key)
+                    metrics.increment("user_agent_cache_hits_total", tier="redis")
+                    return True
+            except Exception as e:
+                logger.warning(f"User agent cache lookup failed: {e}")
+
+        metrics.increment("user_agent_cache_misses_total")
+        return False
+
+    async def add(self, agent_id: str, user_agent_id: str) -> None:
+        self._remember((agent_id, user_agent_id))
+        if self.redis_client is not None:
+            try:
+                key = self._redis_key(agent_id)
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.sadd(key, user_agent_id)
+                    pipe.expire(key, self.ttl_seconds)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to share user agent {user_agent_id}: {e}")
+
+    async def invalidate_agent(self, agent_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == agent_id]:
+            del self._entries[key]
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.delete(self._redis_key(agent_id))
+            except Exception as e:
+                logger.error(f"Failed to invalidate user agents of {agent_id}: {e}")
+
+    def _remember(self, key: Tuple[str, str]) -> None:
+        self._entries[key] = time.monotonic() + self.ttl_seconds
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_agent_cache = UserAgentCache(
+    redis_client=(
+        Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        if settings.USER_AGENT_CACHE_BACKEND == "redis"
+        else None
+    )
+)
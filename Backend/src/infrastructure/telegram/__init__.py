@@ -1,3 +1,13 @@
+from .reply_stream import TelegramReplyStream
+from .send_queue import TelegramSendQueue
 from .telegram_handler import TelegramManager, telegram_manager
+from .update_queue import TelegramUpdateQueue, telegram_update_queue
 
-__all__ = ["telegram_manager", "TelegramManager"]
+__all__ = [
+    "telegram_manager",
+    "TelegramManager",
+    "TelegramReplyStream",
+    "TelegramSendQueue",
+    "telegram_update_queue",
+    "TelegramUpdateQueue",
+]
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from .telegram_handler import TelegramManager
+
+logger = get_logger(__name__)
+
+# Longest text Telegram accepts in one message
+MAX_MESSAGE_LENGTH = 4096
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Cut ``text`` into messages Telegram accepts, on a line break if possible."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    chunks.append(text)
+    return chunks
+
+
+class TelegramReplyStream:
+    """
+    A reply shown while the agent is still writing it.
+
+    ``start`` sends a placeholder message right away (through the bot's
+    send queue); ``update`` hands over the answer generated so far and the
+    placeholder is edited with it at most once per ``edit_interval``, and
+    only when the bot's send queue has a token for the chat.
+    ``finish`` edits in the final text, or sends it as a normal message when
+    the placeholder couldn't be sent. Edits during the stream are best
+    effort: a failed one is skipped and a 429 pauses them for its
+    ``retry_after``; only the final edit is retried.
+    """
+
+    def __init__(
+        self,
+        manager: "TelegramManager",
+        agent_id: str,
+        api_key: str,
+        chat_id: Any,
+        edit_interval: float = settings.TELEGRAM_STREAM_EDIT_INTERVAL_MS / 1000,
+        placeholder: str = settings.TELEGRAM_STREAM_PLACEHOLDER,
+        max_attempts: int = settings.TELEGRAM_SEND_MAX_ATTEMPTS,
+    ):
+        self.manager = manager
+        self.agent_id = agent_id
+        self.api_key = api_key
+        self.chat_id = chat_id
+        self.edit_interval = edit_interval
+        self.placeholder = placeholder
+        self.max_attempts = max_attempts
+
+        self.message_id: Optional[int] = None
+        self._text = ""
+        self._shown = placeholder
+        self._paused_until = 0.0
+        self._changed = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "TelegramReplyStream":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    @property
+    def is_finished(self) -> bool:
+        return self._finished.is_set()
+
+    def update(self, text: str) -> None:
+        """The answer so far, called from the event loop as tokens arrive."""
+        self._text = text
+        self._changed.set()
+
+    async def finish(self, text: str) -> Dict[str, Any]:
+        """Show ``text`` as the reply, returns the result like ``send_message``."""
+        self._finished.set()
+        if self._task is not None:
+            # Placeholder sent (or failed) and the last edit is done
+            await self._task
+
+        chunks = split_message(text)
+        result: Dict[str, Any] = {"status": False, "response": None}
+        if self.message_id is not None:
+            for _ in range(self.max_attempts):
+                # Paused by a 429, or a short backoff after a network error
+                await asyncio.sleep(max(0.0, self._paused_until - time.monotonic()))
+                result = await self._edit(chunks[0])
+                if result["status"] or not result.get("retryable"):
+                    break
+                if not result.get("retry_after"):
+                    self._paused_until = time.monotonic() + 1.0
+
+        if not result["status"]:
+            if self.message_id is not None:
+                logger.warning(
+                    f"Final edit failed for chat {self.chat_id}, sending the reply"
+                )
+            result = await self.manager.send_message(
+                self.agent_id, self.api_key, self.chat_id, chunks[0]
+            )
+        for chunk in chunks[1:]:
+            result = await self.manager.send_message(
+                self.agent_id, self.api_key, self.chat_id, chunk
+            )
+        return result
+
+    async def _run(self) -> None:
+        sent = await self.manager.send_message(
+            self.agent_id, self.api_key, self.chat_id, self.placeholder
+        )
+        try:
+            self.message_id = sent["response"]["result"]["message_id"]
+        except (KeyError, TypeError):
+            logger.warning(f"Placeholder not sent to chat {self.chat_id}: {sent}")
+            return
+
+        last_edit = 0.0
+        while not self._finished.is_set():
+            if await self._wait_for(self._changed):
+                break
+            self._changed.clear()
+            delay = (
+                max(last_edit + self.edit_interval, self._paused_until)
+                - time.monotonic()
+            )
+            if await self._wait(delay):
+                break
+            last_edit = time.monotonic()
+            await self._edit(split_message(self._text)[0], until_finished=True)
+
+    async def _edit(self, text: str, until_finished: bool = False) -> Dict[str, Any]:
+        if text == self._shown or not text.strip():
+            return {"status": True, "response": None}
+        if await self._wait_for_edit_token(until_finished):
+            return {"status": False, "response": None}
+        result = await self.manager.edit_message_text(
+            self.api_key, self.chat_id, self.message_id, text
+        )
+        if result["status"]:
+            self._shown = text
+            metrics.increment("telegram_stream_edits_total", agent_id=self.agent_id)
+        elif result.get("retry_after"):
+            self._paused_until = time.monotonic() + float(result["retry_after"])
+        return result
+
+    async def _wait_for_edit_token(self, until_finished: bool) -> bool:
+        """
+        Wait until the bot and the chat may send again, edits count as sends.
+
+        With ``until_finished`` gives up once the stream is finished, True then.
+        """
+        while True:
+            delay = self.manager.send_queue.take_edit_token(self.agent_id, self.chat_id)
+            if delay == 0:
+                return False
+            if not until_finished:
+                await asyncio.sleep(delay)
+            elif await self._wait(delay):
+                return True
+
+    async def _wait_for(self, event: asyncio.Event) -> bool:
+        """Wait for ``event`` or the finish, True when finished."""
+        waiters = [
+            asyncio.ensure_future(event.wait()),
+            asyncio.ensure_future(self._finished.wait()),
+        ]
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+        return self._finished.is_set()
+
+    async def _wait(self, seconds: float) -> bool:
+        """Sleep ``seconds`` unless finished first, True when finished."""
+        if seconds <= 0:
+            return self._finished.is_set()
+        try:
+            await asyncio.wait_for(self._finished.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self._finished.is_set()
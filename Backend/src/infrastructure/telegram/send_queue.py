@@ -0,0 +1,330 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# (api_key, chat_id, text) -> {"status", "response", "retryable", "retry_after"}
+Sender = Callable[[str, Any, str], Awaitable[Dict[str, Any]]]
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``capacity`` saved up."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available, 0 when there is one."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def hold(self, seconds: float, now: float) -> None:
+        """Hand out no token for the next ``seconds``."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class _Message:
+    api_key: str
+    chat_id: Any
+    text: str
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+@dataclass
+class _BotOutbox:
+    agent_id: str
+    bucket: TokenBucket
+    chats: "OrderedDict[str, Deque[_Message]]" = field(default_factory=OrderedDict)
+    chat_buckets: Dict[str, TokenBucket] = field(default_factory=dict)
+    in_flight: Set[str] = field(default_factory=set)
+    deliveries: Set[asyncio.Task] = field(default_factory=set)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    pending: int = 0
+    worker: Optional[asyncio.Task] = None
+
+
+class TelegramSendQueue:
+    """
+    Per bot outbound queue that keeps sendMessage under Telegram's limits.
+    Edits of sent messages are charged to the same buckets
+    (``take_edit_token``).
+
+    Every bot has a token bucket for all its messages (``bot_rate`` per
+    second) and one per chat (``chat_rate`` per second); a worker per bot
+    sends the oldest message of a chat with a token, rotating between
+    chats, and a chat's next message only goes out once the previous one
+    was delivered so replies keep their order. A 429 pauses the whole bot
+    for its ``retry_after``; network errors and 5xx are retried with a
+    backoff. Each message gets ``max_attempts`` tries, then the caller gets
+    the failure. A bot with ``max_pending`` messages waiting refuses more.
+    In-process only, every worker limits its own sends.
+    """
+
+    def __init__(
+        self,
+        sender: Sender,
+        bot_rate: float = settings.TELEGRAM_BOT_MESSAGES_PER_SECOND,
+        chat_rate: float = settings.TELEGRAM_CHAT_MESSAGES_PER_SECOND,
+        chat_burst: int = settings.TELEGRAM_CHAT_BURST,
+        max_attempts: int = settings.TELEGRAM_SEND_MAX_ATTEMPTS,
+        max_pending: int = settings.TELEGRAM_SEND_MAX_PENDING_PER_BOT,
+        retry_base_delay: float = 1.0,
+    ):
+        self.sender = sender
+        self.bot_rate = bot_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.retry_base_delay = retry_base_delay
+        self._bots: Dict[str, _BotOutbox] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def depth(self, agent_id: str) -> int:
+        """Messages of the bot that are queued or being sent."""
+        bot = self._bots.get(agent_id)
+        return bot.pending if bot else 0
+
+    async def send(
+        self, agent_id: str, api_key: str, chat_id: Any, text: str
+    ) -> Dict[str, Any]:
+        """Queue the message and wait until it is delivered or given up."""
+        bot = self._bot(agent_id)
+        if bot.pending >= self.max_pending:
+            metrics.increment("telegram_send_rejected_total", agent_id=agent_id)
+            logger.warning(f"Send queue of {agent_id} is full, message dropped")
+            return {"status": False, "response": "Telegram send queue is full"}
+
+        message = _Message(api_key, chat_id, text, self._loop.create_future())
+        bot.chats.setdefault(str(chat_id), deque()).append(message)
+        bot.pending += 1
+        self._report_depth(bot)
+        if bot.worker is None or bot.worker.done():
+            bot.worker = self._loop.create_task(self._run(bot))
+        bot.wakeup.set()
+        return await asyncio.shield(message.future)
+
+    def _bot(self, agent_id: str) -> _BotOutbox:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and events belong to one loop, e.g. a new one per test
+            self._loop = loop
+            self._bots.clear()
+        bot = self._bots.get(agent_id)
+        if bot is None:
+            bot = self._bots[agent_id] = _BotOutbox(
+                agent_id, TokenBucket(self.bot_rate, self.bot_rate)
+            )
+        return bot
+
+    async def stop(self, timeout: float = 10.0) -> bool:
+        """
+        Deliver the queued messages, then stop the workers. False on timeout.
+
+        Messages not delivered within ``timeout`` are given up: their
+        senders get a failed result.
+        """
+        if self._loop is not asyncio.get_running_loop():
+            # Workers of another (finished) loop are gone already
+            return True
+        workers = [
+            bot.worker
+            for bot in self._bots.values()
+            if bot.worker is not None and not bot.worker.done()
+        ]
+        still_running = set()
+        if workers:
+            _, still_running = await asyncio.wait(workers, timeout=timeout)
+
+        tasks = []
+        for bot in self._bots.values():
+            tasks.extend(task for task in [bot.worker, *bot.deliveries] if task)
+            for queue in bot.chats.values():
+                for message in queue:
+                    self._give_up(message)
+            bot.chats.clear()
+            bot.pending = 0
+            self._report_depth(bot)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if still_running:
+            logger.warning("Telegram send queue stopped with messages undelivered")
+        return not still_running
+
+    def _give_up(self, message: _Message) -> None:
+        if not message.future.done():
+            message.future.set_result(
+                {"status": False, "response": "Telegram send queue stopped"}
+            )
+
+    def take_edit_token(self, agent_id: str, chat_id: Any) -> float:
+        """
+        Charge an edit of a sent message to the bot's and the chat's budget.
+
+        Edits aren't queued: returns 0 when the edit may go out now (its
+        tokens are taken), else the seconds until it may.
+        """
+        bot = self._bot(agent_id)
+        now = time.monotonic()
+        chat_bucket = self._chat_bucket(bot, str(chat_id))
+        delay = max(bot.bucket.delay(now), chat_bucket.delay(now))
+        if delay == 0:
+            bot.bucket.take(now)
+            chat_bucket.take(now)
+        return delay
+
+    def _chat_bucket(self, bot: _BotOutbox, chat_id: str) -> TokenBucket:
+        bucket = bot.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = bot.chat_buckets[chat_id] = TokenBucket(
+                self.chat_rate, self.chat_burst
+            )
+        return bucket
+
+    def _report_depth(self, bot: _BotOutbox) -> None:
+        metrics.set_gauge(
+            "telegram_send_queue_depth", bot.pending, agent_id=bot.agent_id
+        )
+
+    def _next_chat(
+        self, bot: _BotOutbox, now: float
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """The chat to send to now, or the seconds until one can be served."""
+        wait = None
+        for chat_id, queue in bot.chats.items():
+            if not queue or chat_id in bot.in_flight:
+                continue
+            delay = self._chat_bucket(bot, chat_id).delay(now)
+            if delay == 0:
+                return chat_id, None
+            wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    async def _run(self, bot: _BotOutbox) -> None:
+        while bot.pending:
+            now = time.monotonic()
+            wait = bot.bucket.delay(now)
+            if wait == 0:
+                chat_id, wait = self._next_chat(bot, now)
+                if chat_id is not None:
+                    self._dispatch(bot, chat_id, now)
+                    continue
+
+            bot.wakeup.clear()
+            try:
+                # wait is None: every chat with messages has one in flight
+                await asyncio.wait_for(bot.wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, bot: _BotOutbox, chat_id: str, now: float) -> None:
+        queue = bot.chats[chat_id]
+        message = queue.popleft()
+        if not queue:
+            del bot.chats[chat_id]
+        else:
+            # Round robin, other chats go first next time
+            bot.chats.move_to_end(chat_id)
+        bot.bucket.take(now)
+        bot.chat_buckets[chat_id].take(now)
+        bot.in_flight.add(chat_id)
+        metrics.observe(
+            "telegram_send_wait_seconds", now - message.queued_at, agent_id=bot.agent_id
+        )
+        delivery = self._loop.create_task(self._deliver(bot, chat_id, message))
+        bot.deliveries.add(delivery)
+        delivery.add_done_callback(bot.deliveries.discard)
+
+    async def _deliver(self, bot: _BotOutbox, chat_id: str, message: _Message) -> None:
+        try:
+            message.attempts += 1
+            try:
+                result = await self.sender(
+                    message.api_key, message.chat_id, message.text
+                )
+            except Exception as e:
+                result = {"status": False, "response": str(e), "retryable": True}
+
+            if (
+                not result["status"]
+                and result.get("retryable")
+                and message.attempts < self.max_attempts
+            ):
+                self._retry_later(bot, chat_id, message, result.get("retry_after"))
+                return
+
+            if not result["status"]:
+                metrics.increment("telegram_send_failed_total", agent_id=bot.agent_id)
+            bot.pending -= 1
+            self._report_depth(bot)
+            if not message.future.done():
+                message.future.set_result(result)
+        except asyncio.CancelledError:
+            # Stopped while sending, the sender isn't left waiting
+            self._give_up(message)
+            raise
+        finally:
+            bot.in_flight.discard(chat_id)
+            self._prune_chat_buckets(bot)
+            bot.wakeup.set()
+
+    def _retry_later(
+        self,
+        bot: _BotOutbox,
+        chat_id: str,
+        message: _Message,
+        retry_after: Optional[float],
+    ) -> None:
+        now = time.monotonic()
+        if retry_after:
+            # Telegram asks the bot to slow down, every chat waits
+            metrics.increment("telegram_send_rate_limited_total", agent_id=bot.agent_id)
+            logger.warning(f"Telegram 429 for {bot.agent_id}, retry in {retry_after}s")
+            bot.bucket.hold(float(retry_after), now)
+        else:
+            delay = self.retry_base_delay * 2 ** (message.attempts - 1)
+            bot.chat_buckets[chat_id].hold(delay, now)
+        metrics.increment("telegram_send_retries_total", agent_id=bot.agent_id)
+        # Back at the head of its chat, the order of the replies is kept
+        bot.chats.setdefault(chat_id, deque()).appendleft(message)
+
+    def _prune_chat_buckets(self, bot: _BotOutbox) -> None:
+        if len(bot.chat_buckets) <= 1000:
+            return
+        now = time.monotonic()
+        for chat_id in list(bot.chat_buckets):
+            if (
+                chat_id not in bot.chats
+                and chat_id not in bot.in_flight
+                and bot.chat_buckets[chat_id].is_full(now)
+            ):
+                del bot.chat_buckets[chat_id]
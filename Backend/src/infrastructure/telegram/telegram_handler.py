@@ -1,18 +1,67 @@
+import asyncio
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import aiohttp
 
+from src.config.config import settings
 from src.core.utils.logger import get_logger
+from src.infrastructure.telegram.reply_stream import TelegramReplyStream
+from src.infrastructure.telegram.send_queue import TelegramSendQueue
 
 
 class TelegramManager:
-    def __init__(self):
+    """
+    Client of the Telegram Bot API.
+
+    Every call goes through one long-lived ``aiohttp.ClientSession`` so
+    connections to api.telegram.org are kept alive and reused instead of a
+    DNS lookup and TLS handshake per message. The app opens it on startup
+    and closes it on shutdown; it is also opened on first use. Messages go
+    through a per bot send queue that keeps them under Telegram's limits.
+    """
+
+    def __init__(self, base_url: str = settings.TELEGRAM_API_BASE_URL):
         self._list_telegram_user: Dict[str, Dict[str, Any]] = {}
         self._logger = get_logger(__name__)
+        self.base_url = base_url.rstrip("/")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.send_queue = TelegramSendQueue(self._post_message)
+
+    def _url(self, api_key: str, method: str) -> str:
+        return f"{self.base_url}/bot{api_key}/{method}"
+
+    async def start(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # A session bound to another (finished) loop is replaced, e.g. per test
+        if (
+            self._session is not None
+            and not self._session.closed
+            and self._session_loop is loop
+        ):
+            return self._session
+
+        connector = aiohttp.TCPConnector(
+            ssl=False,
+            limit=settings.TELEGRAM_MAX_CONNECTIONS,
+            limit_per_host=settings.TELEGRAM_MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=settings.TELEGRAM_DNS_CACHE_SECONDS,
+            keepalive_timeout=settings.TELEGRAM_KEEPALIVE_SECONDS,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._session_loop = loop
+        return self._session
+
+    async def close(self, timeout: float = 10.0) -> None:
+        # Queued messages go out first, no worker re-opens the session after
+        await self.send_queue.stop(timeout)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def set_webhook(self, api_key: str, agent_id: str) -> dict[str, Any]:
-        url = f"https://api.telegram.org/bot{api_key}/setWebhook"
+        url = self._url(api_key, "setWebhook")
         webhook_url = (
             f"{os.environ.get('THIS_APP_URL')}/api/webhook/telegram/{agent_id}"
         )
@@ -20,60 +69,69 @@ class TelegramManager:
         payload = {"url": webhook_url}
         try:
             timeout = aiohttp.ClientTimeout(total=15)  # 15 second timeout
-            async with aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=False), timeout=timeout
-            ) as session:
-                async with session.post(url, json=payload) as response:
-                    resp_json = await response.json()
-                    if response.status == 200 and resp_json.get("ok"):
-                        # Ensure there is an entry for this agent before assigning
-                        if agent_id not in self._list_telegram_user:
-                            self._list_telegram_user[agent_id] = {}
-                        self._list_telegram_user[agent_id]["api_key"] = api_key
-                        return {"status": True, "response": resp_json}
-                    else:
-                        raise RuntimeError(
-                            "Failed to set webhook: Telegram response is not ok"
-                        )
+            session = await self.start()
+            async with session.post(url, json=payload, timeout=timeout) as response:
+                resp_json = await response.json()
+                if response.status == 200 and resp_json.get("ok"):
+                    # Ensure there is an entry for this agent before assigning
+                    if agent_id not in self._list_telegram_user:
+                        self._list_telegram_user[agent_id] = {}
+                    self._list_telegram_user[agent_id]["api_key"] = api_key
+                    return {"status": True, "response": resp_json}
+                else:
+                    raise RuntimeError(
+                        "Failed to set webhook: Telegram response is not ok"
+                    )
         except aiohttp.ClientError as e:
             raise e
         except Exception as e:
             raise e
 
     async def send_message(self, agent_id: str, api_key: str, chat_id, message: str):
-        url = f"https://api.telegram.org/bot{api_key}/sendMessage"
+        # Queued per bot so bursts stay under Telegram's rate limits
+        result = await self.send_queue.send(agent_id, api_key, chat_id, message)
+        if result["status"]:
+            # Ensure agent entry exists and set chat_id only when appropriate
+            agent = self._list_telegram_user.get(agent_id)
+            if agent is None:
+                # If there is no entry for this agent, create one with api_key and chat_id
+                self._list_telegram_user[agent_id] = {
+                    "api_key": api_key,
+                    "chat_id": chat_id,
+                }
+            else:
+                # If chat_id not set yet and api_key matches, store chat_id
+                if agent.get("chat_id", None) is None:
+                    if agent.get("api_key") == api_key:
+                        agent["chat_id"] = chat_id
+        return result
+
+    async def _post_message(self, api_key: str, chat_id, message: str):
+        url = self._url(api_key, "sendMessage")
         payload = {"chat_id": chat_id, "text": message}
 
         try:
             timeout = aiohttp.ClientTimeout(total=10)  # 10 second timeout for messages
-            async with aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=False), timeout=timeout
-            ) as session:
-                async with session.post(url, json=payload) as response:
-                    resp_json = await response.json()
-                    if response.status == 200 and resp_json.get("ok"):
-                        # Ensure agent entry exists and set chat_id only when appropriate
-                        agent = self._list_telegram_user.get(agent_id)
-                        if agent is None:
-                            # If there is no entry for this agent, create one with api_key and chat_id
-                            self._list_telegram_user[agent_id] = {
-                                "api_key": api_key,
-                                "chat_id": chat_id,
-                            }
-                        else:
-                            # If chat_id not set yet and api_key matches, store chat_id
-                            if agent.get("chat_id", None) is None:
-                                if agent.get("api_key") == api_key:
-                                    agent["chat_id"] = chat_id
-
-                        return {"status": True, "response": resp_json}
-                    else:
-                        return {"status": False, "response": resp_json}
-        except aiohttp.ClientError as e:
+            session = await self.start()
+            async with session.post(url, json=payload, timeout=timeout) as response:
+                resp_json = await response.json()
+                if response.status == 200 and resp_json.get("ok"):
+                    return {"status": True, "response": resp_json}
+                return {
+                    "status": False,
+                    "response": resp_json,
+                    # 429 (with retry_after) and server errors are worth a retry
+                    "retryable": response.status == 429 or response.status >= 500,
+                    "retry_after": (resp_json.get("parameters") or {}).get(
+                        "retry_after"
+                    ),
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self._logger.error(str(e))
             return {
                 "status": False,
                 "response": "Internal server error, please try again later.",
+                "retryable": True,
             }
 
         except Exception as e:
@@ -85,22 +143,61 @@ class TelegramManager:
                 "response": "Internal server error, please try again later.",
             }
 
+    async def edit_message_text(
+        self, api_key: str, chat_id, message_id: int, message: str
+    ):
+        """
+        Replace the text of a sent message.
+
+        Not queued, the caller charges it to ``send_queue`` first
+        (see TelegramReplyStream).
+        """
+        url = self._url(api_key, "editMessageText")
+        payload = {"chat_id": chat_id, "message_id": message_id, "text": message}
+
+        try:
+            timeout = aiohttp.ClientTimeout(total=10)
+            session = await self.start()
+            async with session.post(url, json=payload, timeout=timeout) as response:
+                resp_json = await response.json()
+                # Same text as before, nothing to change
+                not_modified = "message is not modified" in str(
+                    resp_json.get("description", "")
+                )
+                if (response.status == 200 and resp_json.get("ok")) or not_modified:
+                    return {"status": True, "response": resp_json}
+                return {
+                    "status": False,
+                    "response": resp_json,
+                    "retryable": response.status == 429 or response.status >= 500,
+                    "retry_after": (resp_json.get("parameters") or {}).get(
+                        "retry_after"
+                    ),
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._logger.error(f"Error while editing telegram message: {e}")
+            return {"status": False, "response": str(e), "retryable": True}
+        except Exception as e:
+            self._logger.error(f"Unexpected error while editing telegram message: {e}")
+            return {"status": False, "response": str(e)}
+
+    def reply_stream(self, agent_id: str, api_key: str, chat_id) -> TelegramReplyStream:
+        """Progressive reply: a placeholder now, edited while the answer streams."""
+        return TelegramReplyStream(self, agent_id, api_key, chat_id)
+
     async def delete_webhook(self, api_key: str):
-        url = f"https://api.telegram.org/bot{api_key}/deleteWebhook"
+        url = self._url(api_key, "deleteWebhook")
         try:
-            async with aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=False)
-            ) as session:
-                async with session.get(url) as response:
-                    resp_json = await response.json()
-                    if response.status == 200 and resp_json.get("ok"):
-                        self._logger.info(
-                            f"Delete webhook is successfully: {resp_json}"
-                        )
-                        return {"status": True, "response": resp_json}
-                    else:
-                        self._logger.warning(f"Failed to delete webhook: {resp_json}")
-                        return {"status": False, "response": resp_json}
+            timeout = aiohttp.ClientTimeout(total=15)
+            session = await self.start()
+            async with session.get(url, timeout=timeout) as response:
+                resp_json = await response.json()
+                if response.status == 200 and resp_json.get("ok"):
+                    self._logger.info(f"Delete webhook is successfully: {resp_json}")
+                    return {"status": True, "response": resp_json}
+                else:
+                    self._logger.warning(f"Failed to delete webhook: {resp_json}")
+                    return {"status": False, "response": resp_json}
         except aiohttp.ClientError as e:
             self._logger.error(f"HTTP error occurred: {e}")
             return {
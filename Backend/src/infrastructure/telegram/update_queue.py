@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from src.config.config import settings
+from src.core.utils.logger import get_logger
+from src.core.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+ChatKey = Tuple[str, str]
+
+
+class TelegramUpdateQueue:
+    """
+    Background processing of Telegram webhook updates.
+
+    The webhook submits the work of an update and answers Telegram right
+    away. Updates of one chat run one after another in arrival order (a
+    worker task per chat with something queued); every bot runs at most
+    ``max_concurrency_per_bot`` updates at once. An ``update_id`` seen in
+    the last ``dedupe_ttl_seconds`` is acknowledged without running again,
+    so Telegram redeliveries don't invoke the agent twice. The queue is
+    bounded: ``submit`` returns False when it is full or stopping, the
+    webhook then answers with an error and Telegram redelivers later.
+    In-process only, every worker dedupes the updates it receives.
+    """
+
+    def __init__(
+        self,
+        max_concurrency_per_bot: int = settings.TELEGRAM_UPDATE_CONCURRENCY_PER_BOT,
+        max_pending: int = settings.TELEGRAM_UPDATE_MAX_PENDING,
+        dedupe_ttl_seconds: float = settings.TELEGRAM_UPDATE_DEDUPE_TTL_SECONDS,
+        dedupe_max_entries: int = settings.TELEGRAM_UPDATE_DEDUPE_MAX_ENTRIES,
+    ):
+        self.max_concurrency_per_bot = max_concurrency_per_bot
+        self.max_pending = max_pending
+        self.dedupe_ttl_seconds = dedupe_ttl_seconds
+        self.dedupe_max_entries = dedupe_max_entries
+
+        self._chats: Dict[ChatKey, Deque[Callable[[], Awaitable[Any]]]] = {}
+        self._workers: Dict[ChatKey, asyncio.Task] = {}
+        self._bot_slots: Dict[str, asyncio.Semaphore] = {}
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._pending = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending
+
+    def submit(
+        self,
+        agent_id: str,
+        chat_id: Any,
+        update_id: Optional[int],
+        work: Callable[[], Awaitable[Any]],
+    ) -> bool:
+        """Queue ``work`` for the chat, True when Telegram can be acknowledged."""
+        self._ensure_loop()
+        if update_id is not None and self._is_duplicate((agent_id, update_id)):
+            metrics.increment("telegram_updates_duplicate_total")
+            logger.info(f"Telegram update {update_id} of {agent_id} already received")
+            return True
+        if self._stopping or self._pending >= self.max_pending:
+            metrics.increment("telegram_updates_rejected_total")
+            return False
+
+        if update_id is not None:
+            self._remember((agent_id, update_id))
+        key = (agent_id, str(chat_id))
+        self._chats.setdefault(key, deque()).append(work)
+        self._pending += 1
+        metrics.increment("telegram_updates_received_total")
+        metrics.set_gauge("telegram_update_queue_depth", self._pending)
+        if key not in self._workers:
+            self._workers[key] = self._loop.create_task(self._drain(key))
+        return True
+
+    async def stop(self, timeout: float = 30.0) -> bool:
+        """Stop accepting updates and finish the queued ones, False on timeout."""
+        self._stopping = True
+        workers = list(self._workers.values())
+        if not workers:
+            return True
+        _, still_running = await asyncio.wait(workers, timeout=timeout)
+        for worker in still_running:
+            worker.cancel()
+        if still_running:
+            logger.warning(
+                f"Telegram update queue stopped with {self._pending} updates pending"
+            )
+        return not still_running
+
+    def _ensure_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and semaphores belong to one loop, e.g. a new one per test
+            self._loop = loop
+            self._chats.clear()
+            self._workers.clear()
+            self._bot_slots.clear()
+            self._pending = 0
+
+    def _is_duplicate(self, update_key: Hashable) -> bool:
+        seen_at = self._seen.get(update_key)
+        if seen_at is None:
+            return False
+        if time.monotonic() - seen_at > self.dedupe_ttl_seconds:
+            del self._seen[update_key]
+            return False
+        return True
+
+    def _remember(self, update_key: Hashable) -> None:
+        self._seen[update_key] = time.monotonic()
+        while len(self._seen) > self.dedupe_max_entries:
+            self._seen.popitem(last=False)
+
+    def _bot_slot(self, agent_id: str) -> asyncio.Semaphore:
+        slot = self._bot_slots.get(agent_id)
+        if slot is None:
+            slot = self._bot_slots[agent_id] = asyncio.Semaphore(
+                self.max_concurrency_per_bot
+            )
+        return slot
+
+    async def _drain(self, key: ChatKey) -> None:
+        queue = self._chats[key]
+        try:
+            while queue:
+                work = queue.popleft()
+                try:
+                    async with self._bot_slot(key[0]):
+                        await work()
+                except Exception as e:
+                    metrics.increment("telegram_updates_failed_total")
+                    logger.error(f"Telegram update of {key[0]} failed: {e}")
+                finally:
+                    self._pending -= 1
+                    metrics.set_gauge("telegram_update_queue_depth", self._pending)
+        finally:
+            # No await since the last check, nothing was queued in between
+            self._chats.pop(key, None)
+            self._workers.pop(key, None)
+
+
+telegram_update_queue = TelegramUpdateQueue()
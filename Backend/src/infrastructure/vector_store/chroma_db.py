@@ -1,5 +1,6 @@
 import logging
 import os
+import threading
 import uuid
 from typing import List
 
@@ -35,6 +36,23 @@ load_dotenv()
 
 # ...existing code...
 
+_shared_models_lock = threading.Lock()
+_shared_models = None
+
+
+def _get_shared_models():
+    """
+    Embeddings and LLM clients shared by every RAGSystem.
+
+    They hold no per-collection state, and building the OpenAI clients takes
+    ~70ms each, which used to be paid on every agent (re)initialization.
+    """
+    global _shared_models
+    with _shared_models_lock:
+        if _shared_models is None:
+            _shared_models = (OpenAIEmbeddings(), OpenAI(temperature=0.7))
+        return _shared_models
+
 
 class RAGSystem:
     def __init__(self, chroma_directiory: str):
@@ -48,8 +66,7 @@ class RAGSystem:
             ) from e
 
         try:
-            self.embedding = OpenAIEmbeddings()
-            self.llm = OpenAI(temperature=0.7)
+            self.embedding, self.llm = _get_shared_models()
             self.text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=1000, chunk_overlap=200, length_function=len
             )
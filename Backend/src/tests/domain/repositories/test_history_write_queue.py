@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from src.domain.repositories import HistoryWriteQueue
+from src.domain.use_cases.interfaces import HistoryRecord
+
+
+class FakeSession:
+    def __init__(self, database):
+        self.database = database
+        self.added = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add(self, entity):
+        self.added.append(entity)
+
+    def add_all(self, entities):
+        self.added.extend(entities)
+
+    async def commit(self):
+        await asyncio.sleep(0)
+        if any(entity.user_agent_id == "deleted" for entity in self.added):
+            raise RuntimeError("foreign key constraint fails")
+        self.database.commits.append(list(self.added))
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.commits = []
+
+    def session(self):
+        return FakeSession(self)
+
+    @property
+    def rows(self):
+        return [entity for commit in self.commits for entity in commit]
+
+
+def record(user_agent_id, index):
+    return HistoryRecord(
+        user_agent_id,
+        f"pesan {index}",
+        f"balasan {index}",
+        10,
+        0.5,
+        "gpt-4o",
+        cached_tokens=6,
+    )
+
+
+@pytest.mark.asyncio
+async def test_turns_are_written_in_batches_with_their_metadata():
+    database = FakeDatabase()
+    queue = HistoryWriteQueue(database.session, flush_interval_ms=20, max_batch_rows=2)
+
+    for index in range(5):
+        assert queue.submit(record("ag1user1", index))
+    await asyncio.sleep(0.1)
+
+    assert [len(commit) for commit in database.commits] == [2, 2, 1]
+    assert [row.user_message for row in database.rows] == [
+        f"pesan {index}" for index in range(5)
+    ]
+    assert all(
+        (row.message_metadata.total_tokens, row.message_metadata.cached_tokens)
+        == (10, 6)
+        for row in database.rows
+    )
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_only_drops_the_bad_row():
+    database = FakeDatabase()
+    queue = HistoryWriteQueue(database.session, flush_interval_ms=10_000)
+
+    queue.submit(record("ag1user1", 1))
+    queue.submit(record("deleted", 2))
+    queue.submit(record("ag1user1", 3))
+    await queue.flush()
+
+    assert [row.user_message for row in database.rows] == ["pesan 1", "pesan 3"]
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded_and_flushed_on_stop():
+    database = FakeDatabase()
+    queue = HistoryWriteQueue(
+        database.session, flush_interval_ms=10_000, max_batch_rows=10, max_pending=3
+    )
+
+    accepted = [queue.submit(record("ag1user1", index)) for index in range(4)]
+    assert accepted == [True, True, True, False]
+
+    assert await queue.stop()
+    assert len(database.rows) == 3
+    # Stopped: callers write synchronously from now on
+    assert not queue.submit(record("ag1user1", 5))
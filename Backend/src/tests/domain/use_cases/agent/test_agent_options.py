@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.domain.use_cases.agent.initial_agent_again import (
+    InitialAgentAgain,
+    InitialAgentAgainInput,
+)
+from src.domain.use_cases.agent.simple_rag.create_simple_rag_agent import (
+    CreateSimpleRagAgent,
+    CreateSimpleRagAgentInput,
+)
+from src.domain.use_cases.agent.store_agent_obj import StoreAgentObj
+from src.domain.use_cases.base import UseCaseResult
+
+OPTIONS = {
+    "speculative_retrieval": True,
+    "rag_mode": "single_call",
+    "hedge_requests": True,
+    "fallback_llm_provider": "anthropic",
+    "fallback_llm_model": "claude-3-5-haiku-latest",
+    "response_cache": True,
+    "response_cache_threshold": 0.9,
+}
+
+
+class InMemoryAgentObjStorage:
+    def __init__(self):
+        self.agents = {}
+
+    async def store_agent(self, agent_id, agent_obj):
+        self.agents[agent_id] = agent_obj
+        return True
+
+
+@pytest.mark.asyncio
+async def test_agent_options_are_kept_for_rebuilding_the_agent(mocker):
+    storage = InMemoryAgentObjStorage()
+    agent_entity = SimpleNamespace(
+        id="ag1",
+        base_prompt="Kamu adalah customer service.",
+        tone="friendly",
+        model="gpt-4o",
+        short_term_memory=True,
+        long_term_memory=False,
+    )
+    create_agent_entity = mocker.Mock()
+    create_agent_entity.execute = mocker.AsyncMock(
+        return_value=UseCaseResult.success_result(agent_entity)
+    )
+    initial_simple_rag_agent = mocker.Mock()
+    initial_simple_rag_agent.execute = mocker.Mock(
+        return_value=UseCaseResult.success_result(SimpleNamespace(agent=object()))
+    )
+
+    create = CreateSimpleRagAgent(
+        mocker.Mock(),
+        mocker.Mock(),
+        create_agent_entity,
+        StoreAgentObj(storage),
+        initial_simple_rag_agent,
+    )
+    result = await create.execute(
+        CreateSimpleRagAgentInput(1, "openai", {"name": "Toko", **OPTIONS}, "chroma")
+    )
+    # After a restart the agent is built from the stored object
+    InitialAgentAgain(initial_simple_rag_agent).execute(
+        InitialAgentAgainInput("ag1", "simple RAG agent", storage.agents["ag1"])
+    )
+
+    assert result.is_success()
+    created, rebuilt = [
+        call.args[0] for call in initial_simple_rag_agent.execute.call_args_list
+    ]
+    for name, value in OPTIONS.items():
+        assert getattr(created, name) == getattr(rebuilt, name) == value
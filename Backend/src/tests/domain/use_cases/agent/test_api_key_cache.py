@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.exceptions.agent_exceptions import InvalidApiKeyException
+from src.core.utils.hash import hash_api_key
+from src.domain.use_cases.agent.delete_agent_use_case import (
+    DeleteAgentInput,
+    DeleteAgentUseCase,
+)
+from src.domain.use_cases.agent.integration.api.delete_api_integration import (
+    DeleteApiIntegration,
+    DeleteApiIntegrationInput,
+)
+from src.domain.use_cases.agent.invoke import InvokeAgentApi, InvokeAgentApiInput
+from src.domain.use_cases.base import UseCaseResult
+from src.infrastructure.ai.agents import BaseAgentStateModel
+from src.infrastructure.redis.api_key_cache import ApiKeyCache
+
+
+class InMemoryApiKeyRepository:
+    def __init__(self):
+        self.keys = {}
+        self.queries = 0
+
+    async def get_active_api_key(self, agent_id, api_key):
+        self.queries += 1
+        row = self.keys.get(hash_api_key(api_key))
+        if row and row.agent_id == agent_id and row.expires_at > datetime.utcnow():
+            return row
+        return None
+
+    async def delete_api_key_by_agent_id(self, agent_id):
+        self.keys = {
+            key_hash: row
+            for key_hash, row in self.keys.items()
+            if row.agent_id != agent_id
+        }
+
+
+@pytest.fixture
+def setup(mocker):
+    repo = InMemoryApiKeyRepository()
+    repo.keys[hash_api_key("secret")] = SimpleNamespace(
+        agent_id="ag1", expires_at=datetime.utcnow() + timedelta(days=30)
+    )
+    invoke_agent = mocker.Mock()
+    invoke_agent.execute = mocker.AsyncMock(
+        return_value=UseCaseResult.success_result("balasan")
+    )
+    cache = ApiKeyCache(ttl_seconds=60, negative_ttl_seconds=60)
+    return InvokeAgentApi(repo, invoke_agent, cache), repo, cache
+
+
+def invoke(use_case, api_key):
+    return use_case.execute(
+        InvokeAgentApiInput(
+            "ag1",
+            "user1",
+            "user1",
+            "halo",
+            api_key,
+            BaseAgentStateModel(messages=[], user_message="halo"),
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_valid_and_invalid_keys_are_checked_once(setup):
+    use_case, repo, _ = setup
+
+    for _ in range(3):
+        assert (await invoke(use_case, "secret")).is_success()
+    for _ in range(3):
+        result = await invoke(use_case, "wrong")
+        assert isinstance(result.get_exception(), InvalidApiKeyException)
+
+    assert repo.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_revoked_key_stops_working_immediately(setup, mocker):
+    use_case, repo, cache = setup
+    assert (await invoke(use_case, "secret")).is_success()
+
+    integration_repo = mocker.Mock()
+    integration_repo.get_by_agent_and_platform = mocker.AsyncMock(
+        return_value=SimpleNamespace(id=1)
+    )
+    integration_repo.delete_by_id = mocker.AsyncMock()
+    await DeleteApiIntegration(integration_repo, repo, cache).execute(
+        DeleteApiIntegrationInput("ag1", "api")
+    )
+
+    assert not (await invoke(use_case, "secret")).is_success()
+    assert repo.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_deleted_agent_keys_stop_working_immediately(setup, mocker):
+    use_case, repo, cache = setup
+    assert (await invoke(use_case, "secret")).is_success()
+
+    agent_repository = mocker.Mock()
+    agent_repository.delete_agent_by_id = mocker.AsyncMock(
+        return_value=SimpleNamespace(
+            id="ag1",
+            name="Toko",
+            avatar=None,
+            model="gpt-4o",
+            role="customer service",
+            description=None,
+            status="active",
+            base_prompt="Kamu adalah customer service.",
+            short_term_memory=True,
+            long_term_memory=False,
+            tone="friendly",
+            created_at=None,
+        )
+    )
+    result = await DeleteAgentUseCase(agent_repository, None, cache).execute(
+        DeleteAgentInput("ag1")
+    )
+    # The cascade took the key rows with the agent
+    repo.keys.clear()
+
+    assert result.is_success()
+    assert not (await invoke(use_case, "secret")).is_success()
+    assert repo.queries == 2
+
+
+def test_key_is_not_cached_past_its_expiry():
+    cache = ApiKeyCache(ttl_seconds=60)
+
+    cache.remember("ag1", "old", datetime.utcnow() - timedelta(seconds=1))
+    cache.remember("ag1", "new", datetime.utcnow() + timedelta(days=1))
+
+    assert cache.lookup("ag1", "old") is None
+    assert cache.lookup("ag1", "new") is True
+    assert cache.lookup("ag2", "new") is None
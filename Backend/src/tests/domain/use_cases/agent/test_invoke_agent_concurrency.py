@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from src.core.utils.coalescing import RequestCoalescer
+from src.domain.use_cases.agent.invoke import InvokeAgentInput
+from src.domain.use_cases.interfaces import IHistoryWriteQueue
+from src.infrastructure.ai.agents import BaseAgent, BaseAgentStateModel
+from src.tests.fakes import FakeWorkflow, build_invoke_agent
+
+
+@pytest.fixture
+def shared_agent():
+    return BaseAgent(FakeWorkflow())
+
+
+@pytest.fixture
+def coalescer():
+    return None
+
+
+class ListHistoryWriteQueue(IHistoryWriteQueue):
+    def __init__(self):
+        self.records = []
+
+    def submit(self, record):
+        self.records.append(record)
+        return True
+
+    async def flush(self):
+        pass
+
+
+@pytest.fixture
+def history_write_queue():
+    return None
+
+
+@pytest.fixture
+def invoke_agent(mocker, shared_agent, coalescer, history_write_queue):
+    return build_invoke_agent(
+        mocker,
+        shared_agent,
+        coalescer=coalescer,
+        history_write_queue=history_write_queue,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_invocations_record_their_own_metadata(invoke_agent):
+    use_case, history_repo, metadata_repo = invoke_agent
+    # Distinct lengths give every call a distinct expected token count
+    messages = ["x" * length for length in range(1, 65)]
+
+    results = await asyncio.gather(
+        *[
+            use_case.execute(
+                InvokeAgentInput(
+                    "ag1",
+                    f"user{index}",
+                    f"user{index}",
+                    "api",
+                    BaseAgentStateModel(messages=[], user_message=message),
+                )
+            )
+            for index, message in enumerate(messages)
+        ]
+    )
+
+    assert all(result.is_success() for result in results)
+    for message, result in zip(messages, results):
+        output = result.get_data()
+        assert output.response == f"echo:{message}"
+        assert output.total_tokens == len(message) * 3
+
+    assert len(metadata_repo.rows) == len(messages)
+    for metadata in metadata_repo.rows:
+        history = history_repo.rows[metadata.history_message_id]
+        assert history.response == f"echo:{history.user_message}"
+        assert metadata.total_tokens == len(history.user_message) * 3
+        assert metadata.model == "gpt-4o"
+
+
+@pytest.mark.asyncio
+async def test_token_usage_does_not_accumulate_across_calls(shared_agent):
+    state = BaseAgentStateModel(messages=[], user_message="hello")
+
+    first = await shared_agent.aexecute(state, "thread-1")
+    second = await shared_agent.aexecute(state, "thread-1")
+
+    assert first.total_tokens == second.total_tokens == len("hello") * 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("coalescer", [RequestCoalescer(window_seconds=1)])
+async def test_identical_concurrent_invocations_share_one_execution(
+    invoke_agent, shared_agent, mocker
+):
+    use_case, history_repo, metadata_repo = invoke_agent
+    run = mocker.spy(shared_agent.workflow, "run")
+
+    def request(message):
+        return use_case.execute(
+            InvokeAgentInput(
+                "ag1",
+                "user1",
+                "user1",
+                "telegram",
+                BaseAgentStateModel(messages=[], user_message=message),
+            )
+        )
+
+    results = await asyncio.gather(
+        request("halo"), request("halo"), request("halo"), request("jam buka?")
+    )
+    # A retry right after the first one finished is still within the window
+    late_retry = await request("halo")
+
+    assert run.call_count == 2
+    # Every request records its own turn, the tokens are charged once per run
+    assert len(history_repo.rows) == len(metadata_repo.rows) == 5
+    assert sorted(row.total_tokens for row in metadata_repo.rows) == [
+        0,
+        0,
+        0,
+        len("halo") * 3,
+        len("jam buka?") * 3,
+    ]
+    assert [result.get_data().response for result in results + [late_retry]] == [
+        "echo:halo",
+        "echo:halo",
+        "echo:halo",
+        "echo:jam buka?",
+        "echo:halo",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_requests_write_through_their_own_session(mocker, shared_agent):
+    # Every request builds its use case on its own DB session
+    coalescer = RequestCoalescer(window_seconds=1)
+    requests = [
+        build_invoke_agent(mocker, shared_agent, coalescer=coalescer) for _ in range(3)
+    ]
+    run = mocker.spy(shared_agent.workflow, "run")
+
+    results = await asyncio.gather(
+        *[
+            use_case.execute(
+                InvokeAgentInput(
+                    "ag1",
+                    "user1",
+                    "user1",
+                    "telegram",
+                    BaseAgentStateModel(messages=[], user_message="halo"),
+                )
+            )
+            for use_case, _, _ in requests
+        ]
+    )
+
+    assert run.call_count == 1
+    assert all(result.get_data().response == "echo:halo" for result in results)
+    for _, history_repo, metadata_repo in requests:
+        assert len(history_repo.rows) == len(metadata_repo.rows) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("history_write_queue", [ListHistoryWriteQueue()])
+async def test_history_is_queued_instead_of_written_inline(
+    invoke_agent, history_write_queue
+):
+    use_case, history_repo, metadata_repo = invoke_agent
+
+    result = await use_case.execute(
+        InvokeAgentInput(
+            "ag1",
+            "user1",
+            "user1",
+            "api",
+            BaseAgentStateModel(messages=[], user_message="halo"),
+        )
+    )
+
+    assert result.get_data().response == "echo:halo"
+    assert not history_repo.rows and not metadata_repo.rows
+    [record] = history_write_queue.records
+    assert (record.user_agent_id, record.response, record.total_tokens) == (
+        "ag1user1",
+        "echo:halo",
+        len("halo") * 3,
+    )
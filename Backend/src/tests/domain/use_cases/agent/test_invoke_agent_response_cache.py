@@ -0,0 +1,98 @@
+import pytest
+
+from src.domain.use_cases.agent.invoke import InvokeAgentInput
+from src.domain.use_cases.interfaces import IResponseCache
+from src.infrastructure.ai.agents import BaseAgent, BaseAgentStateModel
+from src.infrastructure.ai.components import references_history
+from src.infrastructure.redis.response_cache import normalize_message
+from src.tests.fakes import FakeWorkflow, build_invoke_agent
+
+
+class InMemoryResponseCache(IResponseCache):
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, agent_id, user_message, similarity_threshold=None):
+        return self.entries.get((agent_id, normalize_message(user_message)))
+
+    async def set(self, agent_id, user_message, response):
+        self.entries[(agent_id, normalize_message(user_message))] = response
+
+    async def invalidate(self, agent_id):
+        self.entries = {
+            key: value for key, value in self.entries.items() if key[0] != agent_id
+        }
+
+
+@pytest.fixture
+def setup(mocker):
+    workflow = FakeWorkflow()
+    agent = BaseAgent(workflow)
+    agent.response_cache_enabled = True
+
+    use_case, _, metadata_repo = build_invoke_agent(
+        mocker, agent, response_cache=InMemoryResponseCache()
+    )
+    return use_case, workflow, metadata_repo
+
+
+def invoke(use_case, message):
+    return use_case.execute(
+        InvokeAgentInput(
+            "ag1",
+            "user1",
+            "user1",
+            "api",
+            BaseAgentStateModel(messages=[], user_message=message),
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_is_answered_from_cache(setup):
+    use_case, workflow, metadata_repo = setup
+
+    first = await invoke(use_case, "Jam buka toko?")
+    second = await invoke(use_case, "jam buka  toko")
+
+    assert workflow.runs == 1
+    assert second.get_data().response == first.get_data().response
+    assert [row.total_tokens for row in metadata_repo.rows] == [
+        len("Jam buka toko?") * 3,
+        0,
+    ]
+    # The cached turn still lands in the conversation history
+    assert workflow.appended == [("ag1user1", "jam buka  toko", "echo:Jam buka toko?")]
+
+
+@pytest.mark.asyncio
+async def test_cached_reply_survives_a_failed_checkpoint_write(setup, mocker):
+    use_case, workflow, metadata_repo = setup
+    first = await invoke(use_case, "Jam buka toko?")
+
+    agent = use_case.agent_manager.get_agent_in_memory("ag1")
+    mocker.patch.object(
+        agent, "arecord_turn", side_effect=ConnectionError("checkpointer down")
+    )
+    second = await invoke(use_case, "Jam buka toko?")
+
+    assert second.is_success()
+    assert second.get_data().response == first.get_data().response
+    assert workflow.runs == 1
+    assert len(metadata_repo.rows) == 2
+
+
+@pytest.mark.asyncio
+async def test_history_dependent_question_skips_cache(setup):
+    use_case, workflow, _ = setup
+
+    await invoke(use_case, "Harga produknya berapa?")
+    await invoke(use_case, "Harga produknya berapa?")
+
+    assert workflow.runs == 2
+
+
+def test_references_history():
+    assert references_history("Tadi kamu bilang apa?")
+    assert references_history("berapa harganya")
+    assert not references_history("Jam buka toko?")
@@ -0,0 +1,50 @@
+import pytest
+
+from src.core.utils.metrics import metrics
+from src.domain.use_cases.agent.invoke import InvokeAgentInput
+from src.infrastructure.ai.agents import BaseAgent, BaseAgentStateModel
+from src.infrastructure.ai.components import UsageRecord
+from src.tests.fakes import FakeWorkflow, build_invoke_agent
+
+
+class PromptCacheWorkflow(FakeWorkflow):
+    llm_model = "gpt-4o-prompt-cache"
+
+    def run(self, state, thread_id, context):
+        # First call writes the cached prefix, the second one reads it
+        context.usage.record(
+            UsageRecord("main_agent", self.llm_model, 1200, 20, 0, 1024)
+        )
+        context.usage.record(
+            UsageRecord("answer_by_rag", self.llm_model, 1800, 80, 1024, 0)
+        )
+        return {"response": f"echo:{state.user_message}"}
+
+
+@pytest.mark.asyncio
+async def test_prompt_cache_savings_are_reported_and_stored(mocker):
+    use_case, _, metadata_repo = build_invoke_agent(
+        mocker, BaseAgent(PromptCacheWorkflow())
+    )
+
+    result = await use_case.execute(
+        InvokeAgentInput(
+            "ag1",
+            "user1",
+            "user1",
+            "api",
+            BaseAgentStateModel(messages=[], user_message="halo"),
+        )
+    )
+
+    assert result.is_success()
+    [row] = metadata_repo.rows
+    assert (row.total_tokens, row.cached_tokens, row.cache_creation_tokens) == (
+        3100,
+        1024,
+        1024,
+    )
+    labels = {"model": PromptCacheWorkflow.llm_model}
+    assert metrics.get_counter("llm_cached_tokens_total", **labels) == 1024
+    assert metrics.get_counter("llm_cache_creation_tokens_total", **labels) == 1024
+    assert metrics.get_gauge("llm_cache_hit_ratio", **labels) == round(1024 / 3000, 4)
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.domain.use_cases.agent.delete_agent_use_case import (
+    DeleteAgentInput,
+    DeleteAgentUseCase,
+)
+from src.domain.use_cases.agent.invoke import InvokeAgent, InvokeAgentInput
+from src.domain.use_cases.agent.user_agent import CreateUserAgent
+from src.infrastructure.ai.agents import AgentExecutionResult, BaseAgentStateModel
+from src.infrastructure.redis.user_agent_cache import UserAgentCache
+
+
+class InMemoryUserAgentRepository:
+    def __init__(self):
+        self.rows = {}
+        self.lookups = 0
+        self.upserts = 0
+
+    async def get_user_agent_by_id(self, user_agent_id):
+        self.lookups += 1
+        return self.rows.get(user_agent_id)
+
+    async def upsert_user_agent(self, id, agent_id, username, user_platform):
+        self.upserts += 1
+        await asyncio.sleep(0)
+        self.rows.setdefault(id, SimpleNamespace(id=id, agent_id=agent_id))
+
+
+@pytest.fixture
+def setup(mocker):
+    repo = InMemoryUserAgentRepository()
+    cache = UserAgentCache(max_entries=10)
+    agent = mocker.Mock()
+    agent.is_cacheable_turn = mocker.Mock(return_value=False)
+    agent.aexecute = mocker.AsyncMock(
+        return_value=AgentExecutionResult("balasan", 10, 0.1, "gpt-4o")
+    )
+    agent_manager = mocker.Mock()
+    agent_manager.get_agent_in_memory = mocker.Mock(return_value=agent)
+    create_history_message = mocker.Mock()
+    create_history_message.execute = mocker.AsyncMock(
+        return_value=mocker.Mock(
+            is_success=lambda: True, get_data=lambda: SimpleNamespace(id=1)
+        )
+    )
+    create_metadata = mocker.Mock()
+    create_metadata.execute = mocker.AsyncMock(
+        return_value=mocker.Mock(is_success=lambda: True)
+    )
+
+    use_case = InvokeAgent(
+        agent_repository=mocker.Mock(),
+        user_agent_repository=repo,
+        create_user_agent=CreateUserAgent(repo),
+        create_history_message=create_history_message,
+        create_metadata=create_metadata,
+        agent_manager=agent_manager,
+        storage_agent_obj=mocker.Mock(),
+        initial_agent_again=mocker.Mock(),
+        user_agent_cache=cache,
+    )
+    return use_case, repo, cache
+
+
+def invoke(use_case, unique_id):
+    return use_case.execute(
+        InvokeAgentInput(
+            "ag1",
+            unique_id,
+            unique_id,
+            "telegram",
+            BaseAgentStateModel(messages=[], user_message="halo"),
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_known_user_agents_skip_the_database(setup):
+    use_case, repo, cache = setup
+
+    # Concurrent first messages of one chat both upsert, neither fails
+    first = await asyncio.gather(invoke(use_case, "chat1"), invoke(use_case, "chat1"))
+    for _ in range(3):
+        await invoke(use_case, "chat1")
+
+    assert all(result.is_success() for result in first)
+    assert repo.upserts == 2
+    assert repo.lookups == 0
+    assert list(repo.rows) == ["ag1chat1"]
+    assert await cache.contains("ag1", "ag1chat1")
+
+
+@pytest.mark.asyncio
+async def test_agent_delete_forgets_its_user_agents(setup, mocker):
+    use_case, repo, cache = setup
+    await invoke(use_case, "chat1")
+    await cache.add("ag2", "ag2chat1")
+
+    agent_repository = mocker.Mock()
+    agent_repository.delete_agent_by_id = mocker.AsyncMock(
+        return_value=SimpleNamespace(
+            id="ag1",
+            name="Toko",
+            avatar=None,
+            model="gpt-4o",
+            role="customer service",
+            description=None,
+            status="active",
+            base_prompt="Kamu adalah customer service.",
+            short_term_memory=True,
+            long_term_memory=False,
+            tone="friendly",
+            created_at=None,
+        )
+    )
+    result = await DeleteAgentUseCase(agent_repository, cache).execute(
+        DeleteAgentInput("ag1")
+    )
+
+    assert result.is_success()
+    assert not await cache.contains("ag1", "ag1chat1")
+    assert await cache.contains("ag2", "ag2chat1")
+
+
+def test_entries_are_bounded_and_expire():
+    cache = UserAgentCache(max_entries=2, ttl_seconds=60)
+
+    async def scenario():
+        for index in range(3):
+            await cache.add("ag1", f"ag1user{index}")
+        assert len(cache) == 2
+        assert not await cache.contains("ag1", "ag1user0")
+
+        cache._entries[("ag1", "ag1user2")] = time.monotonic() - 1
+        assert not await cache.contains("ag1", "ag1user2")
+
+    asyncio.run(scenario())
+
+
+class FakeRedis:
+    def __init__(self):
+        self.sets = {}
+        self.expiries = {}
+        self.commands = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def sadd(self, key, member):
+        self.commands.append(("sadd", key, member))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    async def execute(self):
+        for command, key, value in self.commands:
+            if command == "sadd":
+                self.sets.setdefault(key, set()).add(value)
+            else:
+                self.expiries[key] = value
+        self.commands = []
+
+    async def sismember(self, key, member):
+        return member in self.sets.get(key, set())
+
+
+def test_shared_set_expires_with_the_local_entries():
+    redis_client = FakeRedis()
+    cache = UserAgentCache(ttl_seconds=600, redis_client=redis_client)
+
+    asyncio.run(cache.add("ag1", "ag1chat1"))
+
+    assert redis_client.sets == {"user_agents:ag1": {"ag1chat1"}}
+    assert redis_client.expiries == {"user_agents:ag1": 600}
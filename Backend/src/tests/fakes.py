@@ -0,0 +1,160 @@
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from pydantic import Field
+
+from src.domain.use_cases.agent.history_message import (
+    CreateHistoryMessage,
+    CreateMetadata,
+)
+from src.domain.use_cases.agent.invoke import InvokeAgent
+from src.infrastructure.ai.agents.simple_rag_agent.prompts import SimpleRagPrompt
+from src.infrastructure.ai.agents.simple_rag_agent.workflow import SimpleRagWorkflow
+from src.infrastructure.ai.components import UsageRecord
+
+
+class FakeChat(GenericFakeChatModel):
+    """Answers with the given messages, tools are accepted and ignored."""
+
+    prompts: list = Field(default_factory=list)
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(list(messages))
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+class FakeRetrieveDocumentTool:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def read_document(self, query: str):
+        if self.delay:
+            time.sleep(self.delay)
+        return f"dokumen untuk {query}"
+
+
+def make_workflow(saver, answer, rag_mode="two_step", replies=(), **options):
+    """SimpleRagWorkflow whose LLM answers ``answer``, then each of ``replies``."""
+    workflow = SimpleRagWorkflow(
+        options.pop("retrieve_document_tool", FakeRetrieveDocumentTool()),
+        saver,
+        SimpleRagPrompt("friendly", f"Kamu adalah agent {answer}."),
+        llm_model="gpt-4o-mini",
+        rag_mode=rag_mode,
+        **options,
+    )
+    messages = [
+        reply if isinstance(reply, AIMessage) else AIMessage(content=reply)
+        for reply in (answer, *replies)
+    ]
+    workflow._llm = FakeChat(messages=iter(messages))
+    return workflow
+
+
+class FakeWorkflow:
+    """Echoes the message, sleeping so concurrent runs interleave in threads."""
+
+    llm_model = "gpt-4o"
+    use_long_memory = False
+    use_short_memory = True
+
+    def __init__(self):
+        self.runs = 0
+        self.appended = []
+
+    def run(self, state, thread_id, context):
+        for _ in range(3):
+            time.sleep(random.uniform(0, 0.005))
+            context.usage.record(
+                UsageRecord(
+                    node="main_agent",
+                    model=self.llm_model,
+                    input_tokens=len(state.user_message),
+                )
+            )
+        return {"response": f"echo:{state.user_message}"}
+
+    async def arun(self, state, thread_id, context):
+        self.runs += 1
+        return await asyncio.to_thread(self.run, state, thread_id, context)
+
+    async def append_turn(self, thread_id, user_message, response):
+        self.appended.append((thread_id, user_message, response))
+
+
+class InMemoryHistoryRepository:
+    def __init__(self):
+        self.rows = {}
+
+    async def create_history_message(self, user_agent_id, user_message, response):
+        await asyncio.sleep(0)
+        history_id = len(self.rows) + 1
+        self.rows[history_id] = SimpleNamespace(
+            id=history_id,
+            user_agent_id=user_agent_id,
+            user_message=user_message,
+            response=response,
+        )
+        return self.rows[history_id]
+
+
+class InMemoryMetadataRepository:
+    def __init__(self):
+        self.rows = []
+
+    async def create_message_metadata(
+        self,
+        history_message_id,
+        total_tokens,
+        response_time,
+        model,
+        is_success=True,
+        cached_tokens=0,
+        cache_creation_tokens=0,
+    ):
+        await asyncio.sleep(0)
+        row = SimpleNamespace(
+            id=len(self.rows) + 1,
+            history_message_id=history_message_id,
+            total_tokens=total_tokens,
+            response_time=response_time,
+            model=model,
+            is_success=is_success,
+            cached_tokens=cached_tokens,
+            cache_creation_tokens=cache_creation_tokens,
+        )
+        self.rows.append(row)
+        return row
+
+
+def build_invoke_agent(mocker, agent, **kwargs):
+    """InvokeAgent serving ``agent`` with in-memory history and metadata."""
+    history_repo = InMemoryHistoryRepository()
+    metadata_repo = InMemoryMetadataRepository()
+
+    user_agent_repo = mocker.Mock()
+    user_agent_repo.get_user_agent_by_id = mocker.AsyncMock(
+        return_value=SimpleNamespace(id="existing")
+    )
+    agent_manager = mocker.Mock()
+    agent_manager.get_agent_in_memory = mocker.Mock(return_value=agent)
+
+    use_case = InvokeAgent(
+        agent_repository=mocker.Mock(),
+        user_agent_repository=user_agent_repo,
+        create_user_agent=mocker.Mock(),
+        create_history_message=CreateHistoryMessage(history_repo),
+        create_metadata=CreateMetadata(metadata_repo),
+        agent_manager=agent_manager,
+        storage_agent_obj=mocker.Mock(),
+        initial_agent_again=mocker.Mock(),
+        **kwargs,
+    )
+    return use_case, history_repo, metadata_repo
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.config.config import settings
+from src.domain.use_cases.agent.history_message import CreateMetadata
+from src.domain.use_cases.agent.invoke import InvokeAgent, InvokeAgentInput
+from src.infrastructure.ai.agents import BaseAgent, BaseAgentStateModel
+from src.infrastructure.ai.agents.execution import AgentExecutionResult
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.infrastructure.ai.agents.simple_rag_agent.prompts import SimpleRagPrompt
+from src.infrastructure.ai.agents.simple_rag_agent.workflow import SimpleRagWorkflow
+from src.tests.fakes import FakeChat, FakeRetrieveDocumentTool
+
+
+def make_agent(retrieval_delay: float) -> BaseAgent:
+    workflow = SimpleRagWorkflow(
+        FakeRetrieveDocumentTool(delay=retrieval_delay),
+        MemorySaver(),
+        SimpleRagPrompt("friendly", "Kamu adalah customer service."),
+        llm_model="gpt-4o-mini",
+    )
+    tool_call = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "read_document", "args": {"query": "jam buka"}, "id": "call_1"}
+        ],
+    )
+    workflow._llm = FakeChat(messages=iter([tool_call, AIMessage(content="jawaban")]))
+    return BaseAgent(workflow)
+
+
+def run(agent: BaseAgent, deadline: float):
+    state = SimpleRagState(messages=[], user_message="jam buka toko")
+    return asyncio.run(agent.aexecute(state, "user-agent-1", deadline=deadline))
+
+
+def test_hung_retrieval_is_abandoned_at_the_deadline():
+    started = time.monotonic()
+    result = run(make_agent(retrieval_delay=2), deadline=started + 0.3)
+
+    assert time.monotonic() - started < 1
+    assert not result.is_success
+    assert result.response is None
+
+
+def test_slow_retrieval_stage_answers_without_documents(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_RETRIEVAL_TIMEOUT_SECONDS", 0.2)
+    result = run(make_agent(retrieval_delay=2), deadline=time.monotonic() + 5)
+
+    assert result.is_success
+    assert result.response == "jawaban"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_invocation_records_fallback_reply(mocker):
+    metadata_repo = mocker.Mock()
+    metadata_repo.create_message_metadata = mocker.AsyncMock(
+        return_value=SimpleNamespace(id=1)
+    )
+    create_history_message = mocker.Mock()
+    create_history_message.execute = mocker.AsyncMock(
+        return_value=mocker.Mock(
+            is_success=lambda: True, get_data=lambda: SimpleNamespace(id=7)
+        )
+    )
+    agent = mocker.Mock()
+    agent.aexecute = mocker.AsyncMock(
+        return_value=AgentExecutionResult(None, 12, 0.3, "gpt-4o", is_success=False)
+    )
+    agent_manager = mocker.Mock()
+    agent_manager.get_agent_in_memory = mocker.Mock(return_value=agent)
+    user_agent_repo = mocker.Mock()
+    user_agent_repo.get_user_agent_by_id = mocker.AsyncMock(return_value=True)
+
+    use_case = InvokeAgent(
+        agent_repository=mocker.Mock(),
+        user_agent_repository=user_agent_repo,
+        create_user_agent=mocker.Mock(),
+        create_history_message=create_history_message,
+        create_metadata=CreateMetadata(metadata_repo),
+        agent_manager=agent_manager,
+        storage_agent_obj=mocker.Mock(),
+        initial_agent_again=mocker.Mock(),
+    )
+    deadline = time.monotonic() + 0.3
+    result = await use_case.execute(
+        InvokeAgentInput(
+            "ag1",
+            "user1",
+            "user1",
+            "api",
+            BaseAgentStateModel(messages=[], user_message="halo"),
+            deadline,
+        )
+    )
+
+    output = result.get_data()
+    assert output.response == settings.AGENT_TIMEOUT_FALLBACK_REPLY
+    assert not output.is_success
+    assert agent.aexecute.call_args.kwargs["deadline"] == deadline
+    metadata_repo.create_message_metadata.assert_awaited_once_with(
+        7, 12, 0.3, "gpt-4o", False, 0, 0
+    )
@@ -0,0 +1,76 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.infrastructure.ai.components import (
+    ConversationHistoryManager,
+    tokenizer_service,
+)
+from src.tests.fakes import make_workflow
+
+
+def build_conversation(turns: int):
+    messages = []
+    for index in range(turns):
+        messages.append(HumanMessage(content=f"pertanyaan {index}"))
+        messages.append(
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "read_document", "args": {"query": "q"}, "id": f"t{index}"}
+                ],
+            )
+        )
+        messages.append(ToolMessage(content="dokumen", tool_call_id=f"t{index}"))
+        messages.append(AIMessage(content=f"jawaban {index}"))
+    return messages
+
+
+def test_window_keeps_newest_turns():
+    manager = ConversationHistoryManager("gpt-4o-mini", max_turns=3)
+    messages = build_conversation(10)
+
+    window = manager.window(messages)
+
+    assert window.messages == messages[-12:]
+    assert window.messages[0].content == "pertanyaan 7"
+    assert window.folded_count == len(messages) - 12
+
+
+def test_window_respects_token_budget_without_splitting_tool_calls():
+    manager = ConversationHistoryManager("gpt-4o-mini", max_turns=10, token_budget=1)
+    messages = build_conversation(3)
+    budget = manager.count_tokens(messages[-4:])
+    manager.token_budget = budget
+
+    window = manager.window(messages)
+
+    assert window.messages == messages[-4:]
+    assert isinstance(window.messages[0], HumanMessage)
+    assert manager.needs_summary(messages, summarized_count=0)
+    assert not manager.needs_summary(messages, summarized_count=8)
+
+
+def test_newest_turn_is_kept_over_the_token_budget():
+    manager = ConversationHistoryManager("gpt-4o-mini", token_budget=5)
+    messages = build_conversation(3)
+    messages[-2] = ToolMessage(content="dokumen panjang " * 500, tool_call_id="t2")
+
+    window = manager.window(messages)
+
+    assert window.messages == messages[-4:]
+    assert window.folded_count == 8
+
+
+def test_summary_is_not_counted_as_a_static_prompt(monkeypatch):
+    workflow = make_workflow(MemorySaver(), "A")
+    summary = workflow.history_manager.summary_message("Pengguna bernama Budi")
+    static_counts = []
+    monkeypatch.setattr(
+        tokenizer_service,
+        "count_static_tokens",
+        lambda text, model: static_counts.append(text) or 1,
+    )
+
+    workflow._estimate_messages_tokens([SystemMessage(content="Kamu agent."), summary])
+
+    assert static_counts == ["Kamu agent."]
@@ -0,0 +1,90 @@
+import asyncio
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.core.utils.metrics import metrics
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.components import ConversationHistoryManager
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.tests.fakes import make_workflow
+
+
+def test_agents_with_the_same_topology_share_one_compiled_graph():
+    saver = MemorySaver()
+    first = make_workflow(saver, "A")
+    second = make_workflow(saver, "B")
+
+    assert first.build is second.build
+    assert make_workflow(saver, "C", rag_mode="single_call").build is not first.build
+
+
+def test_shared_graph_runs_each_agents_own_llm():
+    saver = MemorySaver()
+    first = make_workflow(saver, "A")
+    second = make_workflow(saver, "B")
+
+    async def run(workflow, thread_id):
+        state = SimpleRagState(messages=[], user_message="halo")
+        result = await workflow.arun(state, thread_id, ExecutionContext(thread_id))
+        return result["response"]
+
+    assert asyncio.run(run(first, "user-agent-1")) == "A"
+    assert asyncio.run(run(second, "user-agent-2")) == "B"
+
+
+def test_answer_is_streamed_while_it_is_generated():
+    workflow = make_workflow(MemorySaver(), "Toko buka jam sembilan")
+    context = ExecutionContext("user-agent-1")
+    partials = []
+    context.on_partial_response = partials.append
+
+    state = SimpleRagState(messages=[], user_message="jam buka?")
+    result = asyncio.run(workflow.arun(state, "user-agent-1", context))
+
+    assert result["response"] == "Toko buka jam sembilan"
+    assert len(partials) > 1
+    assert partials[-1] == "Toko buka jam sembilan"
+
+
+def test_summary_refresh_updates_the_shared_graph_state():
+    workflow = make_workflow(
+        MemorySaver(),
+        "jawaban 1",
+        replies=["jawaban 2", "ringkasan percakapan"],
+        include_short_memory=True,
+    )
+    workflow.history_manager = ConversationHistoryManager("gpt-4o-mini", max_turns=1)
+
+    async def run():
+        for message in ["halo", "jam buka?"]:
+            state = SimpleRagState(messages=[], user_message=message)
+            await workflow.arun(state, "user-agent-1", ExecutionContext("user-agent-1"))
+            # The refresh runs in the background, it has to succeed
+            await asyncio.gather(*workflow._summary_tasks.values())
+        return await workflow.build.aget_state(
+            {"configurable": {"thread_id": "user-agent-1"}}
+        )
+
+    snapshot = asyncio.run(run())
+
+    assert snapshot.values["conversation_summary"] == "ringkasan percakapan"
+    assert snapshot.values["summarized_count"] == 2
+    assert metrics.get_counter("llm_summary_tokens_total", model="gpt-4o-mini") > 0
+
+
+def test_cached_turn_is_appended_to_the_conversation():
+    workflow = make_workflow(MemorySaver(), "A", include_short_memory=True)
+
+    async def run():
+        await workflow.append_turn("user-agent-1", "jam buka?", "Jam sembilan")
+        return await workflow.build.aget_state(
+            {"configurable": {"thread_id": "user-agent-1"}}
+        )
+
+    snapshot = asyncio.run(run())
+
+    assert [m.content for m in snapshot.values["messages"]] == [
+        "jam buka?",
+        "Jam sembilan",
+    ]
+    assert snapshot.values["response"] == "Jam sembilan"
@@ -0,0 +1,263 @@
+import contextvars
+import threading
+import time
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler, CallbackManager
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+
+from src.core.exceptions.llm_exceptions import (
+    CircuitOpenException,
+    LLMCallCancelledException,
+    LLMDeadlineExceededException,
+)
+from src.infrastructure.ai.components import (
+    CircuitBreaker,
+    HedgedLLMCaller,
+    HedgePolicy,
+    ResilientLLMCaller,
+    RetryPolicy,
+)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FlakyRunnable:
+    def __init__(self, failures, status_code=503):
+        self.failures = failures
+        self.status_code = status_code
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ProviderError(self.status_code)
+        return "ok"
+
+
+def make_caller(breaker=None, max_attempts=3, limiter=None):
+    return ResilientLLMCaller(
+        "test",
+        "model",
+        retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.001),
+        breaker=breaker or CircuitBreaker("test", "model"),
+        limiter=limiter,
+    )
+
+
+def test_retryable_errors_are_retried():
+    runnable = FlakyRunnable(failures=2)
+
+    assert make_caller().invoke(runnable, []) == "ok"
+    assert runnable.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    runnable = FlakyRunnable(failures=1, status_code=400)
+
+    with pytest.raises(ProviderError):
+        make_caller().invoke(runnable, [])
+    assert runnable.calls == 1
+
+
+def test_open_circuit_fails_fast_until_recovery():
+    breaker = CircuitBreaker(
+        "test", "model", failure_threshold=2, recovery_timeout=0.05
+    )
+    caller = make_caller(breaker, max_attempts=2)
+
+    with pytest.raises(ProviderError):
+        caller.invoke(FlakyRunnable(failures=5), [])
+    assert breaker.state == "open"
+
+    runnable = FlakyRunnable(failures=0)
+    with pytest.raises(CircuitOpenException):
+        caller.invoke(runnable, [])
+    assert runnable.calls == 0
+
+    time.sleep(0.06)
+    assert caller.invoke(runnable, []) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_expired_deadline_stops_the_call():
+    runnable = FlakyRunnable(failures=0)
+
+    with pytest.raises(LLMDeadlineExceededException):
+        make_caller().invoke(runnable, [], deadline=time.monotonic() - 1)
+    assert runnable.calls == 0
+
+
+class Lease:
+    def release(self, total_tokens=None):
+        pass
+
+
+class SlowLimiter:
+    """Hands out a lease after ``delay``, like a limiter queue that is full."""
+
+    def __init__(self, delay, checks_deadline=True):
+        self.delay = delay
+        self.checks_deadline = checks_deadline
+
+    def acquire(self, key, tokens, deadline=None):
+        time.sleep(self.delay)
+        if self.checks_deadline and time.monotonic() >= deadline:
+            raise LLMDeadlineExceededException()
+        return Lease()
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker("test", "model", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    return breaker
+
+
+# False: the lease comes just in time, the deadline passes before the call
+@pytest.mark.parametrize("checks_deadline", [True, False])
+def test_probe_cut_by_the_deadline_is_given_back(checks_deadline):
+    breaker = half_open_breaker()
+    limiter = SlowLimiter(0.05, checks_deadline)
+    runnable = FlakyRunnable(failures=0)
+
+    with pytest.raises(LLMDeadlineExceededException):
+        make_caller(breaker, limiter=limiter).invoke(
+            runnable, [], deadline=time.monotonic() + 0.02
+        )
+
+    # Neither a success nor a failure, the next request may probe
+    assert runnable.calls == 0
+    assert breaker.state == "half_open"
+    assert make_caller(breaker).invoke(runnable, []) == "ok"
+    assert breaker.state == "closed"
+
+
+class SlowRunnable:
+    def __init__(self, delay, answer):
+        self.delay = delay
+        self.answer = answer
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.answer
+
+
+def test_slow_primary_is_hedged_to_the_fallback():
+    primary = make_caller()
+    fallback = ResilientLLMCaller("fallback", "model", breaker=CircuitBreaker("f", "m"))
+    caller = HedgedLLMCaller(
+        primary, HedgePolicy("fallback", "model", default_delay=0.05), fallback
+    )
+
+    started = time.perf_counter()
+    answer = caller.invoke(
+        SlowRunnable(1.0, "primary"), [], None, SlowRunnable(0, "fallback")
+    )
+
+    assert answer == "fallback"
+    assert time.perf_counter() - started < 0.5
+
+
+def test_cancelled_invocation_stops_waiting_for_hedged_calls():
+    caller = HedgedLLMCaller(make_caller(), HedgePolicy(default_delay=0.05))
+    cancel_event = threading.Event()
+    threading.Timer(0.2, cancel_event.set).start()
+
+    started = time.perf_counter()
+    with pytest.raises(LLMCallCancelledException):
+        caller.invoke(SlowRunnable(1.0, "primary"), [], None, None, cancel_event)
+
+    assert time.perf_counter() - started < 0.6
+
+
+class ThreadNameRunnable:
+    def __init__(self, delay):
+        self.delay = delay
+        self.threads = []
+
+    def invoke(self, messages, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return self.threads[-1]
+
+
+def test_hedged_calls_run_on_their_providers_pool():
+    fallback = ResilientLLMCaller("fallback", "model", breaker=CircuitBreaker("f", "m"))
+    caller = HedgedLLMCaller(
+        make_caller(), HedgePolicy("fallback", "model", default_delay=0.05), fallback
+    )
+    primary_runnable = ThreadNameRunnable(0.3)
+
+    winner = caller.invoke(primary_runnable, [], None, ThreadNameRunnable(0))
+
+    # A stalled provider only ties up its own threads
+    assert primary_runnable.threads[0].startswith("llm-hedge-test")
+    assert winner.startswith("llm-hedge-fallback")
+
+
+def test_open_circuit_fails_over_without_calling_the_primary():
+    breaker = CircuitBreaker("test", "model", failure_threshold=1)
+    breaker.record_failure()
+    primary_runnable = SlowRunnable(0, "primary")
+    caller = HedgedLLMCaller(
+        make_caller(breaker),
+        HedgePolicy("fallback", "model"),
+        ResilientLLMCaller("fallback", "model", breaker=CircuitBreaker("f", "m")),
+    )
+
+    assert (
+        caller.invoke(primary_runnable, [], None, SlowRunnable(0, "fallback"))
+        == "fallback"
+    )
+    assert primary_runnable.calls == 0
+
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class ContextRunnable:
+    def invoke(self, messages, **kwargs):
+        return request_id.get()
+
+
+def test_hedged_calls_see_the_callers_context():
+    caller = HedgedLLMCaller(make_caller(), HedgePolicy(default_delay=0.05))
+    request_id.set("req-1")
+
+    assert caller.invoke(ContextRunnable(), []) == "req-1"
+
+
+class StreamingHandler(BaseCallbackHandler, _StreamingCallbackHandler):
+    def tap_output_aiter(self, run_id, output):
+        return output
+
+    def tap_output_iter(self, run_id, output):
+        return output
+
+
+class CallbacksRunnable:
+    def invoke(self, messages, **kwargs):
+        return var_child_runnable_config.get()["callbacks"].handlers
+
+
+def test_hedged_calls_keep_tracing_but_do_not_stream():
+    caller = HedgedLLMCaller(make_caller(), HedgePolicy(default_delay=0.05))
+    tracer, streamer = BaseCallbackHandler(), StreamingHandler()
+    callbacks = CallbackManager([tracer, streamer], [tracer, streamer])
+
+    def invoke_in_node():
+        # As LangGraph does for a node, without leaking into other tests
+        var_child_runnable_config.set({"callbacks": callbacks})
+        return caller.invoke(CallbacksRunnable(), [])
+
+    assert contextvars.copy_context().run(invoke_in_node) == [tracer]
+    # The node's own config still streams
+    assert callbacks.handlers == [tracer, streamer]
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.infrastructure.ai.components import memory_write_queue
+from src.infrastructure.ai.components.memory import long_memory
+from src.tests.fakes import FakeRetrieveDocumentTool, make_workflow
+
+
+class FakeMem0:
+    """Search waits for the document retrieval, so it only returns if both run at once."""
+
+    def __init__(self, retrieval_started):
+        self.retrieval_started = retrieval_started
+        self.searches = []
+        self.added = []
+
+    def search(self, query, user_id, limit):
+        self.searches.append((query, user_id))
+        assert self.retrieval_started.wait(timeout=2)
+        return {"results": [{"memory": "Nama pengguna Budi"}]}
+
+    def add(self, messages, user_id):
+        self.added.append((user_id, [message["content"] for message in messages]))
+
+
+class SignallingRetrieveDocumentTool(FakeRetrieveDocumentTool):
+    def __init__(self, started):
+        super().__init__()
+        self.started = started
+
+    def read_document(self, query):
+        self.started.set()
+        return super().read_document(query)
+
+
+@pytest.fixture
+def mem0(monkeypatch):
+    started = threading.Event()
+    backend = FakeMem0(started)
+    monkeypatch.setattr(long_memory, "_shared_memory", backend)
+    return backend
+
+
+def test_memory_and_documents_are_fetched_together_for_the_prompts(mem0):
+    tool_call = AIMessage(
+        content="",
+        tool_calls=[{"name": "read_document", "args": {"query": "jam"}, "id": "c1"}],
+    )
+    workflow = make_workflow(
+        MemorySaver(),
+        tool_call,
+        replies=["Halo Budi, toko buka jam sembilan"],
+        include_long_memory=True,
+        speculative_retrieval=True,
+        retrieve_document_tool=SignallingRetrieveDocumentTool(mem0.retrieval_started),
+    )
+
+    state = SimpleRagState(messages=[], user_message="jam buka?")
+    context = ExecutionContext("user-agent-1")
+    result = asyncio.run(workflow.arun(state, "user-agent-1", context))
+
+    assert result["response"] == "Halo Budi, toko buka jam sembilan"
+    # Without a user memory id the user agent's thread is the namespace
+    assert mem0.searches == [("jam buka?", "user-agent-1")]
+    main_prompt, rag_prompt = workflow._llm.prompts
+    assert "Nama pengguna Budi" in main_prompt[-1].content
+    assert "Nama pengguna Budi" in rag_prompt[-1].content
+
+    assert memory_write_queue.flush(timeout=5)
+    assert mem0.added == [
+        ("user-agent-1", ["jam buka?", "Halo Budi, toko buka jam sembilan"])
+    ]
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.infrastructure.ai.components import MemoryWriteQueue
+
+
+class SlowMemory:
+    def __init__(self, memory_id, delay=0.02):
+        self.memory_id = memory_id
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def add_context(self, list_messages):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        self.calls.append([message.content for message in list_messages])
+        with self.lock:
+            self.active -= 1
+
+
+def turn(index):
+    return [HumanMessage(content=f"q{index}"), AIMessage(content=f"a{index}")]
+
+
+def test_turns_are_batched_in_order_per_memory_id():
+    queue = MemoryWriteQueue(max_batch_turns=10, workers=4)
+    memory = SlowMemory("user-1")
+
+    for index in range(6):
+        assert queue.submit(memory, turn(index))
+    assert queue.shutdown(timeout=5)
+
+    written = [content for call in memory.calls for content in call]
+    assert written == [f"{kind}{i}" for i in range(6) for kind in ("q", "a")]
+    # Turns queued while the first write was running are merged
+    assert len(memory.calls) < 6
+    assert memory.max_active == 1
+    assert queue.pending_count == 0
+
+
+def test_full_queue_applies_backpressure_then_drops():
+    # Turns being written still count towards the bound
+    queue = MemoryWriteQueue(max_pending=2, workers=1, submit_timeout=0.05)
+    memory = SlowMemory("user-2", delay=0.5)
+
+    assert queue.submit(memory, turn(0))
+    assert queue.submit(memory, turn(1))
+    started = time.monotonic()
+    assert not queue.submit(memory, turn(2))
+    assert time.monotonic() - started >= 0.05
+    assert queue.shutdown(timeout=5)
+    written = [content for call in memory.calls for content in call]
+    assert written == ["q0", "a0", "q1", "a1"]
@@ -0,0 +1,82 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.tests.fakes import make_workflow
+
+QUESTION = "jam berapa toko buka?"
+
+
+def read_document_call(call_id="c1"):
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": "read_document", "args": {"query": "jam"}, "id": call_id}],
+    )
+
+
+def ask(workflow, message=QUESTION):
+    state = SimpleRagState(messages=[], user_message=message)
+    context = ExecutionContext("user-agent-1")
+    result = asyncio.run(workflow.arun(state, "user-agent-1", context))
+    return result, context
+
+
+def test_single_call_answers_in_the_main_agent_conversation():
+    workflow = make_workflow(
+        MemorySaver(),
+        read_document_call(),
+        rag_mode="single_call",
+        replies=["Toko buka jam sembilan"],
+    )
+
+    result, context = ask(workflow)
+
+    assert result["response"] == "Toko buka jam sembilan"
+    first, second = workflow._llm.prompts
+    # The first prompt is replayed unchanged, so it can be served from cache
+    assert second[: len(first)] == first
+    assert isinstance(second[-1], ToolMessage)
+    assert second[-1].content == "dokumen untuk jam"
+    assert [r.node for r in context.usage.records()] == ["main_agent", "main_agent"]
+
+
+def test_single_call_stops_the_tool_loop():
+    workflow = make_workflow(
+        MemorySaver(),
+        read_document_call("c1"),
+        rag_mode="single_call",
+        replies=[read_document_call("c2"), "Toko buka jam sembilan"],
+        max_tool_rounds=2,
+    )
+
+    result, _ = ask(workflow)
+
+    assert result["response"] == "Toko buka jam sembilan"
+    assert len(workflow._llm.prompts) == 3
+    tool_results = [m for m in workflow._llm.prompts[-1] if isinstance(m, ToolMessage)]
+    assert len(tool_results) == 2
+
+
+def test_routed_question_skips_the_tool_decision():
+    workflow = make_workflow(MemorySaver(), "Toko buka jam sembilan", rag_mode="routed")
+
+    result, context = ask(workflow)
+
+    assert result["response"] == "Toko buka jam sembilan"
+    [prompt] = workflow._llm.prompts
+    assert f"dokumen untuk {QUESTION}" in prompt[-1].content
+    assert [r.node for r in context.usage.records()] == ["answer_by_rag"]
+
+
+def test_routed_small_talk_goes_to_the_main_agent():
+    workflow = make_workflow(
+        MemorySaver(), "Halo, ada yang bisa dibantu?", rag_mode="routed"
+    )
+
+    result, context = ask(workflow, "halo")
+
+    assert result["response"] == "Halo, ada yang bisa dibantu?"
+    assert [r.node for r in context.usage.records()] == ["main_agent"]
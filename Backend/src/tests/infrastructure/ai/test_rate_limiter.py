@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from src.config.config import settings
+from src.core.exceptions.llm_exceptions import LLMDeadlineExceededException
+from src.infrastructure.ai.components import ProviderRateLimiter
+from src.infrastructure.ai.components.resilience.rate_limiter import (
+    LocalRateBuckets,
+    RateLimiterRegistry,
+)
+
+
+def test_bucket_reports_wait_when_empty():
+    buckets = LocalRateBuckets([60, 600])
+
+    assert buckets.try_take([60, 100]) == 0
+    wait = buckets.try_take([1, 100])
+    assert 0.9 < wait <= 1.0
+
+
+def test_waiting_calls_are_served_round_robin_across_agents():
+    limiter = ProviderRateLimiter("test", "model", 10_000, 10_000_000, max_in_flight=1)
+    order = []
+    first = limiter.acquire("agent-a", 10)
+
+    def call(agent):
+        lease = limiter.acquire(agent, 10)
+        order.append(agent)
+        lease.release()
+
+    threads = []
+    for agent in ["agent-a", "agent-a", "agent-a", "agent-b"]:
+        thread = threading.Thread(target=call, args=(agent,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+
+    first.release()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == ["agent-a", "agent-b", "agent-a", "agent-a"]
+
+
+def test_queue_wait_stops_at_the_deadline():
+    limiter = ProviderRateLimiter("test", "model", 10_000, 10_000_000, max_in_flight=1)
+    lease = limiter.acquire("agent-a", 10)
+
+    with pytest.raises(LLMDeadlineExceededException):
+        limiter.acquire("agent-b", 10, deadline=time.monotonic() + 0.05)
+    assert limiter.queued == 0
+    lease.release()
+
+
+def test_limits_are_off_unless_configured(monkeypatch):
+    monkeypatch.setattr(
+        settings, "LLM_RATE_LIMITS", {"openai": {"rpm": 60, "max_in_flight": 2}}
+    )
+    registry = RateLimiterRegistry()
+
+    unlimited = registry.get("google", "gemini")
+    leases = [unlimited.acquire("agent-a", 10**9, deadline=time.monotonic())]
+    leases += [unlimited.acquire("agent-a", 10) for _ in range(100)]
+    assert unlimited.is_unlimited and unlimited.in_flight == 101
+    for lease in leases:
+        lease.release()
+
+    limited = registry.get("openai", "gpt-4o")
+    assert not limited.is_unlimited and limited.tokens_per_minute == 0
+    # No token limit, only the request rate and concurrency are shaped
+    leases = [limited.acquire("agent-a", 10**9) for _ in range(2)]
+    with pytest.raises(LLMDeadlineExceededException):
+        limited.acquire("agent-b", 10, deadline=time.monotonic() + 0.05)
+    for lease in leases:
+        lease.release()
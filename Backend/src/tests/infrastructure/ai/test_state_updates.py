@@ -0,0 +1,58 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.tests.fakes import make_workflow
+
+
+def test_nodes_return_only_the_new_messages():
+    workflow = make_workflow(MemorySaver(), "Jam sembilan")
+    history = [HumanMessage(content="halo"), AIMessage(content="Halo juga")]
+    config = workflow.build_config("user-agent-1", ExecutionContext("user-agent-1"))
+
+    update = workflow._main_agent(
+        SimpleRagState(messages=history, user_message="jam buka?"), config
+    )
+
+    assert [type(m) for m in update["messages"]] == [HumanMessage, AIMessage]
+    assert update["messages"][0].content == "jam buka?"
+
+
+def test_checkpoint_grows_by_each_turns_messages():
+    tool_call = AIMessage(
+        content="",
+        tool_calls=[{"name": "read_document", "args": {"query": "jam"}, "id": "c1"}],
+    )
+    workflow = make_workflow(
+        MemorySaver(),
+        tool_call,
+        replies=["Jam sembilan", "Sama-sama"],
+        include_short_memory=True,
+    )
+
+    async def run():
+        for message in ["jam buka?", "terima kasih"]:
+            state = SimpleRagState(messages=[], user_message=message)
+            await workflow.arun(state, "user-agent-1", ExecutionContext("user-agent-1"))
+        return await workflow.build.aget_state(
+            {"configurable": {"thread_id": "user-agent-1"}}
+        )
+
+    messages = asyncio.run(run()).values["messages"]
+
+    assert [type(m) for m in messages] == [
+        HumanMessage,
+        AIMessage,
+        ToolMessage,
+        AIMessage,
+        HumanMessage,
+        AIMessage,
+    ]
+    assert [m.content for m in messages if isinstance(m, HumanMessage)] == [
+        "jam buka?",
+        "terima kasih",
+    ]
+    assert len({m.id for m in messages}) == len(messages)
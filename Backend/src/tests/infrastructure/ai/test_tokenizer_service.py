@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tiktoken
+
+from src.infrastructure.ai.components import TokenizerService
+
+
+class FakeEncoding:
+    """Counts words as tokens, remembering the thread it ran on."""
+
+    def __init__(self, name):
+        self.name = name
+        self.threads = []
+
+    def encode(self, text, disallowed_special=()):
+        self.threads.append(threading.current_thread())
+        return text.split()
+
+    def encode_batch(self, texts, disallowed_special=()):
+        return [self.encode(text) for text in texts]
+
+
+def fake_loader(monkeypatch, fail=False):
+    loads = []
+    failing = [fail]
+
+    def get_encoding(name):
+        loads.append(name)
+        if failing[0]:
+            raise ConnectionError("no network")
+        return FakeEncoding(name)
+
+    monkeypatch.setattr(tiktoken, "get_encoding", get_encoding)
+    return loads, failing
+
+
+def test_each_encoding_is_loaded_once_for_every_model(monkeypatch):
+    loads, _ = fake_loader(monkeypatch)
+    service = TokenizerService()
+
+    models = ["gpt-4o", "gpt-4o-mini", "gpt-4", "claude-3-5-haiku-latest"] * 8
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        encoders = list(executor.map(service.get_encoder, models))
+
+    assert sorted(loads) == ["cl100k_base", "o200k_base"]
+    assert encoders[0] is encoders[1]
+    # Unknown models use the default encoding
+    assert encoders[3] is encoders[2]
+    assert service.count_tokens("jam buka toko", "gpt-4o") == 3
+
+
+def test_failed_load_is_retried_after_a_while(monkeypatch):
+    loads, failing = fake_loader(monkeypatch, fail=True)
+    service = TokenizerService(retry_seconds=60)
+
+    assert service.count_tokens("a" * 40, "gpt-4o") == 10
+    assert service.count_tokens_batch(["a" * 8, "a" * 4], "gpt-4o") == [2, 1]
+    assert service.count_static_tokens("Kamu adalah customer service.", "gpt-4o") == 7
+    assert loads == ["o200k_base"]
+
+    failing[0] = False
+    service._failed_at["o200k_base"] -= 60
+
+    assert service.count_tokens("jam buka toko", "gpt-4o") == 3
+    assert service.count_static_tokens("Kamu adalah customer service.", "gpt-4o") == 4
+    assert service.get_encoder("gpt-4o") is service.get_encoder("gpt-4o")
+    assert loads == ["o200k_base", "o200k_base"]
+
+
+def test_static_prompt_counts_are_memoized(monkeypatch):
+    fake_loader(monkeypatch)
+    service = TokenizerService()
+    encoder = service.get_encoder("gpt-4o")
+
+    for _ in range(3):
+        assert (
+            service.count_static_tokens("Kamu adalah customer service.", "gpt-4o") == 4
+        )
+
+    assert len(encoder.threads) == 1
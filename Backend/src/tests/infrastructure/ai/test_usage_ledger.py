@@ -0,0 +1,60 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.infrastructure.ai.agents import ExecutionContext
+from src.infrastructure.ai.agents.simple_rag_agent.models import SimpleRagState
+from src.tests.fakes import make_workflow
+
+
+def usage(input_tokens, output_tokens, cache_read=0):
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "input_token_details": {"cache_read": cache_read},
+    }
+
+
+def test_every_llm_call_is_recorded_as_the_provider_reported_it():
+    tool_call = AIMessage(
+        content="",
+        tool_calls=[{"name": "read_document", "args": {"query": "jam"}, "id": "c1"}],
+        usage_metadata=usage(900, 25, cache_read=512),
+    )
+    answer = AIMessage(
+        content="Toko buka jam sembilan",
+        usage_metadata=usage(1400, 40),
+        # Answered by the fallback model
+        response_metadata={"model_name": "claude-3-5-haiku-latest"},
+    )
+    workflow = make_workflow(MemorySaver(), tool_call, replies=[answer])
+    context = ExecutionContext("user-agent-1")
+
+    state = SimpleRagState(messages=[], user_message="jam buka?")
+    asyncio.run(workflow.arun(state, "user-agent-1", context))
+
+    records = context.usage.records()
+    assert [(r.node, r.model, r.source) for r in records] == [
+        ("main_agent", "gpt-4o-mini", "provider"),
+        ("answer_by_rag", "claude-3-5-haiku-latest", "provider"),
+    ]
+    assert context.usage.input_tokens == 2300
+    assert context.usage.total_tokens == 2365
+    assert context.usage.cached_tokens == 512
+
+
+def test_usage_is_estimated_when_the_provider_reports_none():
+    workflow = make_workflow(MemorySaver(), "A")
+    context = ExecutionContext("user-agent-1")
+    config = workflow.build_config("user-agent-1", context)
+    messages = [HumanMessage(content="jam buka toko hari ini?")]
+    response = AIMessage(content="Toko buka jam sembilan")
+
+    record = workflow.record_usage(config, "main_agent", messages, response)
+
+    assert record.source == "estimated"
+    assert record.input_tokens == workflow._estimate_messages_tokens(messages)
+    assert record.output_tokens == workflow._estimate_messages_tokens([response])
+    assert context.usage.records() == [record]
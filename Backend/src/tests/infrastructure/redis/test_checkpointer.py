@@ -0,0 +1,206 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from langgraph.checkpoint.redis.base import BaseRedisSaver
+from langgraph.checkpoint.redis.util import to_storage_safe_id, to_storage_safe_str
+
+from src.infrastructure.redis.checkpointer import (
+    BoundedMemorySaver,
+    CompactingAsyncRedisSaver,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.keys = []
+
+    def delete(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        self.redis.deleted.extend(self.keys)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.deleted = []
+        self.expires = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, key):
+        self.deleted.append(key)
+
+    async def expire(self, key, seconds):
+        self.expires[key] = seconds
+
+
+def search_result(*docs):
+    return SimpleNamespace(docs=[SimpleNamespace(**doc) for doc in docs])
+
+
+def checkpoint_key(checkpoint_id):
+    return BaseRedisSaver._make_redis_checkpoint_key(
+        to_storage_safe_id("ua1"), to_storage_safe_str(""), checkpoint_id
+    )
+
+
+def pointer_key(thread_id):
+    return f"checkpoint_latest:{thread_id}:{to_storage_safe_str('')}"
+
+
+@pytest.fixture
+def saver(mocker):
+    # Built inside the test's loop, no connection is made before a command
+    async def build(**options):
+        saver = CompactingAsyncRedisSaver("redis://localhost:6379", **options)
+        saver._redis = FakeRedis()
+        saver.checkpoints_index = mocker.Mock()
+        saver.checkpoint_writes_index = mocker.Mock()
+        return saver
+
+    return build
+
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_the_newest_checkpoints(saver, mocker):
+    saver = await saver(keep_last=2)
+    # uuid6 ids sort by creation time
+    ids = [str(uuid6(clock_seq=index)) for index in range(5)]
+    saver.checkpoints_index.search = mocker.AsyncMock(
+        return_value=search_result(*({"checkpoint_id": id_} for id_ in ids))
+    )
+    saver.checkpoint_writes_index.search = mocker.AsyncMock(
+        return_value=search_result({"checkpoint_id": ids[0], "task_id": "t1", "idx": 0})
+    )
+
+    assert await saver.acompact_thread("ua1") == 3
+
+    deleted = saver._redis.deleted
+    assert set(deleted) >= {checkpoint_key(id_) for id_ in ids[:3]}
+    assert (
+        BaseRedisSaver._make_redis_checkpoint_writes_key(
+            to_storage_safe_id("ua1"), to_storage_safe_str(""), ids[0], "t1", 0
+        )
+        in deleted
+    )
+    # The newest one, which checkpoint_latest points at, stays
+    assert not {checkpoint_key(id_) for id_ in ids[3:]} & set(deleted)
+    assert pointer_key("ua1") not in deleted
+
+
+@pytest.mark.asyncio
+async def test_short_thread_is_left_alone(saver, mocker):
+    saver = await saver(keep_last=3)
+    saver.checkpoints_index.search = mocker.AsyncMock(
+        return_value=search_result({"checkpoint_id": str(uuid6())})
+    )
+    saver.checkpoint_writes_index.search = mocker.AsyncMock()
+
+    assert await saver.acompact_thread("ua1") == 0
+    assert saver._redis.deleted == []
+    saver.checkpoint_writes_index.search.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_ttl_is_set_with_refresh_on_read(saver):
+    assert (await saver(ttl_minutes=30)).ttl_config == {
+        "default_ttl": 30,
+        "refresh_on_read": True,
+    }
+    assert (await saver()).ttl_config is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ttl_minutes", [30, None])
+async def test_read_keeps_the_latest_pointer_alive(saver, monkeypatch, ttl_minutes):
+    saver = await saver(ttl_minutes=ttl_minutes)
+    latest = SimpleNamespace(
+        config={"configurable": {"thread_id": "ua1", "checkpoint_ns": ""}}
+    )
+
+    async def aget_tuple(self, config):
+        return latest
+
+    monkeypatch.setattr(AsyncRedisSaver, "aget_tuple", aget_tuple)
+
+    assert await saver.aget_tuple({"configurable": {"thread_id": "ua1"}}) is latest
+    expected = {pointer_key("ua1"): 30 * 60} if ttl_minutes else {}
+    assert saver._redis.expires == expected
+
+
+@pytest.mark.asyncio
+async def test_one_compaction_runs_per_thread(saver, monkeypatch):
+    saver = await saver(keep_last=2)
+    release = asyncio.Event()
+    compacted = []
+
+    async def aput(self, config, checkpoint, metadata, new_versions, stream_mode):
+        return {"configurable": {**config["configurable"], "checkpoint_ns": ""}}
+
+    async def acompact_thread(thread_id, checkpoint_ns=""):
+        compacted.append(thread_id)
+        await release.wait()
+        return 0
+
+    monkeypatch.setattr(AsyncRedisSaver, "aput", aput)
+    saver.acompact_thread = acompact_thread
+
+    for thread_id in ["ua1", "ua1", "ua2"]:
+        await saver.aput({"configurable": {"thread_id": thread_id}}, {}, {}, {})
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*saver._compactions.values())
+    await asyncio.sleep(0)  # done callbacks
+
+    assert sorted(compacted) == ["ua1", "ua2"]
+    assert not saver._compactions
+
+
+def put_checkpoint(saver, thread_id):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"response": f"jawaban {thread_id}"}
+    checkpoint["channel_versions"] = {"response": 1}
+    saved = saver.put(config, checkpoint, {}, {"response": 1})
+    saver.put_writes(saved, [("response", "x")], "task-1")
+
+
+def stored_threads(saver):
+    return (
+        set(saver.storage)
+        | {key[0] for key in saver.writes}
+        | {key[0] for key in saver.blobs}
+    )
+
+
+def test_memory_saver_drops_the_least_recently_used_threads():
+    saver = BoundedMemorySaver(max_threads=2)
+    put_checkpoint(saver, "ua1")
+    put_checkpoint(saver, "ua2")
+    # Reading ua1 makes ua2 the least recently used
+    assert saver.get_tuple({"configurable": {"thread_id": "ua1"}}) is not None
+
+    put_checkpoint(saver, "ua3")
+
+    assert stored_threads(saver) == {"ua1", "ua3"}
+    assert saver.thread_count == 2
+
+
+def test_memory_saver_drops_idle_threads():
+    saver = BoundedMemorySaver(ttl_minutes=1, sweep_interval=0)
+    put_checkpoint(saver, "ua1")
+    saver.ttl_seconds = 0.05
+    time.sleep(0.06)
+
+    put_checkpoint(saver, "ua2")
+
+    assert stored_threads(saver) == {"ua2"}
+    assert saver.get_tuple({"configurable": {"thread_id": "ua1"}}) is None
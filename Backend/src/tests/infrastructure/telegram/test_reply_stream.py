@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.telegram import TelegramReplyStream, TelegramSendQueue
+
+
+class FakeTelegramManager:
+    def __init__(self, placeholder_ok=True, chat_rate=1000.0):
+        self.placeholder_ok = placeholder_ok
+        self.sent = []
+        self.edits = []
+        self.send_queue = TelegramSendQueue(
+            self.send_message, bot_rate=1000.0, chat_rate=chat_rate
+        )
+
+    async def send_message(self, agent_id, api_key, chat_id, message):
+        self.sent.append(message)
+        if not self.placeholder_ok:
+            return {"status": False, "response": {"ok": False}}
+        return {"status": True, "response": {"ok": True, "result": {"message_id": 7}}}
+
+    async def edit_message_text(self, api_key, chat_id, message_id, message):
+        assert message_id == 7
+        self.edits.append((time.monotonic(), message))
+        return {"status": True, "response": {"ok": True}}
+
+
+def make_stream(manager, interval=0.05):
+    return TelegramReplyStream(
+        manager, "ag1", "TOKEN", 1, edit_interval=interval, placeholder="..."
+    ).start()
+
+
+@pytest.mark.asyncio
+async def test_placeholder_is_edited_at_a_throttled_rate_then_finished():
+    manager = FakeTelegramManager()
+    stream = make_stream(manager)
+
+    text = ""
+    for word in ["Halo", "kak,", "toko", "buka", "jam", "sembilan"] * 5:
+        text += word + " "
+        stream.update(text)
+        await asyncio.sleep(0.01)
+    result = await stream.finish(text.strip())
+
+    assert result["status"]
+    assert manager.sent == ["..."]
+    assert manager.edits[-1][1] == text.strip()
+    # 30 tokens, but only about one edit per interval
+    assert 2 <= len(manager.edits) <= 10
+    gaps = [b[0] - a[0] for a, b in zip(manager.edits, manager.edits[1:-1])]
+    assert all(gap >= 0.045 for gap in gaps)
+
+
+@pytest.mark.asyncio
+async def test_reply_is_sent_when_the_placeholder_failed():
+    manager = FakeTelegramManager(placeholder_ok=False)
+    stream = make_stream(manager)
+    stream.update("Halo")
+
+    await stream.finish("Halo kak")
+
+    assert manager.sent == ["...", "Halo kak"]
+    assert manager.edits == []
+
+
+@pytest.mark.asyncio
+async def test_long_reply_continues_in_new_messages():
+    manager = FakeTelegramManager()
+    stream = make_stream(manager)
+
+    await stream.finish("a" * 5000)
+
+    assert [len(text) for _, text in manager.edits] == [4096]
+    assert manager.sent == ["...", "a" * 904]
+
+
+@pytest.mark.asyncio
+async def test_finish_ends_the_edit_task():
+    stream = make_stream(FakeTelegramManager())
+    assert not stream.is_finished
+
+    await stream.finish("Maaf, coba lagi nanti")
+
+    assert stream.is_finished
+    assert stream._task.done()
+
+
+@pytest.mark.asyncio
+async def test_edits_are_charged_to_the_chat_send_rate():
+    manager = FakeTelegramManager(chat_rate=10.0)
+    stream = make_stream(manager, interval=0.01)
+
+    text = ""
+    for word in ["Halo", "kak,", "toko", "buka", "jam", "sembilan"] * 5:
+        text += word + " "
+        stream.update(text)
+        await asyncio.sleep(0.01)
+    await stream.finish(text.strip())
+
+    assert manager.edits[-1][1] == text.strip()
+    # The interval allows 100 edits a second, the chat only 10
+    gaps = [b[0] - a[0] for a, b in zip(manager.edits, manager.edits[1:])]
+    assert all(gap >= 0.09 for gap in gaps)
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.telegram import TelegramSendQueue
+
+
+class FakeBotApi:
+    def __init__(self, responses=None):
+        self.responses = list(responses or [])
+        self.sent = []
+
+    async def __call__(self, api_key, chat_id, text):
+        self.sent.append((time.monotonic(), chat_id, text))
+        if self.responses:
+            return self.responses.pop(0)
+        return {"status": True, "response": {"ok": True}}
+
+
+@pytest.mark.asyncio
+async def test_messages_of_a_chat_are_spaced_by_the_chat_rate():
+    api = FakeBotApi()
+    queue = TelegramSendQueue(api, bot_rate=100, chat_rate=20)
+
+    results = await asyncio.gather(
+        *(queue.send("bot", "TOKEN", 1, str(n)) for n in range(3)),
+        queue.send("bot", "TOKEN", 2, "other"),
+    )
+
+    assert all(result["status"] for result in results)
+    chat_one = [(at, text) for at, chat_id, text in api.sent if chat_id == 1]
+    assert [text for _, text in chat_one] == ["0", "1", "2"]
+    assert chat_one[2][0] - chat_one[0][0] >= 0.09
+    # The other chat isn't stuck behind chat 1
+    assert api.sent[1][1] == 2
+    assert queue.depth("bot") == 0
+
+
+@pytest.mark.asyncio
+async def test_429_waits_for_retry_after_and_delivers():
+    rate_limited = {
+        "status": False,
+        "response": {"ok": False, "error_code": 429},
+        "retryable": True,
+        "retry_after": 0.2,
+    }
+    api = FakeBotApi([rate_limited])
+    queue = TelegramSendQueue(api, bot_rate=100, chat_rate=100)
+
+    started = time.monotonic()
+    first, second = await asyncio.gather(
+        queue.send("bot", "TOKEN", 1, "a"), queue.send("bot", "TOKEN", 2, "b")
+    )
+
+    assert first["status"] and second["status"]
+    assert [text for _, _, text in api.sent] == ["a", "b", "a"]
+    assert api.sent[-1][0] - started >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    server_error = {"status": False, "response": "502", "retryable": True}
+    blocked = {"status": False, "response": {"error_code": 403}}
+    api = FakeBotApi([server_error] * 3 + [blocked])
+    queue = TelegramSendQueue(api, chat_rate=100, max_attempts=3, retry_base_delay=0.01)
+
+    assert not (await queue.send("bot", "TOKEN", 1, "a"))["status"]
+    assert len(api.sent) == 3
+    # Not retryable, one attempt only
+    assert not (await queue.send("bot", "TOKEN", 2, "b"))["status"]
+    assert len(api.sent) == 4
+
+
+@pytest.mark.asyncio
+async def test_stop_delivers_the_queued_messages():
+    api = FakeBotApi()
+    queue = TelegramSendQueue(api, bot_rate=100, chat_rate=20)
+    sends = [
+        asyncio.ensure_future(queue.send("bot", "TOKEN", 1, str(n))) for n in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    assert await queue.stop(timeout=5)
+
+    assert [text for _, _, text in api.sent] == ["0", "1", "2"]
+    assert all(send.result()["status"] for send in sends)
+
+
+@pytest.mark.asyncio
+async def test_stop_gives_up_on_what_it_could_not_deliver():
+    release = asyncio.Event()
+
+    async def stalled_api(api_key, chat_id, text):
+        await release.wait()
+        return {"status": True, "response": {"ok": True}}
+
+    queue = TelegramSendQueue(stalled_api, bot_rate=100, chat_rate=100)
+    sends = [
+        asyncio.ensure_future(queue.send("bot", "TOKEN", 1, str(n))) for n in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    assert not await queue.stop(timeout=0.05)
+
+    # The one being sent and the one still queued both get an answer
+    results = await asyncio.wait_for(asyncio.gather(*sends), 1)
+    assert [result["status"] for result in results] == [False, False]
+    assert queue.depth("bot") == 0
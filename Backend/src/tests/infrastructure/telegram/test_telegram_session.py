@@ -0,0 +1,33 @@
+import pytest
+from aiohttp import web
+
+from src.infrastructure.telegram import TelegramManager
+
+
+@pytest.mark.asyncio
+async def test_messages_reuse_one_keep_alive_connection():
+    peers = []
+
+    async def send_message(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/sendMessage", send_message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    manager = TelegramManager(f"http://127.0.0.1:{runner.addresses[0][1]}")
+    try:
+        for chat_id in range(3):
+            result = await manager.send_message("ag1", "TOKEN", chat_id, "halo")
+            assert result["status"]
+        assert len(peers) == 3 and len(set(peers)) == 1
+
+        session = await manager.start()
+        await manager.close()
+        assert session.closed
+        assert (await manager.send_message("ag1", "TOKEN", 9, "halo"))["status"]
+    finally:
+        await manager.close()
+        await runner.cleanup()
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.telegram import TelegramUpdateQueue
+
+
+def recorder(log, name, delay=0.01):
+    async def work():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+
+    return work
+
+
+@pytest.mark.asyncio
+async def test_updates_of_one_chat_run_in_order():
+    queue = TelegramUpdateQueue(max_concurrency_per_bot=4)
+    log = []
+
+    for update_id in range(3):
+        assert queue.submit("bot", 1, update_id, recorder(log, update_id))
+    assert await queue.stop()
+
+    assert log == [(event, n) for n in range(3) for event in ("start", "end")]
+
+
+@pytest.mark.asyncio
+async def test_redelivered_update_runs_once():
+    queue = TelegramUpdateQueue()
+    log = []
+
+    assert queue.submit("bot", 1, 10, recorder(log, "a"))
+    assert queue.submit("bot", 1, 10, recorder(log, "b"))
+    # The same update_id belongs to another bot
+    assert queue.submit("other", 1, 10, recorder(log, "c"))
+    await queue.stop()
+
+    assert sorted(name for event, name in log if event == "start") == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_per_bot():
+    queue = TelegramUpdateQueue(max_concurrency_per_bot=2)
+    running = {"bot": 0, "other": 0}
+    peak = {"bot": 0, "other": 0}
+
+    def work(bot):
+        async def run():
+            running[bot] += 1
+            peak[bot] = max(peak[bot], running[bot])
+            await asyncio.sleep(0.01)
+            running[bot] -= 1
+
+        return run
+
+    for chat_id in range(6):
+        queue.submit("bot", chat_id, chat_id, work("bot"))
+        queue.submit("other", chat_id, chat_id, work("other"))
+    await queue.stop()
+
+    assert peak == {"bot": 2, "other": 2}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_failures_dont_stop_the_chat():
+    queue = TelegramUpdateQueue(max_pending=2)
+    log = []
+
+    async def fail():
+        raise RuntimeError("LLM down")
+
+    assert queue.submit("bot", 1, 1, fail)
+    assert queue.submit("bot", 1, 2, recorder(log, "after"))
+    assert not queue.submit("bot", 1, 3, recorder(log, "rejected"))
+    await queue.stop()
+
+    assert log == [("start", "after"), ("end", "after")]
+    assert queue.pending_count == 0